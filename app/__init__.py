@@ -1,25 +1,36 @@
 from flask import Flask # import flask package
 from config import Config # import Config class from config.py
 from flask_moment import Moment # for date and time rendering (we need to convert times accurately for users in different areas)
-import firebase_admin
-from firebase_admin import credentials, firestore
+from app.storage import create_local_db, FIRESTORE_BACKEND
 import os
 
 app = Flask(__name__) # creates app VARIABLE as instance of class Flask (__name__ references the name of the module in which it is used (returns __main__?))
 app.config.from_object(Config) # access sensitive info using something like app.config['<variable_name>']
 
-# Initialize Firebase
-if not firebase_admin._apps:
-    firebase_cred_path = os.getenv("FIREBASE_CREDENTIALS")
-
-    if firebase_cred_path and os.path.exists(firebase_cred_path):
-        cred = credentials.Certificate(firebase_cred_path)
-    else:
-        cred = credentials.ApplicationDefault()
-
-    firebase_admin.initialize_app(cred)
-
-db = firestore.client()
+if app.config["STORAGE_BACKEND"] == FIRESTORE_BACKEND:
+    # only the firestore backend needs firebase_admin installed
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+
+    # Initialize Firebase
+    if not firebase_admin._apps:
+        firebase_cred_path = os.getenv("FIREBASE_CREDENTIALS")
+
+        if firebase_cred_path and os.path.exists(firebase_cred_path):
+            cred = credentials.Certificate(firebase_cred_path)
+        else:
+            cred = credentials.ApplicationDefault()
+
+        firebase_admin.initialize_app(cred)
+
+    db = firestore.client()
+else:
+    # local in-memory / SQLite stand-in with the same collection API (offline runs, load tests, benchmarks)
+    db = create_local_db(
+        app.config["STORAGE_BACKEND"],
+        sqlite_path=app.config["SQLITE_PATH"],
+        seed_path=app.config["LOCAL_SEED_PATH"],
+    )
 
 # firebase setup
 # cred = credentials.Certificate(app.config["FIREBASE_CREDENTIALS"])
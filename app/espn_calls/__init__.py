@@ -3,6 +3,12 @@ from .waiver_injury_calls import *
 from .rankings_calls import *
 from .schedule_calls import *
 from .trade_calls import *
+from .player_store import *
+from .player_table import *
+from .name_index import *
+from .materialized_views import *
+from .schedule_calendar import *
+from .game_logs import *
 
 __all__ = [
     "compute_boom_score",
@@ -18,4 +24,18 @@ __all__ = [
     "compute_player_trade_value",
     "_get_player_by_id",
     "evaluate_trade",
+    "PlayerStore",
+    "get_player_store",
+    "invalidate_player_store",
+    "PlayerTable",
+    "get_player_table",
+    "top_k_indices",
+    "NameIndex",
+    "normalize_name",
+    "get_name_index",
+    "get_materialized_view",
+    "TeamCalendar",
+    "get_team_calendar",
+    "GameLog",
+    "get_game_log",
 ]
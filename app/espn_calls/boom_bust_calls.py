@@ -1,6 +1,135 @@
-# Collections
-TEAM_PLAYER_COL = "team_players"
-FREE_AGENTS_COL = "free_agents"
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+import numpy as np
+from .player_store import get_player_store, SEASON_YEAR
+from .player_table import get_player_table
+from .game_logs import get_game_log
+from .materialized_views import get_materialized_view, BOOM_BUST_VIEW
+
+# Trailing windows (scoring periods = days) the /boombust page offers
+WINDOWS = (7, 15, 30)
+
+# A boom (bust) game is this many season standard deviations above (below) the player's season average
+BOOM_BUST_STD = 1.0
+
+# Fewest games in a window for a player to be ranked on it
+MIN_WINDOW_GAMES = 2
+
+# Defaults of the /boombust query parameters (the cron's materialized view uses the same ones)
+DEFAULT_MIN_GAMES = 10
+DEFAULT_MIN_PROJECTED = 10
+
+# Query results kept in memory (least recently used ones go first)
+QUERY_CACHE_SIZE = 32
+
+
+class QueryCache:
+    """
+    Bounded LRU of boom/bust results keyed on (snapshot version, query
+    parameters). Results for an old snapshot just age out, and the entry cap
+    bounds the memory it can hold.
+    """
+
+    def __init__(self, maxsize: int = QUERY_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_query_cache = QueryCache()
+
+
+class GameLogStats:
+    """
+    Game-log statistics for the whole pool over any trailing window. Rows
+    follow PlayerTable / GameLog order.
+
+    The season mean / standard deviation come from every box score, and they
+    set each player's boom / bust thresholds. Cumulative sums over the periods
+    of games, points, squared points, booms and busts turn any window into one
+    column subtraction, so switching windows never goes back to the raw docs.
+    """
+
+    def __init__(self, log):
+        self.n_periods = log.n_periods
+        played = log.played
+        fp = np.where(played, log.fp, 0.0)
+
+        games = played.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = fp.sum(axis=1) / games
+            std = np.sqrt(np.maximum((fp ** 2).sum(axis=1) / games - mean ** 2, 0.0))
+        self.mean = mean
+        self.std = std
+        # NaN thresholds (no games) compare False, so those rows get no booms / busts
+        boom = played & (fp > (mean + BOOM_BUST_STD * std)[:, None])
+        bust = played & (fp < (mean - BOOM_BUST_STD * std)[:, None])
+
+        def cum(a):
+            out = np.zeros((a.shape[0], a.shape[1] + 1))
+            np.cumsum(a, axis=1, out=out[:, 1:])
+            return out
+
+        self._cum = {
+            "games": cum(played),
+            "points": cum(fp),
+            "squares": cum(fp ** 2),
+            "booms": cum(boom),
+            "busts": cum(bust),
+        }
+
+    def window(self, days: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Per-player arrays over the last `days` scoring periods with box scores
+        (None: the whole season): games, avg, std, z_score (window average vs
+        the season average, in season standard deviations), boom_rate and
+        bust_rate (share of the window's games). NaN where there are no games.
+        """
+        lo = 0 if days is None else max(self.n_periods - int(days), 0)
+        total = {name: cs[:, self.n_periods] - cs[:, lo] for name, cs in self._cum.items()}
+        games = total["games"]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            avg = total["points"] / games
+            return {
+                "games": games,
+                "avg": avg,
+                "std": np.sqrt(np.maximum(total["squares"] / games - avg ** 2, 0.0)),
+                "z_score": np.where(self.std > 0, (avg - self.mean) / self.std, 0.0),
+                "boom_rate": total["booms"] / games,
+                "bust_rate": total["busts"] / games,
+            }
+
+
+def get_game_log_stats(db) -> GameLogStats:
+    """GameLogStats for the current snapshot, built once."""
+    return get_player_store(db).derived("game_log_stats", lambda: GameLogStats(get_game_log(db)))
+
 
 def compute_boom_score(player):
     '''Boom score = season-to-date avg minus project avg'''
@@ -12,67 +141,141 @@ def compute_boom_score(player):
     return avg_points - projected_avg
 
 
-def get_boom_bust_players(db, include_injured=True, year=2026, min_games=10):
+def _boom_bust_entry(p, score):
+    return {
+        "playerId": p.get("playerId"),
+        "name": p.get("name"),
+        "boom_score": score,
+        "avg_points": p.get("avg_points"),
+        "projected_avg_points": p.get("projected_avg_points"),
+        "position": p.get("position")
+    }
+
+
+def _window_entry(p, score, stats, engine, i):
+    entry = _boom_bust_entry(p, score)
+    entry.update({
+        "window_avg_points": float(stats["avg"][i]),
+        "window_games": int(stats["games"][i]),
+        "window_std": float(stats["std"][i]),
+        "season_avg_points": float(engine.mean[i]),
+        "std": float(engine.std[i]),
+        "z_score": float(stats["z_score"][i]),
+        "boom_rate": float(stats["boom_rate"][i]),
+        "bust_rate": float(stats["bust_rate"][i]),
+    })
+    return entry
+
+
+def _filter_rows(table, keep, position=None, team=None):
+    """Narrow the `keep` mask to one position / NBA team (proTeam abbreviation)."""
+    if position is not None:
+        code = table.positions.index(position) if position in table.positions else -2
+        keep &= table.position_codes == code
+    if team is not None:
+        code = table.pro_teams.index(team) if team in table.pro_teams else -2
+        keep &= table.pro_team_codes == code
+    return keep
+
+
+def get_window_boom_bust_players(db, window, include_injured=True, year=SEASON_YEAR,
+                                 min_games=DEFAULT_MIN_GAMES, min_projected=DEFAULT_MIN_PROJECTED,
+                                 position=None, team=None):
     '''
-    Returns:
-        booms: list of players with boom_score > 0
-        busts: list of players with boom_score < 0
+    Boom / bust over the last `window` days of game logs: boom_score is the
+    window average minus the season average, with the window's z-score and
+    boom / bust game rates alongside.
     '''
-    seen = set()
-    booms = []
-    busts = []
-
-    def process(col_name):
-        for doc in db.collection(col_name).stream():
-            p = doc.to_dict()
-            pid = p.get("playerId")
-            if pid is None or pid in seen:
-                continue
-            seen.add(pid)
-
-            if not include_injured and p.get("injured"):
-                continue
-
-            # min game filter
-            season = p.get("stats", {}).get(f"{year}_total", {})
-            total = season.get("total", {})
-            gp = total.get("GP", 0)
-            proj = p.get("projected_avg_points")
-            
-            if proj < 10:
-                continue
-
-            if gp < min_games:
-                continue
-
-            score = compute_boom_score(p)
-            if score is None:
-                continue
-
-            player_entry = {
-                "playerId": pid,
-                "name": p.get("name"),
-                "boom_score": score,
-                "avg_points": p.get("avg_points"),
-                "projected_avg_points": p.get("projected_avg_points"),
-                "position": p.get("position")
-            }
+    table = get_player_table(db)
+    engine = get_game_log_stats(db)
+    stats = engine.window(window)
 
-            if score > 0:
-                booms.append(player_entry)
-            elif score < 0:
-                busts.append(player_entry)
+    scores = stats["avg"] - engine.mean
 
-    process(TEAM_PLAYER_COL)
-    process(FREE_AGENTS_COL)
+    keep = ~np.isnan(scores)
+    keep &= stats["games"] >= MIN_WINDOW_GAMES
+    keep &= table.games_played(year) >= min_games  # min game filter
+    if min_projected is not None:
+        keep &= table.projected_avg_points >= min_projected  # NaN (no projection) never passes
+    if not include_injured:
+        keep &= ~table.is_injured
+    keep = _filter_rows(table, keep, position, team)
 
-    booms.sort(key=lambda r: r["boom_score"], reverse=True)
-    busts.sort(key=lambda r: r["boom_score"])
+    boom_rows = table.sorted_rows(scores, np.flatnonzero(keep & (scores > 0)))
+    bust_rows = table.sorted_rows(scores, np.flatnonzero(keep & (scores < 0)), descending=False)
+
+    booms = [_window_entry(table.players[i], float(scores[i]), stats, engine, i) for i in boom_rows]
+    busts = [_window_entry(table.players[i], float(scores[i]), stats, engine, i) for i in bust_rows]
     return booms, busts
-    
+
+
+def _season_boom_bust_players(db, include_injured, year, min_games, min_projected, position, team):
+    '''Season average vs projection, from the cron's view when it was built with these parameters.'''
+    view = get_materialized_view(db, BOOM_BUST_VIEW)
+    if (view is not None and view.get("year") == year and view.get("min_games") == min_games
+            and min_projected == DEFAULT_MIN_PROJECTED and team is None):
+        def _keep(r):
+            return (include_injured or not r.get("injured")) and (position is None or r.get("position") == position)
+        booms = [dict(r) for r in view.get("booms") or [] if _keep(r)]
+        busts = [dict(r) for r in view.get("busts") or [] if _keep(r)]
+        return booms, busts
+
+    table = get_player_table(db)
+
+    # boom score for the whole pool at once; NaN wherever either average is missing
+    scores = table.avg_points - table.projected_avg_points
+
+    keep = ~np.isnan(scores)
+    keep &= table.games_played(year) >= min_games  # min game filter
+    if min_projected is not None:
+        keep &= table.projected_avg_points >= min_projected
+    if not include_injured:
+        keep &= ~table.is_injured
+    keep = _filter_rows(table, keep, position, team)
+
+    boom_rows = table.sorted_rows(scores, np.flatnonzero(keep & (scores > 0)))
+    bust_rows = table.sorted_rows(scores, np.flatnonzero(keep & (scores < 0)), descending=False)
+
+    booms = [_boom_bust_entry(table.players[i], float(scores[i])) for i in boom_rows]
+    busts = [_boom_bust_entry(table.players[i], float(scores[i])) for i in bust_rows]
+    return booms, busts
+
+
+def get_boom_bust_players(db, include_injured=True, year=SEASON_YEAR, min_games=DEFAULT_MIN_GAMES, window=None,
+                          min_projected=DEFAULT_MIN_PROJECTED, position=None, team=None, cache=_query_cache):
+    '''
+    Returns:
+        booms: list of players with boom_score > 0
+        busts: list of players with boom_score < 0
+
+    With `window` (days), recent form from the game logs instead of the season
+    average vs projection; see get_window_boom_bust_players. min_projected=None
+    drops the projected-average floor; position / team (proTeam) narrow the pool.
+
+    Results are cached per snapshot version and parameters in `cache` (pass
+    None to always recompute); callers get their own lists and entry dicts,
+    so changing them never leaks into a later request.
+    '''
+    key = (get_player_store(db).snapshot_version, include_injured, year, min_games, window,
+           min_projected, position, team)
+    cached = cache.get(key) if cache is not None else None
+    if cached is None:
+        if window is not None:
+            cached = get_window_boom_bust_players(db, window, include_injured, year, min_games,
+                                                  min_projected, position, team)
+        else:
+            cached = _season_boom_bust_players(db, include_injured, year, min_games, min_projected, position, team)
+        if cache is not None:
+            cache.put(key, cached)
+    booms, busts = cached
+    return [dict(r) for r in booms], [dict(r) for r in busts]
 
 
 __all__ = [
+    "GameLogStats",
+    "QueryCache",
     "compute_boom_score",
-    "get_boom_bust_players"
+    "get_boom_bust_players",
+    "get_game_log_stats",
+    "get_window_boom_bust_players",
 ]
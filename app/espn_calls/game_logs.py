@@ -0,0 +1,149 @@
+import itertools
+import threading
+from typing import Dict, Iterable, Optional
+import numpy as np
+from .player_store import get_player_store
+from .player_table import get_player_table
+
+# Box score columns of GameLog.box, in this order
+STAT_COLUMNS = ("PTS", "REB", "AST", "STL", "BLK", "3PM", "FGM", "FGA", "FTM", "FTA", "TO", "MIN")
+STAT_INDEX = {stat: j for j, stat in enumerate(STAT_COLUMNS)}
+
+_generations = itertools.count(1)
+
+
+def _games(stats: Dict) -> Iterable:
+    """(scoring period, game dict) for the per-game entries of a player's `stats`."""
+    for key, game in (stats or {}).items():
+        if isinstance(key, str) and key.isdigit() and isinstance(game, dict):
+            yield int(key), game
+
+
+def _game_hash(period: int, game: Dict) -> int:
+    """Hash of the values GameLog keeps for one game, so stat corrections change it."""
+    total = game.get("total") or {}
+    values = (period, game.get("applied_total"), tuple(total.get(stat) for stat in STAT_COLUMNS))
+    try:
+        return hash(values)
+    except TypeError:  # unhashable stat value
+        return hash(repr(values))
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class GameLog:
+    """
+    Dense game logs for the whole pool. Row i belongs to the i-th entry of
+    `player_ids` (PlayerTable row order); column j is scoring period j + 1.
+
+    fp:        (n, periods) fantasy points (applied_total), 0 where no game
+    played:    (n, periods) bool, player has a box score for that period
+    box:       (n, periods, len(STAT_COLUMNS)) raw box score stats
+    scheduled: (n, schedule_periods) bool, player's team plays that period
+               (schedule_periods >= periods, it runs to the end of the season)
+    checksums: per row, sum of _game_hash over the player's games
+
+    Built from a `previous` log, players whose earlier periods are unchanged
+    (same checksum, so stat corrections count as changes) keep their old rows
+    and only the new periods are parsed. `extends` is the
+    previous log's generation when every row could be reused that way (the
+    scrape only appended periods), else None.
+    """
+
+    def __init__(self, player_ids, stats_by_id: Dict, schedules_by_id: Dict,
+                 previous: Optional["GameLog"] = None):
+        self.player_ids = list(player_ids)
+        self.generation = next(_generations)
+        n = len(self.player_ids)
+
+        games = [list(_games(stats_by_id.get(pid))) for pid in self.player_ids]
+        self.n_periods = max((p for g in games for p, _ in g), default=0)
+        sched_periods = [
+            [int(k) for k in (schedules_by_id.get(pid) or {}) if isinstance(k, str) and k.isdigit()]
+            for pid in self.player_ids
+        ]
+        self.n_schedule_periods = max(self.n_periods, max((p for s in sched_periods for p in s), default=0))
+
+        self.fp = np.zeros((n, self.n_periods))
+        self.played = np.zeros((n, self.n_periods), dtype=bool)
+        self.box = np.zeros((n, self.n_periods, len(STAT_COLUMNS)))
+        self.scheduled = np.zeros((n, self.n_schedule_periods), dtype=bool)
+
+        reusable = previous is not None and previous.n_periods <= self.n_periods
+        prev_rows = {pid: i for i, pid in enumerate(previous.player_ids)} if reusable else {}
+        self.checksums = [0] * n
+        appended = reusable and self.player_ids == previous.player_ids
+
+        for i, pid in enumerate(self.player_ids):
+            row_games = games[i]
+            hashes = [_game_hash(p, g) for p, g in row_games]
+            self.checksums[i] = sum(hashes)
+            start = 0
+            j = prev_rows.get(pid)
+            if j is not None and previous.checksums[j] == sum(
+                h for (p, _), h in zip(row_games, hashes) if p <= previous.n_periods
+            ):
+                # earlier periods unchanged -> copy them and only parse what's new
+                start = previous.n_periods
+                self.fp[i, :start] = previous.fp[j]
+                self.played[i, :start] = previous.played[j]
+                self.box[i, :start] = previous.box[j]
+                row_games = [(p, g) for p, g in row_games if p > start]
+            else:
+                appended = False
+
+            if row_games:
+                cols = np.fromiter((p - 1 for p, _ in row_games), dtype=np.intp, count=len(row_games))
+                self.fp[i, cols] = [_to_float(g.get("applied_total")) for _, g in row_games]
+                self.played[i, cols] = True
+                self.box[i, cols] = [
+                    [_to_float((g.get("total") or {}).get(stat)) for stat in STAT_COLUMNS] for _, g in row_games
+                ]
+
+            if sched_periods[i]:
+                self.scheduled[i, np.array(sched_periods[i], dtype=np.intp) - 1] = True
+
+        self.extends = previous.generation if appended else None
+
+    def __len__(self):
+        return len(self.player_ids)
+
+    def stat(self, name: str) -> np.ndarray:
+        """(n, periods) view of one box score column."""
+        return self.box[:, :, STAT_INDEX[name]]
+
+
+_previous_logs: Dict[int, tuple] = {}  # id(db) -> (db, last GameLog built for it)
+_previous_lock = threading.Lock()
+
+
+def get_game_log(db) -> GameLog:
+    """GameLog aligned with get_player_table(db), built once per snapshot (incrementally from the last one)."""
+    store = get_player_store(db)
+
+    def build():
+        table = get_player_table(db)
+        with _previous_lock:
+            prev_db, previous = _previous_logs.get(id(db), (None, None))
+        if prev_db is not db:
+            previous = None
+        log = GameLog(table.player_id, store.stats(), store.schedules(), previous=previous)
+        with _previous_lock:
+            _previous_logs[id(db)] = (db, log)
+        return log
+
+    return store.derived("game_log", build)
+
+
+def get_game_log_rows(db) -> Dict:
+    """playerId -> GameLog / PlayerTable row for the current snapshot."""
+    store = get_player_store(db)
+    return store.derived("game_log_rows", lambda: {pid: i for i, pid in enumerate(get_game_log(db).player_ids)})
+
+
+__all__ = ["GameLog", "get_game_log", "get_game_log_rows", "STAT_COLUMNS"]
@@ -0,0 +1,61 @@
+from typing import Dict
+from .player_store import get_player_store, META_COL
+
+LEAGUE_SETTINGS_DOC = "league_settings"
+
+# ESPN's default points league lineup, used when the cron hasn't stored the league's own
+DEFAULT_SLOT_COUNTS = {"PG": 1, "SG": 1, "SF": 1, "PF": 1, "C": 1, "G": 1, "F": 1, "UT": 3, "BE": 3, "IR": 1}
+
+# Lineup slots that don't score
+NON_STARTING_SLOTS = ("BE", "IR")
+
+# espn_api calls the utility slot "UT"; older docs / forms say "UTIL"
+SLOT_ALIASES = {"UTIL": "UT"}
+
+
+def normalize_slot(name) -> str:
+    """League slot name as espn_api spells it (UTIL -> UT)."""
+    return SLOT_ALIASES.get(name, name)
+
+
+def get_league_settings(db) -> Dict:
+    """meta/league_settings as the cron wrote it ({} when it hasn't)."""
+    store = get_player_store(db)
+
+    def build():
+        try:
+            snap = db.collection(META_COL).document(LEAGUE_SETTINGS_DOC).get()
+            return (snap.to_dict() or {}) if snap.exists else {}
+        except Exception:
+            return {}
+
+    return store.derived("league_settings", build)
+
+
+def _slot_counts(db) -> Dict[str, int]:
+    """Every lineup slot (bench and IR included) -> count, ESPN's default lineup when unknown."""
+    slots = {}
+    for name, count in (get_league_settings(db).get("lineup_slot_counts") or DEFAULT_SLOT_COUNTS).items():
+        if count:
+            slots[normalize_slot(name)] = slots.get(normalize_slot(name), 0) + int(count)
+    return slots
+
+
+def get_lineup_slots(db) -> Dict[str, int]:
+    """Starting slot -> count for the league."""
+    return {name: count for name, count in _slot_counts(db).items() if name not in NON_STARTING_SLOTS}
+
+
+def get_roster_size(db) -> int:
+    """Roster spots outside IR (starters + bench)."""
+    return sum(count for name, count in _slot_counts(db).items() if name != "IR")
+
+
+__all__ = [
+    "LEAGUE_SETTINGS_DOC",
+    "NON_STARTING_SLOTS",
+    "normalize_slot",
+    "get_league_settings",
+    "get_lineup_slots",
+    "get_roster_size",
+]
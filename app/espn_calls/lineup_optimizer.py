@@ -0,0 +1,139 @@
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from .game_logs import get_game_log_rows
+from .trade_finder import get_fantasy_rosters
+from .schedule_calls import get_week_periods
+from .weekly_projections import get_projection_matrix, resolve_week
+from .league_settings import get_lineup_slots, normalize_slot
+
+
+def _assign(points: np.ndarray, eligible: np.ndarray):
+    """
+    Max-points matching of players (rows) to slot instances (columns) for one
+    day: (player index, slot index) pairs. Ineligible pairs weigh 0 and players
+    without a game have 0 points, so dropping zero-weight pairs from the full
+    assignment leaves the best lineup.
+    """
+    active = np.flatnonzero(points > 0)
+    if len(active) == 0:
+        return []
+    weights = eligible[active] * points[active, None]
+    rows, cols = linear_sum_assignment(weights, maximize=True)
+    keep = weights[rows, cols] > 0
+    return list(zip(active[rows[keep]], cols[keep]))
+
+
+def _current_points(players: List[Dict], points: np.ndarray, slots: Dict[str, int]) -> np.ndarray:
+    """Per-day points of the lineup as set at scrape time (each slot counted at most `count` times)."""
+    used = Counter()
+    starters = []
+    for i, p in enumerate(players):
+        slot = normalize_slot(p.get("lineupSlot"))
+        if slot in slots and used[slot] < slots[slot]:
+            used[slot] += 1
+            starters.append(i)
+    return points[starters].sum(axis=0) if starters else np.zeros(points.shape[1])
+
+
+def _optimize_team(team: Dict, matrix, rows: Dict, slots: Dict[str, int], first: int, last: int) -> Dict:
+    slot_names = [name for name, count in slots.items() for _ in range(count)]
+    players = [
+        p for p in team["players"]
+        if p.get("playerId") in rows and normalize_slot(p.get("lineupSlot")) != "IR"
+    ]
+    player_rows = np.array([rows[p["playerId"]] for p in players], dtype=np.intp)
+    eligible = np.array([
+        [name in {normalize_slot(s) for s in (p.get("eligibleSlots") or [])} for name in slot_names] for p in players
+    ], dtype=float).reshape(len(players), len(slot_names))
+
+    # (players, days) projected points for the window, straight from the snapshot's matrix
+    days = range(first, last + 1)
+    cols = np.arange(first - 1, min(last, matrix.points.shape[1]))
+    points = np.zeros((len(players), len(days)))
+    if len(players) and len(cols):
+        points[:, :len(cols)] = matrix.points[np.ix_(player_rows, cols)]
+
+    current = _current_points(players, points, slots)
+    lineups = []
+    for d, period in enumerate(days):
+        assigned = _assign(points[:, d], eligible)
+        started = {i for i, _ in assigned}
+        lineup = [
+            {
+                "slot": slot_names[s],
+                "playerId": players[i].get("playerId"),
+                "name": players[i].get("name"),
+                "projected_points": float(points[i, d]),
+            }
+            for i, s in sorted(assigned, key=lambda a: a[1])
+        ]
+        bench = [
+            {"playerId": players[i].get("playerId"), "name": players[i].get("name"),
+             "projected_points": float(points[i, d])}
+            for i in np.flatnonzero(points[:, d] > 0) if i not in started
+        ]
+        total = float(sum(r["projected_points"] for r in lineup))
+        lineups.append({
+            "period": period,
+            "date": matrix.period_date(period),
+            "lineup": lineup,
+            "bench": bench,
+            "projected_points": total,
+            "current_lineup_points": float(current[d]),
+        })
+
+    optimal = sum(day["projected_points"] for day in lineups)
+    as_set = float(current.sum())
+    return {
+        "team_id": team["team_id"],
+        "team_name": team["team_name"],
+        "days": lineups,
+        "projected_points": optimal,
+        "current_lineup_points": as_set,
+        "gain": optimal - as_set,
+    }
+
+
+def optimize_lineups(db, team_id=None, week: Optional[int] = None, period: Optional[int] = None,
+                     now: Optional[datetime] = None) -> Dict:
+    """
+    Best daily start/sit lineups for the rest of a matchup week (default: the
+    current one), for one fantasy team or all of them.
+
+    Each day is an assignment problem: the players with a game that day against
+    the league's starting slot instances, weighted by the player's projected
+    points when they're eligible for the slot. Also reports what the lineup as
+    set at scrape time would score, and the gain over it.
+    """
+    matrix = get_projection_matrix(db)
+    window = resolve_week(matrix, get_week_periods(db), week, period, now)
+    if "error" in window:
+        return window
+
+    rosters = get_fantasy_rosters(db)
+    if team_id is not None:
+        match = next((t for t in rosters if str(t) == str(team_id)), None)
+        if match is None:
+            return {"error": f"Unknown team: {team_id}",
+                    "teams": [{"team_id": t, "team_name": r["team_name"]} for t, r in rosters.items()]}
+        rosters = {match: rosters[match]}
+
+    rows = get_game_log_rows(db)
+    slots = get_lineup_slots(db)
+    # only the days nobody has box scores for yet can still be set
+    first = max(window["current_period"], window["first_period"], matrix.n_periods + 1)
+    teams = [_optimize_team(team, matrix, rows, slots, first, window["last_period"]) for team in rosters.values()]
+
+    return {
+        "week": window["week"],
+        "first_period": first,
+        "last_period": window["last_period"],
+        "slots": slots,
+        "teams": teams,
+    }
+
+
+__all__ = ["optimize_lineups"]
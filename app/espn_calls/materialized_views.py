@@ -0,0 +1,47 @@
+from typing import Dict, Optional
+from .player_store import get_player_store
+
+# Collection written by espn_cron/materialize.py, one doc per view
+VIEWS_COL = "views"
+
+RANKINGS_VIEW = "rankings"
+BOOM_BUST_VIEW = "boom_bust"
+INJURED_VIEW = "injured"
+TEAM_SCHEDULES_VIEW = "team_schedules"
+
+
+def get_materialized_view(db, name: str) -> Optional[Dict]:
+    """
+    Precomputed view written by the cron for the current snapshot, or None.
+
+    A view is only used when its version matches meta/snapshot, so a view left
+    over from an older scrape (or a half-finished one) is never served; callers
+    fall back to computing from the player docs. One doc read per view per snapshot.
+    """
+    if db is None:
+        return None
+    store = get_player_store(db)
+
+    def build():
+        version = store.snapshot_version
+        try:
+            snap = db.collection(VIEWS_COL).document(name).get()
+        except Exception:
+            return None
+        if not snap.exists:
+            return None
+        view = snap.to_dict() or {}
+        if str(view.get("version")) != version:
+            return None
+        return view
+
+    return store.derived(("view", name), build)
+
+
+__all__ = [
+    "get_materialized_view",
+    "RANKINGS_VIEW",
+    "BOOM_BUST_VIEW",
+    "INJURED_VIEW",
+    "TEAM_SCHEDULES_VIEW",
+]
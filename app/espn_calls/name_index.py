@@ -0,0 +1,132 @@
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+from .player_store import get_player_store, SUMMARY_FIELDS
+
+# Match tiers, best first
+EXACT_MATCH = 0       # "lebron james" -> "LeBron James"
+NAME_PREFIX_MATCH = 1 # "lebron ja"
+TOKEN_PREFIX_MATCH = 2  # "james leb" (every query token starts some name token)
+SUBSTRING_MATCH = 3   # "bron" (old linear-scan behaviour)
+
+NGRAM_SIZE = 3
+
+_PUNCT_RE = re.compile(r"[^a-z0-9 ]+")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_name(name) -> str:
+    """Lowercase, strip accents/punctuation and collapse whitespace ("P.J. Tucker" -> "pj tucker")."""
+    if not isinstance(name, str):
+        return ""
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(c for c in name if not unicodedata.combining(c)).lower()
+    name = _PUNCT_RE.sub("", name.replace("-", " "))
+    return _SPACE_RE.sub(" ", name).strip()
+
+
+def _ngrams(s: str) -> set:
+    return {s[i:i + NGRAM_SIZE] for i in range(len(s) - NGRAM_SIZE + 1)}
+
+
+class NameIndex:
+    """
+    Prebuilt player name index: token prefixes for type-ahead plus character
+    n-grams for substring queries. Built once per PlayerStore snapshot.
+    """
+
+    def __init__(self, players: List[Dict]):
+        self.players = players
+        self.names = [normalize_name(p.get("name")) for p in players]
+        self._prefixes = defaultdict(set)  # token prefix -> row ids
+        self._ngrams = defaultdict(set)    # n-gram of the full name -> row ids
+
+        for row, name in enumerate(self.names):
+            if not name:
+                continue
+            for token in name.split(" "):
+                for end in range(1, len(token) + 1):
+                    self._prefixes[token[:end]].add(row)
+            for gram in _ngrams(name):
+                self._ngrams[gram].add(row)
+
+    def _candidates(self, q: str) -> set:
+        tokens = q.split(" ")
+        rows = None
+        for token in tokens:
+            hits = self._prefixes.get(token, set())
+            rows = hits if rows is None else rows & hits
+            if not rows:
+                break
+        if rows:
+            return rows
+
+        # no token-prefix hit -> fall back to substring search, narrowed by n-grams
+        if len(q) < NGRAM_SIZE:
+            return set()
+        rows = None
+        for gram in _ngrams(q):
+            hits = self._ngrams.get(gram, set())
+            rows = hits if rows is None else rows & hits
+            if not rows:
+                return set()
+        return rows
+
+    def _tier(self, q: str, name: str) -> Optional[int]:
+        if name == q:
+            return EXACT_MATCH
+        if name.startswith(q):
+            return NAME_PREFIX_MATCH
+        name_tokens = name.split(" ")
+        if all(any(t.startswith(qt) for t in name_tokens) for qt in q.split(" ")):
+            return TOKEN_PREFIX_MATCH
+        if q in name:
+            return SUBSTRING_MATCH
+        return None
+
+    def search(self, query, limit: Optional[int] = 10) -> List[Dict]:
+        """
+        Players matching `query`, best first: by match tier, then higher
+        avg_points (the more relevant player for an ambiguous "james"), then name.
+        """
+        q = normalize_name(query)
+        if not q:
+            return []
+
+        ranked = []
+        for row in self._candidates(q):
+            tier = self._tier(q, self.names[row])
+            if tier is None:
+                continue
+            avg = self.players[row].get("avg_points") or 0
+            ranked.append((tier, -avg, self.names[row], row))
+        ranked.sort()
+        if limit:
+            ranked = ranked[:limit]
+        return [self.players[r[-1]] for r in ranked]
+
+    def resolve(self, query) -> Optional[Dict]:
+        """Best single match for `query`, or None."""
+        hits = self.search(query, limit=1)
+        return hits[0] if hits else None
+
+    def resolve_many(self, queries: Iterable) -> Dict[str, Optional[Dict]]:
+        """Resolve a batch of names in one pass; duplicate names are only looked up once."""
+        resolved = {}
+        by_norm = {}
+        for query in queries:
+            q = normalize_name(query)
+            if q not in by_norm:
+                by_norm[q] = self.resolve(q)
+            resolved[query] = by_norm[q]
+        return resolved
+
+
+def get_name_index(db) -> NameIndex:
+    """NameIndex for the current PlayerStore snapshot."""
+    store = get_player_store(db)
+    return store.derived("name_index", lambda: NameIndex(store.unique_players(SUMMARY_FIELDS)))
+
+
+__all__ = ["NameIndex", "normalize_name", "get_name_index"]
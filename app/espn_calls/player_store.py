@@ -0,0 +1,335 @@
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Collections
+TEAM_PLAYER_COL = "team_players"
+FREE_AGENTS_COL = "free_agents"
+PLAYER_COLLECTIONS = (TEAM_PLAYER_COL, FREE_AGENTS_COL)
+
+# Split layout (see espn_cron/main.py): one doc per player, doc id = playerId,
+# holding the heavy `stats` / `schedule` dicts that are left out of the player doc
+PLAYER_STATS_COL = "player_stats"
+PLAYER_SCHEDULES_COL = "player_schedules"
+SPLIT_LAYOUT = "split"
+
+# Written last by every scrape: {"version": "<scrape timestamp>", ...}
+META_COL = "meta"
+SNAPSHOT_DOC = "snapshot"
+
+# Player docs only change when the ESPN cron runs (every ~11 days),
+# so serving a snapshot that is a few minutes old is fine
+DEFAULT_TTL_SECONDS = 300
+
+# Season the cron scrapes (League(year=2026) in espn_cron/main.py)
+SEASON_YEAR = 2026
+
+
+def season_total_path(year: int = SEASON_YEAR) -> str:
+    """Field path of a season's totals inside `stats` (keys starting with a digit need backticks)."""
+    return f"stats.`{year}_total`"
+
+
+# Scalar fields the list views (rankings, boom/bust, injured, trade, search,
+# regression) read. Projecting to these keeps the per-period `stats` box scores
+# and the `schedule` dict off the wire. `stats` in a summary doc only holds the
+# current season's totals.
+SUMMARY_FIELDS = (
+    "name",
+    "playerId",
+    "detail_layout",
+    "position",
+    "proTeam",
+    "posRank",
+    "injured",
+    "injuryStatus",
+    "eligibleSlots",
+    "lineupSlot",
+    "acquisitionType",
+    "avg_points",
+    "projected_avg_points",
+    "total_points",
+    "projected_total_points",
+    "games_played",
+    "teamId",
+    "teamName",
+    season_total_path(),
+)
+
+
+def _fields_key(fields: Optional[Iterable[str]]):
+    """Cache key for a projection; None means full documents."""
+    return None if fields is None else tuple(sorted(set(fields)))
+
+
+class PlayerStore:
+    """
+    In-process snapshot of team_players + free_agents shared by every route.
+
+    Both collections are streamed once and kept for `ttl` seconds. After that
+    the next read checks meta/snapshot (one doc read): if the cron hasn't
+    published a new version the cached data is kept for another `ttl`,
+    otherwise it's reloaded. `invalidate()` forces a reload right away.
+
+    Every read takes an optional `fields` projection (e.g. SUMMARY_FIELDS)
+    that is applied server-side with select(), so views that only need scalar
+    fields never download `stats` / `schedule`. Each projection is cached
+    separately; once full documents are loaded they serve every projection.
+
+    The player dicts are shared between requests, so callers must treat
+    them as read-only and copy anything they want to change.
+    """
+
+    def __init__(self, db, ttl: float = DEFAULT_TTL_SECONDS):
+        self.db = db
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._projections: Dict[object, Dict[str, List[Dict]]] = {}
+        self._started_at: Optional[float] = None
+        self._version = 0
+        self._data_version = None
+        self._derived: Dict[object, object] = {}
+
+    def _read_data_version(self):
+        try:
+            snap = self.db.collection(META_COL).document(SNAPSHOT_DOC).get()
+        except Exception:
+            return None
+        return (snap.to_dict() or {}).get("version") if snap.exists else None
+
+    def _refresh_if_stale(self):
+        now = time.monotonic()
+        if self._started_at is not None and (now - self._started_at) <= self.ttl:
+            return
+
+        data_version = self._read_data_version()
+        if self._started_at is not None and data_version is not None and data_version == self._data_version:
+            # no scrape since we loaded -> keep the cached snapshot for another ttl
+            self._started_at = now
+            return
+
+        self._projections = {}
+        self._derived = {}
+        self._started_at = now
+        self._version += 1
+        self._data_version = data_version
+
+    def _load(self, fields) -> Dict[str, List[Dict]]:
+        collections = {}
+        for col in PLAYER_COLLECTIONS:
+            q = self.db.collection(col)
+            if fields is not None:
+                q = q.select(list(fields))
+            collections[col] = [doc.to_dict() for doc in q.stream()]
+        return collections
+
+    def _snapshot(self, fields=None) -> Dict[str, List[Dict]]:
+        key = _fields_key(fields)
+        with self._lock:
+            self._refresh_if_stale()
+            if None in self._projections:
+                return self._projections[None]
+            if key not in self._projections:
+                # only cached once both collections loaded successfully
+                self._projections[key] = self._load(key)
+            return self._projections[key]
+
+    def invalidate(self):
+        """Drop every cached projection so the next read goes back to Firestore."""
+        with self._lock:
+            self._started_at = None
+
+    @property
+    def version(self) -> int:
+        """Increments every time the cached snapshot is thrown away and reloaded."""
+        with self._lock:
+            self._refresh_if_stale()
+            return self._version
+
+    @property
+    def snapshot_version(self) -> str:
+        """
+        The scrape version from meta/snapshot, or a per-process generation id
+        when no scrape has published one. Use this to key anything cached
+        across snapshots (models, query caches, ...).
+        """
+        with self._lock:
+            self._refresh_if_stale()
+            if self._data_version is not None:
+                return str(self._data_version)
+            return f"local-{self._version}"
+
+    def collection(self, col_name: str, fields: Optional[Iterable[str]] = None) -> List[Dict]:
+        return self._snapshot(fields).get(col_name, [])
+
+    def team_players(self, fields: Optional[Iterable[str]] = None) -> List[Dict]:
+        return self.collection(TEAM_PLAYER_COL, fields)
+
+    def free_agents(self, fields: Optional[Iterable[str]] = None) -> List[Dict]:
+        return self.collection(FREE_AGENTS_COL, fields)
+
+    def all_players(self, fields: Optional[Iterable[str]] = None) -> List[Dict]:
+        """team_players followed by free_agents (may contain the same playerId twice)."""
+        return self.derived(
+            ("all_players", _fields_key(fields)),
+            lambda: self.team_players(fields) + self.free_agents(fields),
+        )
+
+    def unique_players(self, fields: Optional[Iterable[str]] = None) -> List[Dict]:
+        """all_players() with players missing a playerId or already seen dropped."""
+        def build():
+            seen = set()
+            players = []
+            for p in self.all_players(fields):
+                pid = p.get("playerId")
+                if pid is None or pid in seen:
+                    continue
+                seen.add(pid)
+                players.append(p)
+            return players
+        return self.derived(("unique_players", _fields_key(fields)), build)
+
+    def id_index(self, fields: Optional[Iterable[str]] = None) -> Dict:
+        """playerId -> player dict (first occurrence wins, team_players before free_agents)."""
+        def build():
+            index = {}
+            for p in self.all_players(fields):
+                pid = p.get("playerId") or p.get("id")
+                if pid is not None and pid not in index:
+                    index[pid] = p
+            return index
+        return self.derived(("id_index", _fields_key(fields)), build)
+
+    def get_players_by_ids(self, ids: Iterable, fields: Optional[Iterable[str]] = None) -> Tuple[Dict, List]:
+        """
+        Keyed lookup of the requested players only.
+
+        Returns (found, missing): found maps each requested id to its player dict,
+        missing lists the requested ids with no player in the snapshot. Numeric
+        strings (e.g. from a form or JSON body) also match integer playerIds.
+        """
+        index = self.id_index(fields)
+        found = {}
+        missing = []
+        for pid in ids:
+            if pid is None or pid in found:
+                continue
+            p = index.get(pid)
+            if p is None and isinstance(pid, str) and pid.strip().isdigit():
+                p = index.get(int(pid))
+            if p is None:
+                missing.append(pid)
+            else:
+                found[pid] = p
+        return found, missing
+
+    def fetch_player(self, player_id, fields: Optional[Iterable[str]] = None) -> Optional[Dict]:
+        """
+        One player's document read with a playerId filter instead of loading the
+        whole pool, e.g. to get a single player's schedule. Served from the
+        cached full snapshot when that is already loaded.
+        """
+        if player_id is None:
+            return None
+        key = _fields_key(fields)
+
+        def build():
+            if None in self._projections:
+                return self.id_index().get(player_id)
+            for col in PLAYER_COLLECTIONS:
+                q = self.db.collection(col).where("playerId", "==", player_id)
+                if key is not None:
+                    q = q.select(list(key))
+                for doc in q.limit(1).stream():
+                    return doc.to_dict()
+            return None
+        return self.derived(("player", player_id, key), build)
+
+    def _details(self, field: str, detail_col: str) -> Dict:
+        """playerId -> `field` dict for every player, from whichever layout the docs use."""
+        def build():
+            details = {}
+            split = False
+            for p in self.all_players(("playerId", "detail_layout", field)):
+                pid = p.get("playerId")
+                if p.get("detail_layout") == SPLIT_LAYOUT:
+                    split = True
+                elif pid is not None and pid not in details:
+                    details[pid] = p.get(field) or {}
+            if split:
+                for doc in self.db.collection(detail_col).stream():
+                    d = doc.to_dict()
+                    details.setdefault(d.get("playerId"), d.get(field) or {})
+            return details
+        return self.derived(("details", field), build)
+
+    def _player_detail(self, field: str, detail_col: str, player_id) -> Dict:
+        def build():
+            if ("details", field) in self._derived:
+                return self._derived[("details", field)].get(player_id) or {}
+            summary = self.id_index(SUMMARY_FIELDS).get(player_id)
+            if summary is not None and summary.get("detail_layout") == SPLIT_LAYOUT:
+                snap = self.db.collection(detail_col).document(str(player_id)).get()
+                return ((snap.to_dict() or {}).get(field) or {}) if snap.exists else {}
+            p = self.fetch_player(player_id, ("playerId", field))
+            return (p or {}).get(field) or {}
+        return self.derived(("detail", field, player_id), build)
+
+    def schedules(self) -> Dict:
+        """playerId -> schedule dict for the whole pool (inline or split layout)."""
+        return self._details("schedule", PLAYER_SCHEDULES_COL)
+
+    def stats(self) -> Dict:
+        """playerId -> per-period stats dict for the whole pool (inline or split layout)."""
+        return self._details("stats", PLAYER_STATS_COL)
+
+    def player_schedule(self, player_id) -> Dict:
+        """One player's schedule, loaded on demand (a single doc read in the split layout)."""
+        return self._player_detail("schedule", PLAYER_SCHEDULES_COL, player_id)
+
+    def player_stats(self, player_id) -> Dict:
+        """One player's per-period stats, loaded on demand."""
+        return self._player_detail("stats", PLAYER_STATS_COL, player_id)
+
+    def derived(self, key, builder: Callable[[], object]):
+        """
+        Memoize something computed from the current snapshot (indexes, tables, ...).
+        Everything stored here is thrown away when the snapshot reloads.
+        """
+        with self._lock:
+            self._refresh_if_stale()
+            if key not in self._derived:
+                self._derived[key] = builder()
+            return self._derived[key]
+
+
+_stores: Dict[int, PlayerStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_player_store(db, ttl: float = DEFAULT_TTL_SECONDS) -> PlayerStore:
+    """Return the process-wide PlayerStore for `db`, creating it on first use."""
+    with _stores_lock:
+        store = _stores.get(id(db))
+        if store is None or store.db is not db:
+            store = PlayerStore(db, ttl=ttl)
+            _stores[id(db)] = store
+        return store
+
+
+def invalidate_player_store(db=None):
+    """Invalidate the store for `db`, or every store when `db` is None."""
+    with _stores_lock:
+        stores = list(_stores.values()) if db is None else [_stores.get(id(db))]
+    for store in stores:
+        if store is not None:
+            store.invalidate()
+
+
+__all__ = [
+    "SUMMARY_FIELDS",
+    "season_total_path",
+    "PlayerStore",
+    "get_player_store",
+    "invalidate_player_store",
+]
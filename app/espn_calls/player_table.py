@@ -0,0 +1,181 @@
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from .player_store import (
+    get_player_store,
+    season_total_path,
+    SEASON_YEAR,
+    SUMMARY_FIELDS,
+    TEAM_PLAYER_COL,
+)
+
+# Column order of PlayerTable.numeric. The first three columns are the waiver
+# regression features so PlayerTable.features() can hand out a view of them.
+FEATURE_FIELDS = ("projected_avg_points", "posRank", "injured")
+NUMERIC_FIELDS = FEATURE_FIELDS + (
+    "avg_points",
+    "total_points",
+    "projected_total_points",
+)
+
+
+def _to_float(value) -> float:
+    """None / non-numeric -> NaN so missing values survive the trip into a float array."""
+    if value is None:
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _categorical(values: List[str]):
+    """Encode strings as (codes, labels); missing values get code -1."""
+    labels = sorted({v for v in values if v})
+    lookup = {label: i for i, label in enumerate(labels)}
+    codes = np.fromiter((lookup.get(v, -1) for v in values), dtype=np.int32, count=len(values))
+    return codes, labels
+
+
+def top_k_indices(values: np.ndarray, k: Optional[int], descending: bool = True) -> np.ndarray:
+    """
+    Positions of the k largest (smallest) values, best first, with ties in
+    index order -- the same result as a stable argsort cut to k, but found
+    with np.partition instead of sorting everything. k=None keeps every value.
+    """
+    n = len(values)
+    keys = -values if descending else values
+    if k is None or k >= n:
+        return np.argsort(keys, kind="stable")
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    kth = np.partition(keys, k - 1)[k - 1]
+    better = np.flatnonzero(keys < kth)
+    ties = np.flatnonzero(keys == kth)[:k - len(better)]
+    idx = np.sort(np.concatenate([better, ties]))
+    return idx[np.argsort(keys[idx], kind="stable")]
+
+
+class PlayerTable:
+    """
+    Columnar view of the player pool: one NumPy array per numeric field plus
+    categorical codes for position and proTeam. Row i of every array belongs to
+    `players[i]`, the original Firestore dict.
+    """
+
+    def __init__(self, players: List[Dict], rostered_ids: Optional[set] = None,
+                 load_fields: Optional[Callable[[tuple], List[Dict]]] = None):
+        self.players = players
+        self._load_fields = load_fields
+        n = len(players)
+
+        self.numeric = np.empty((n, len(NUMERIC_FIELDS)), dtype=float)
+        for i, p in enumerate(players):
+            self.numeric[i] = [_to_float(p.get(f)) for f in NUMERIC_FIELDS]
+
+        for j, field in enumerate(NUMERIC_FIELDS):
+            setattr(self, field, self.numeric[:, j])
+
+        self.player_id = np.array([p.get("playerId") for p in players], dtype=object)
+        self.name = np.array([p.get("name") for p in players], dtype=object)
+        self.is_injured = np.nan_to_num(self.injured) != 0
+
+        rostered_ids = rostered_ids or set()
+        self.rostered = np.fromiter((p.get("playerId") in rostered_ids for p in players), dtype=bool, count=n)
+
+        self.position_codes, self.positions = _categorical([p.get("position") for p in players])
+        self.pro_team_codes, self.pro_teams = _categorical([p.get("proTeam") or p.get("team") for p in players])
+        # eligibleSlots lists encoded like position: few distinct lists, one code per row
+        self.slot_codes, slot_lists = _categorical([",".join(p.get("eligibleSlots") or []) for p in players])
+        self.slot_lists = [set(s.split(",")) for s in slot_lists]
+
+        self._games_played = {}
+
+    def __len__(self):
+        return len(self.players)
+
+    def position_mask(self, position: Optional[str]) -> np.ndarray:
+        """Rows whose position equals `position` (all rows when position is None)."""
+        if position is None:
+            return np.ones(len(self), dtype=bool)
+        if position not in self.positions:
+            return np.zeros(len(self), dtype=bool)
+        return self.position_codes == self.positions.index(position)
+
+    def slot_mask(self, slot: str) -> np.ndarray:
+        """Rows whose eligibleSlots include `slot` (False for rows without eligibleSlots)."""
+        lookup = np.array([slot in s for s in self.slot_lists] + [False], dtype=bool)
+        return lookup[self.slot_codes]
+
+    def games_played(self, year: int) -> np.ndarray:
+        """GP from stats["<year>_total"]["total"], 0 when missing."""
+        if year not in self._games_played:
+            key = f"{year}_total"
+            source = self.players
+            if year != SEASON_YEAR and self._load_fields is not None:
+                # summary docs only carry the current season's totals
+                by_id = {p.get("playerId"): p for p in self._load_fields(("playerId", season_total_path(year)))}
+                source = [by_id.get(p.get("playerId"), {}) for p in self.players]
+            gp = np.zeros(len(self), dtype=float)
+            for i, p in enumerate(source):
+                season = (p.get("stats") or {}).get(key) or {}
+                gp[i] = _to_float((season.get("total") or {}).get("GP", 0))
+            self._games_played[year] = np.nan_to_num(gp)
+        return self._games_played[year]
+
+    def season_totals(self, stats) -> np.ndarray:
+        """(rows, stats) current-season box score totals from the summary docs, 0 when missing."""
+        out = np.zeros((len(self), len(stats)), dtype=float)
+        key = f"{SEASON_YEAR}_total"
+        for i, p in enumerate(self.players):
+            total = (((p.get("stats") or {}).get(key) or {}).get("total") or {})
+            out[i] = [_to_float(total.get(stat, 0)) for stat in stats]
+        return np.nan_to_num(out)
+
+    def features(self):
+        """
+        Regression features (projected_avg_points, posRank, injured) and target (avg_points).
+
+        Returns (X, y, rows): X is a view into `numeric` when no row has a missing
+        value, rows are the table indices that made it into X.
+        """
+        X = self.numeric[:, :len(FEATURE_FIELDS)]
+        y = self.avg_points
+        valid = ~np.isnan(X).any(axis=1) & ~np.isnan(y)
+        if valid.all():
+            return X, y, np.arange(len(self))
+        rows = np.flatnonzero(valid)
+        return X[rows], y[rows], rows
+
+    def sorted_rows(self, key: np.ndarray, rows: Optional[np.ndarray] = None, descending: bool = True) -> np.ndarray:
+        """Table indices ordered by `key` (stable, so ties keep snapshot order)."""
+        if rows is None:
+            rows = np.arange(len(self))
+        k = key[rows]
+        order = np.argsort(-k if descending else k, kind="stable")
+        return rows[order]
+
+
+    def top_rows(self, key: np.ndarray, n: Optional[int], rows: Optional[np.ndarray] = None,
+                 descending: bool = True) -> np.ndarray:
+        """sorted_rows(key, rows, descending)[:n] without sorting the whole pool."""
+        if rows is None:
+            rows = np.arange(len(self))
+        return rows[top_k_indices(key[rows], n, descending)]
+
+
+def get_player_table(db) -> PlayerTable:
+    """PlayerTable for the current PlayerStore snapshot, built once per snapshot."""
+    store = get_player_store(db)
+
+    def build():
+        rostered_ids = {p.get("playerId") for p in store.collection(TEAM_PLAYER_COL, SUMMARY_FIELDS)}
+        return PlayerTable(
+            store.unique_players(SUMMARY_FIELDS),
+            rostered_ids=rostered_ids,
+            load_fields=store.unique_players,
+        )
+
+    return store.derived("player_table", build)
+
+
+__all__ = ["PlayerTable", "get_player_table", "top_k_indices"]
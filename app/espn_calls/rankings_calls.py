@@ -1,57 +1,149 @@
 from typing import List, Dict, Optional
+import numpy as np
+from .player_store import get_player_store
+from .player_table import get_player_table
+from .weekly_projections import get_projection_matrix
+from .materialized_views import get_materialized_view, RANKINGS_VIEW
 
-# Collections
-TEAM_PLAYER_COL = "team_players"
-FREE_AGENTS_COL = "free_agents"
+# generate_player_rankings(by=...) modes
+RANKING_MODES = ("avg_points", "total_points", "projected_avg_points", "category", "ros_value")
+
+# 9-cat categories from the game logs' box scores; FG% / FT% are weighted by
+# attempts, and turnovers count against a player
+CATEGORIES = ("PTS", "REB", "AST", "STL", "BLK", "3PM", "FG%", "FT%", "TO")
+PERCENT_CATEGORIES = {"FG%": ("FGM", "FGA"), "FT%": ("FTM", "FTA")}
+NEGATIVE_CATEGORIES = ("TO",)
 
 
 def get_all_players(db) -> List[Dict]:
     """Return all players from DB collections (team_players + free_agents)."""
-    players = []
     if db is None:
-        return players
-    try:
-        q = db.collection(TEAM_PLAYER_COL)
-        for doc in q.stream():
-            players.append(doc.to_dict())
-    except Exception:
-        pass
+        return []
     try:
-        q = db.collection(FREE_AGENTS_COL)
-        for doc in q.stream():
-            players.append(doc.to_dict())
+        return list(get_player_store(db).all_players())
     except Exception:
-        pass
-    return players
+        return []
+
+
+def _ranking_row(p: Dict) -> Dict:
+    return {
+        "playerId": p.get("playerId") or p.get("id"),
+        "name": p.get("name"),
+        "position": p.get("position"),
+        "proTeam": p.get("proTeam") or p.get("team"),
+        "posRank": p.get("posRank"),
+        "avg_points": p.get("avg_points"),
+        "projected_avg_points": p.get("projected_avg_points"),
+        "total_points": p.get("total_points") or p.get("points"),
+        "projected_total_points": p.get("projected_total_points"),
+        "games_played": p.get("games_played") or p.get("gamesPlayed"),
+    }
+
+
+def _avg_rank_value(row: Dict) -> float:
+    """The avg_points ranking key for one row, as _ranking_key computes it over the table."""
+    for field in ("avg_points", "projected_avg_points"):
+        try:
+            return float(row[field])
+        except (KeyError, TypeError, ValueError):
+            continue
+    return 0.0
+
+
+def _category_z(db) -> np.ndarray:
+    """
+    (players, CATEGORIES) per-game z-scores against everyone with a game,
+    NaN for players without one. Built once per snapshot from the season
+    totals in the summary docs, so it never loads the per-game stats.
+    """
+    def build():
+        stats = ("GP", "PTS", "REB", "AST", "STL", "BLK", "3PM", "FGM", "FGA", "FTM", "FTA", "TO")
+        season = get_player_table(db).season_totals(stats)
+        totals = dict(zip(stats, season.T))
+        games = totals["GP"]
+        played = games > 0
+        per_game = np.full((len(games), len(CATEGORIES)), np.nan)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            for j, cat in enumerate(CATEGORIES):
+                if cat in PERCENT_CATEGORIES:
+                    made, attempts = (totals[stat] for stat in PERCENT_CATEGORIES[cat])
+                    # percentage impact: makes above the pool's rate, per game
+                    rate = made[played].sum() / attempts[played].sum()
+                    per_game[:, j] = (made - rate * attempts) / games
+                else:
+                    per_game[:, j] = totals[cat] / games
+            mean = np.nanmean(per_game[played], axis=0) if played.any() else np.zeros(len(CATEGORIES))
+            std = np.nanstd(per_game[played], axis=0) if played.any() else np.ones(len(CATEGORIES))
+            z = (per_game - mean) / np.where(std > 0, std, 1.0)
+        z[:, [CATEGORIES.index(cat) for cat in NEGATIVE_CATEGORIES]] *= -1
+        return z
+
+    return get_player_store(db).derived("category_z", build)
+
+
+def _ranking_key(db, table, by: str, remaining_games: Optional[int]):
+    """(value per row, extra row fields fn) for one ranking mode; NaN values rank last."""
+    if by == "avg_points":
+        # avg_points, falling back to projected avg (or 0) for players with no season average
+        key = np.where(np.isnan(table.avg_points), np.nan_to_num(table.projected_avg_points), table.avg_points)
+        return key, None
+    if by == "total_points":
+        return table.total_points, None
+    if by == "projected_avg_points":
+        return np.where(np.isnan(table.projected_avg_points), table.avg_points, table.projected_avg_points), None
+    if by == "category":
+        z = _category_z(db)
+        return z.sum(axis=1), lambda i: {"category_z": dict(zip(CATEGORIES, (float(v) for v in z[i])))}
+    if by == "ros_value":
+        # per-game projection x the games left on the player's NBA team schedule
+        matrix = get_projection_matrix(db)
+        games = matrix.player_games(matrix.current_period(), matrix.n_schedule_periods)
+        if remaining_games is not None:
+            games = np.minimum(games, remaining_games)
+        return matrix.projection * games, lambda i: {"remaining_games": int(games[i])}
+    raise ValueError(f"Unknown ranking: {by} (expected one of {', '.join(RANKING_MODES)})")
 
 
 def generate_player_rankings(db, by: str = "avg_points", position: Optional[str] = None,
                              top_n: Optional[int] = None, remaining_games: Optional[int] = None) -> List[Dict]:
-    players = get_all_players(db)
-    if position is not None:
-        players = [p for p in players if p.get("position") == position]
-    results = []
-    for p in players:
-        results.append({
-            "playerId": p.get("playerId") or p.get("id"),
-            "name": p.get("name"),
-            "position": p.get("position"),
-            "proTeam": p.get("proTeam") or p.get("team"),
-            "posRank": p.get("posRank"),
-            "avg_points": p.get("avg_points"),
-            "projected_avg_points": p.get("projected_avg_points"),
-            "total_points": p.get("total_points") or p.get("points"),
-            "projected_total_points": p.get("projected_total_points"),
-            "games_played": p.get("games_played") or p.get("gamesPlayed"),
-        })
-
-    def _sort_key(x):
-        return x["avg_points"] if x["avg_points"] is not None else (x["projected_avg_points"] or 0)
-
-    results = sorted(results, key=_sort_key, reverse=True)
-    if top_n:
-        results = results[:top_n]
-    return results
-
-
-__all__ = ["get_all_players", "generate_player_rankings"]
+    """
+    Players ranked by `by` (see RANKING_MODES): season average, total points,
+    projected average, summed 9-cat z-scores or rest-of-season value
+    (projection x games left, capped at `remaining_games`). Each row carries
+    its `rank_value`; only the top_n rows are selected, not the whole pool sorted.
+    """
+    if db is None:
+        return []
+
+    # the cron precomputes the avg_points ordering for every player
+    view = get_materialized_view(db, RANKINGS_VIEW) if by == "avg_points" else None
+    if view is not None:
+        rows = view.get("players") or []
+        if position is not None:
+            rows = [r for r in rows if r.get("position") == position]
+        if top_n:
+            rows = rows[:top_n]
+        return [dict(r, rank_value=_avg_rank_value(r)) for r in rows]
+
+    try:
+        table = get_player_table(db)
+    except Exception:
+        return []
+
+    key, extra = _ranking_key(db, table, by, remaining_games)
+    key = np.where(np.isnan(key), -np.inf, key)
+
+    rows = np.flatnonzero(table.position_mask(position))
+    rows = table.top_rows(key, top_n or None, rows)
+
+    ranked = []
+    for i in rows:
+        row = _ranking_row(table.players[i])
+        row["rank_value"] = float(key[i]) if np.isfinite(key[i]) else None
+        if extra is not None:
+            row.update(extra(i))
+        ranked.append(row)
+    return ranked
+
+
+__all__ = ["get_all_players", "generate_player_rankings", "RANKING_MODES", "CATEGORIES"]
@@ -0,0 +1,156 @@
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from .player_store import get_player_store, SUMMARY_FIELDS
+from .materialized_views import get_materialized_view, TEAM_SCHEDULES_VIEW
+
+
+def _to_epoch(dates: List[str]) -> np.ndarray:
+    """
+    ISO date strings -> int64 seconds. Naive and compared against naive
+    datetime.now(), the same way the schedule pages always have. Missing or
+    unparseable dates come back as -1.
+    """
+    try:
+        parsed = np.array(dates, dtype="datetime64[s]")
+        return np.where(np.isnat(parsed), -1, parsed.astype(np.int64))
+    except ValueError:
+        out = np.full(len(dates), -1, dtype=np.int64)
+        for i, d in enumerate(dates):
+            try:
+                dt = datetime.fromisoformat(d).replace(tzinfo=None)
+            except (TypeError, ValueError):
+                continue
+            out[i] = int(np.datetime64(dt, "s").astype(np.int64))
+        return out
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _epoch(dt: datetime) -> int:
+    return int(np.datetime64(dt.replace(tzinfo=None), "s").astype(np.int64))
+
+
+def _from_epoch(seconds) -> datetime:
+    return _EPOCH + timedelta(seconds=int(seconds))
+
+
+class TeamCalendar:
+    """
+    Per-NBA-team game calendar: each team's games deduplicated by game id and
+    sorted by start time, with the times kept as int64 epoch seconds. Counts
+    and opponents for any [start, end] window are two binary searches.
+    """
+
+    def __init__(self, team_games: Dict[str, Iterable[Tuple[str, str, str]]]):
+        self.teams: List[str] = []
+        self._times: Dict[str, np.ndarray] = {}
+        self._opponents: Dict[str, np.ndarray] = {}
+        self._game_ids: Dict[str, np.ndarray] = {}
+
+        for team, games in team_games.items():
+            games = list(games)
+            times = _to_epoch([g[1] for g in games])
+            keep = times >= 0
+            order = np.argsort(times[keep], kind="stable")
+            self.teams.append(team)
+            self._times[team] = times[keep][order]
+            self._game_ids[team] = np.array([g[0] for g in games], dtype=object)[keep][order]
+            self._opponents[team] = np.array([g[2] or "" for g in games], dtype=object)[keep][order]
+
+    def _bounds(self, team: str, start: datetime, end: Optional[datetime]) -> Tuple[int, int]:
+        times = self._times.get(team)
+        if times is None:
+            return 0, 0
+        lo = int(np.searchsorted(times, _epoch(start), side="left"))
+        hi = len(times) if end is None else int(np.searchsorted(times, _epoch(end), side="right"))
+        return lo, max(lo, hi)
+
+    def count(self, team: str, start: datetime, end: Optional[datetime] = None) -> int:
+        """Games for `team` with start <= tip-off <= end (end=None: rest of season)."""
+        lo, hi = self._bounds(team, start, end)
+        return hi - lo
+
+    def opponents(self, team: str, start: datetime, end: Optional[datetime] = None) -> List[str]:
+        """Distinct opponents for `team` in the window, in game order."""
+        lo, hi = self._bounds(team, start, end)
+        seen = []
+        for opp in self._opponents[team][lo:hi] if hi > lo else []:
+            if opp and opp not in seen:
+                seen.append(opp)
+        return seen
+
+    def games(self, team: str, start: datetime, end: Optional[datetime] = None) -> List[Dict]:
+        lo, hi = self._bounds(team, start, end)
+        if hi <= lo:
+            return []
+        return [
+            {"game_id": gid, "date": _from_epoch(t), "opponent": opp}
+            for gid, t, opp in zip(self._game_ids[team][lo:hi], self._times[team][lo:hi], self._opponents[team][lo:hi])
+        ]
+
+    def window(self, start: datetime, end: Optional[datetime] = None) -> List[Dict]:
+        """Every team's game count and opponents for an arbitrary window, most games first."""
+        rows = [
+            {"name": team, "games": self.count(team, start, end), "opponents": self.opponents(team, start, end)}
+            for team in self.teams
+        ]
+        rows.sort(key=lambda r: r["games"], reverse=True)
+        return rows
+
+    def grid(self, now: Optional[datetime] = None, week_days: int = 7, month_days: int = 30) -> List[Dict]:
+        """Week / month / season counts per team (the /schedule grid), sorted by week_games desc."""
+        now = now or datetime.now()
+        week = now + timedelta(days=week_days)
+        month = now + timedelta(days=month_days)
+
+        result = []
+        for team in self.teams:
+            result.append({
+                "name":           team,
+                "abbr":           team[:3].upper(),  # rough abbreviation — swap with a lookup dict if needed
+                "week_games":     self.count(team, now, week),
+                "month_games":    self.count(team, now, month),
+                "season_games":   self.count(team, now),
+                "week_opponents": self.opponents(team, now, week),
+            })
+        result.sort(key=lambda t: t["week_games"], reverse=True)
+        return result
+
+
+def _team_games_from_players(store) -> Dict[str, Dict[str, Tuple[str, str, str]]]:
+    # team_name -> { game_id -> (game_id, iso_date, opp) }, deduplicated by game_id across
+    # every player on the team (rostered + free agents) so each game counts once
+    team_games = {}
+    schedules = store.schedules()
+    for p in store.all_players(SUMMARY_FIELDS):
+        team_name = p.get("proTeam") or p.get("team") or ""
+        if not team_name:
+            continue
+        games = team_games.setdefault(team_name, {})
+        for game_id, info in (schedules.get(p.get("playerId")) or {}).items():
+            if game_id in games or not info.get("date"):
+                continue
+            games[game_id] = (game_id, info.get("date"), info.get("team") or info.get("opponent") or "")
+    return team_games
+
+
+def get_team_calendar(db) -> TeamCalendar:
+    """TeamCalendar for the current snapshot: from the cron's team_schedules view when present."""
+    store = get_player_store(db)
+
+    def build():
+        view = get_materialized_view(db, TEAM_SCHEDULES_VIEW)
+        if view is not None:
+            # parallel arrays per team (Firestore can't store arrays of arrays)
+            return TeamCalendar({
+                team: zip(games.get("ids") or [], games.get("dates") or [], games.get("opponents") or [])
+                for team, games in (view.get("teams") or {}).items()
+            })
+        return TeamCalendar({team: games.values() for team, games in _team_games_from_players(store).items()})
+
+    return store.derived("team_calendar", build)
+
+
+__all__ = ["TeamCalendar", "get_team_calendar"]
@@ -1,69 +1,173 @@
 from typing import List, Dict, Optional
-from firebase_admin import firestore
+from .player_store import get_player_store
 
 # Collections
 SCOREBOARD_COL = "scoreboard"
 
+# Scoring periods (days) per fantasy matchup week, for weeks the scoreboard
+# has no scored periods for yet
+MATCHUP_PERIODS = 7
+
+SCOREBOARD_FIELDS = [
+    "week", "home_team_id", "away_team_id", "home_score", "away_score", "scoring_periods",
+    "home_team", "away_team", "home", "away",  # team ids of docs without the flat fields
+]
+
+
+def _team_key(team_id):
+    # ids from a query string come in as strings; the cron writes ESPN's int team ids
+    if isinstance(team_id, str) and team_id.strip().isdigit():
+        return int(team_id)
+    return team_id
+
+
+def _nested_id(team_obj):
+    if not team_obj:
+        return None
+    return team_obj.get("team_id") or team_obj.get("teamId") or team_obj.get("id")
+
+
+def _nested_name(team_obj):
+    if not team_obj:
+        return None
+    return team_obj.get("team_name") or team_obj.get("teamName") or team_obj.get("name")
+
+
+def _matchup_teams(matchup: Dict):
+    """
+    (home dict, away dict, home id, away id) of a scoreboard doc: the flat
+    *_team_id fields the cron writes, else the nested home/away team dicts of
+    docs written before it stored them.
+    """
+    home = matchup.get("home_team") or matchup.get("home") or {}
+    away = matchup.get("away_team") or matchup.get("away") or {}
+    home_id = matchup.get("home_team_id")
+    away_id = matchup.get("away_team_id")
+    return (
+        home,
+        away,
+        home_id if home_id is not None else _nested_id(home),
+        away_id if away_id is not None else _nested_id(away),
+    )
+
 
 def get_team_schedule(db, team_id: int, week: Optional[int] = None) -> List[Dict]:
-    """Return schedule for a team using a Firestore-like `db` collection named 'scoreboard'."""
+    """
+    Return a fantasy team's matchups from the Firestore-like `db` collection named
+    'scoreboard': one week, or the whole season when `week` is None.
+
+    Reads only the team's docs through the single-field team_ids filter; the
+    week is filtered here, since combining it with array_contains would need
+    a composite index (a team has one doc per week, so that's cheap). Docs
+    written before the cron stored team_ids are matched on their nested
+    home/away team ids with a scan, and kept for any week when they carry none.
+    """
     results = []
     if db is None:
         return results
+    team_id = _team_key(team_id)
     try:
-        q = db.collection(SCOREBOARD_COL)
+        q = db.collection(SCOREBOARD_COL).where("team_ids", "array_contains", team_id)
         docs = [doc.to_dict() for doc in q.stream()]
+        if not docs:
+            docs = [
+                m for m in (doc.to_dict() for doc in db.collection(SCOREBOARD_COL).stream())
+                if team_id in _matchup_teams(m)[2:]
+            ]
     except Exception:
         return results
 
+    if week is not None:
+        docs = [m for m in docs if m.get("week") is None or m.get("week") == int(week)]
+    docs.sort(key=lambda m: m.get("week") or 0)
     for matchup in docs:
-        home = matchup.get("home_team") or matchup.get("home")
-        away = matchup.get("away_team") or matchup.get("away")
-        for team_obj, side, opp in ((home, "home", away), (away, "away", home)):
-            if not team_obj:
-                continue
-            tid = team_obj.get("team_id") or team_obj.get("teamId") or team_obj.get("id")
-            if tid == team_id:
-                opp_id = opp.get("team_id") or opp.get("teamId") or opp.get("id") if opp else None
-                opp_name = opp.get("team_name") or opp.get("teamName") or opp.get("name") if opp else None
-                points_for = matchup.get("home_score") if side == "home" else matchup.get("away_score")
-                points_against = matchup.get("away_score") if side == "home" else matchup.get("home_score")
-                results.append({
-                    "team_id": tid,
-                    "team_name": team_obj.get("team_name") or team_obj.get("teamName") or team_obj.get("name"),
-                    "week": week,
-                    "opponent_id": opp_id,
-                    "opponent_name": opp_name,
-                    "home_away": side,
-                    "points_for": points_for,
-                    "points_against": points_against,
-                })
+        home, away, home_id, away_id = _matchup_teams(matchup)
+        side = "home" if home_id == team_id else "away"
+        team_obj, opp = (home, away) if side == "home" else (away, home)
+        results.append({
+            "team_id": team_id,
+            "team_name": _nested_name(team_obj),
+            "week": matchup.get("week") if matchup.get("week") is not None else week,
+            "opponent_id": away_id if side == "home" else home_id,
+            "opponent_name": _nested_name(opp),
+            "home_away": side,
+            "points_for": matchup.get("home_score") if side == "home" else matchup.get("away_score"),
+            "points_against": matchup.get("away_score") if side == "home" else matchup.get("home_score"),
+        })
     return results
 
 
 def get_games_left_in_week(db, week: int) -> Dict[int, int]:
+    """
+    Undecided matchups per fantasy team in `week` (only that week's docs are
+    read). Docs without a week field, written before the cron stored one, are
+    all counted, as they always were.
+    """
     games_left = {}
     if db is None:
         return games_left
     try:
-        q = db.collection(SCOREBOARD_COL)
+        q = db.collection(SCOREBOARD_COL).where("week", "==", int(week))
         docs = [doc.to_dict() for doc in q.stream()]
+        if not docs:
+            docs = [m for m in (doc.to_dict() for doc in db.collection(SCOREBOARD_COL).stream()) if m.get("week") is None]
     except Exception:
         return games_left
 
     for matchup in docs:
-        home_score = matchup.get("home_score")
-        away_score = matchup.get("away_score")
-        if home_score is None or away_score is None:
-            home = matchup.get("home_team") or matchup.get("home")
-            away = matchup.get("away_team") or matchup.get("away")
-            home_id = home.get("team_id") or home.get("teamId") if home else None
-            away_id = away.get("team_id") or away.get("teamId") if away else None
-            if home_id:
-                games_left[home_id] = games_left.get(home_id, 0) + 1
-            if away_id:
-                games_left[away_id] = games_left.get(away_id, 0) + 1
+        if matchup.get("home_score") is None or matchup.get("away_score") is None:
+            for team_id in _matchup_teams(matchup)[2:]:
+                if team_id is not None:
+                    games_left[team_id] = games_left.get(team_id, 0) + 1
     return games_left
 
 
-__all__ = ["get_team_schedule", "get_games_left_in_week"]
+def _scoreboard(db) -> List[Dict]:
+    store = get_player_store(db)
+
+    def build():
+        try:
+            return [doc.to_dict() for doc in db.collection(SCOREBOARD_COL).select(SCOREBOARD_FIELDS).stream()]
+        except Exception:
+            return []
+
+    return store.derived("scoreboard", build)
+
+
+def get_matchups(db) -> Dict[int, List[tuple]]:
+    """week -> [(home team id, away team id, final)] from the scoreboard collection."""
+    weeks = {}
+    for m in _scoreboard(db):
+        week = m.get("week")
+        _, _, home, away = _matchup_teams(m)
+        if week is None or home is None or away is None:
+            continue
+        final = m.get("home_score") is not None and m.get("away_score") is not None
+        weeks.setdefault(int(week), []).append((home, away, final))
+    return weeks
+
+
+def get_week_periods(db) -> Dict[int, tuple]:
+    """
+    week -> (first, last) scoring period. Weeks with points on the scoreboard
+    start at their first scored period; the others pick up where the previous
+    week ended and run MATCHUP_PERIODS periods (or up to the next known start).
+    """
+    starts = {}
+    for m in _scoreboard(db):
+        if m.get("week") is not None and m.get("scoring_periods"):
+            week = int(m["week"])
+            starts[week] = min(starts.get(week, m["scoring_periods"][0]), m["scoring_periods"][0])
+
+    weeks = sorted(get_matchups(db))
+    first = {}
+    for week in weeks:
+        prev = first.get(week - 1)
+        first[week] = starts.get(week, prev + MATCHUP_PERIODS if prev else (week - 1) * MATCHUP_PERIODS + 1)
+    return {
+        week: (first[week], (first[week + 1] - 1) if week + 1 in first else first[week] + MATCHUP_PERIODS - 1)
+        for week in weeks
+    }
+
+
+__all__ = ["get_team_schedule", "get_games_left_in_week", "get_matchups", "get_week_periods"]
@@ -0,0 +1,288 @@
+import heapq
+from itertools import combinations
+from math import comb
+from datetime import datetime
+from typing import Dict, List, Optional
+import numpy as np
+from .player_table import get_player_table, top_k_indices
+from .game_logs import get_game_log_rows
+from .trade_finder import get_fantasy_rosters
+from .schedule_calls import get_week_periods
+from .weekly_projections import get_projection_matrix, resolve_week
+from .league_settings import get_league_settings, get_lineup_slots, get_roster_size
+
+# Adds per matchup week when the league's limit is unknown / unlimited
+DEFAULT_MAX_ADDS = 4
+# Cap on the search's add budget (the adds dimension of every step)
+MAX_ADDS = 7
+
+# Roster players the plan may drop when the caller doesn't name them: the lowest projections
+DEFAULT_DROPPABLE = 2
+
+# Free agents kept after the upper-bound pruning
+MAX_CANDIDATES = 12
+# Cap on holder sets in the search (each day's step is sets x sets); fewer
+# candidates are kept when the team has many flex spots
+MAX_HOLDER_SETS = 600
+
+OBJECTIVES = ("points", "games")
+
+
+def _day_masks(values: np.ndarray) -> List[int]:
+    """Per row, an int with bit d set when the row has a (valued) game on window day d."""
+    bits = 1 << np.arange(values.shape[1], dtype=object)
+    return [int(m) for m in ((values > 0) * bits).sum(axis=1)]
+
+
+def _dominated(values: np.ndarray, masks: List[int], budget: int) -> np.ndarray:
+    """
+    True for candidates that at least `budget` others beat on every day (ties
+    go to the earlier candidate): a plan adds at most `budget` players, so one
+    of those is always free to take the dominated player's place.
+    """
+    n = len(masks)
+    out = np.zeros(n, dtype=bool)
+    for c in range(n):
+        beaten_by = 0
+        for b in range(n):
+            if b == c or masks[c] & ~masks[b] or not (values[b] >= values[c]).all():
+                continue
+            if b < c or (values[b] > values[c]).any():
+                beaten_by += 1
+                if beaten_by >= budget:
+                    out[c] = True
+                    break
+    return out
+
+
+def _n_holder_sets(n_items: int, n_flex: int, n_spots: int) -> int:
+    return sum(comb(n_items, k) for k in range(n_flex, n_spots + 1))
+
+
+class _Plan:
+    """
+    Dynamic program over the week's days. The state is which players hold the
+    flex spots (open roster spots + droppable players) and how many adds are
+    spent; a day's value is the team's `starters` best players with a game.
+    Moving between holder sets costs one add per new holder, new holders must
+    play that day (adding earlier only costs the dropped player's games) and
+    spots are never emptied. Dropped roster players are gone for good; a
+    streamed free agent can come back, for another add.
+
+    Every holder set's daily value is computed up front from the day masks, so
+    each day's step is one vectorized max over (adds, set -> set).
+    """
+
+    def __init__(self, core: np.ndarray, values: np.ndarray, n_flex: int, starters: int,
+                 n_open: int, budget: int):
+        self.values = values
+        self.budget = budget
+        self.n_days = values.shape[1]
+        self.masks = _day_masks(values)
+
+        # holder sets: flex rows first, then candidates; spots beyond the set are open
+        self.sets = [c for k in range(n_flex, n_flex + n_open + 1) for c in combinations(range(len(values)), k)]
+        self.start = self.sets.index(tuple(range(n_flex)))
+        self.member = np.zeros((len(self.sets), len(values)), dtype=np.int64)
+        for i, held in enumerate(self.sets):
+            self.member[i, list(held)] = 1
+        self.size = self.member.sum(axis=1)
+        self.overlap = self.member @ self.member.T
+        # dropped roster players stay dropped: t may only hold flex players s holds too
+        flex_member = self.member[:, :n_flex]
+        self.flex_held = flex_member.sum(axis=1)
+        self.flex_overlap = flex_member @ flex_member.T
+
+        rows = values.tolist()
+        self.day_values = np.zeros((len(self.sets), self.n_days))
+        self.starts = np.zeros((len(self.sets), self.n_days), dtype=np.int64)
+        for d in range(self.n_days):
+            core_top = sorted((v for v in core[:, d] if v > 0), reverse=True)[:starters]
+            core_games = int((core[:, d] > 0).sum())
+            for i, held in enumerate(self.sets):
+                playing = [rows[h][d] for h in held if self.masks[h] >> d & 1]
+                self.day_values[i, d] = sum(heapq.nlargest(starters, core_top + playing))
+                self.starts[i, d] = min(starters, core_games + len(playing))
+
+    def _costs(self, d: int) -> np.ndarray:
+        """Adds to go from set s (rows) to set t (columns) on day d, budget + 1 where not allowed."""
+        entering = self.size[None, :] - self.overlap
+        plays = np.array([m >> d & 1 for m in self.masks], dtype=np.int64)
+        held_playing = self.member * plays
+        entering_playing = held_playing.sum(axis=1)[None, :] - self.member @ held_playing.T
+        allowed = (
+            (entering == entering_playing)
+            & (self.size[None, :] >= self.size[:, None])
+            & (self.flex_held[None, :] == self.flex_overlap)
+        )
+        return np.where(allowed & (entering <= self.budget), entering, self.budget + 1)
+
+    def solve(self):
+        """(best value, holder set index per day) with the fewest adds among equally good plans."""
+        n = len(self.sets)
+        adds = np.arange(self.budget + 1)[:, None, None]
+        best = np.full((self.budget + 1, n), -np.inf)
+        best[0, self.start] = 0.0
+        back = []
+        for d in range(self.n_days):
+            spent = adds - self._costs(d)[None]          # adds used before the day's moves
+            prev = np.where(spent >= 0, best[np.maximum(spent, 0), np.arange(n)[None, :, None]], -np.inf)
+            arg = prev.argmax(axis=1)
+            best = np.take_along_axis(prev, arg[:, None, :], axis=1)[:, 0, :] + self.day_values[:, d]
+            back.append(arg)
+
+        a, s = np.unravel_index(np.argmax(best), best.shape)
+        value = float(best[a, s])
+        path = []
+        for d in reversed(range(self.n_days)):
+            path.append(int(s))
+            p = back[d][a, s]
+            a, s = a - (self.size[s] - self.overlap[p, s]), p
+        return value, path[::-1]
+
+
+def _player(p: Dict, per_game: float, games: int) -> Dict:
+    return {
+        "playerId": p.get("playerId"),
+        "name": p.get("name"),
+        "position": p.get("position"),
+        "proTeam": p.get("proTeam") or p.get("team"),
+        "projected_per_game": float(per_game),
+        "games": int(games),
+    }
+
+
+def plan_streaming(db, team_id, week: Optional[int] = None, period: Optional[int] = None,
+                   max_adds: Optional[int] = None, drop_ids: Optional[List] = None,
+                   by: str = "points", max_candidates: int = MAX_CANDIDATES,
+                   now: Optional[datetime] = None) -> Dict:
+    """
+    Best sequence of free-agent pickups for the rest of a matchup week.
+
+    The team's roster splits into a core it keeps and flex spots: open roster
+    spots plus the players it's willing to drop (`drop_ids`, default the
+    DEFAULT_DROPPABLE lowest projections). Free agents are scored against the
+    days the core leaves starts open, cut to the `max_candidates` best upper
+    bounds and to those not dominated on every day, then _Plan searches the
+    adds (at most `max_adds`, default the league's weekly limit).
+
+    `by` is "points" (projected points started) or "games" (starts). Starting
+    slots are treated as one pool of capacity; see /api/lineups for
+    position-exact daily lineups.
+    """
+    if by not in OBJECTIVES:
+        return {"error": f"Unknown objective: {by}", "objectives": list(OBJECTIVES)}
+
+    rosters = get_fantasy_rosters(db)
+    match = next((t for t in rosters if str(t) == str(team_id)), None)
+    if match is None:
+        return {"error": f"Unknown team: {team_id}",
+                "teams": [{"team_id": t, "team_name": r["team_name"]} for t, r in rosters.items()]}
+    team = rosters[match]
+
+    matrix = get_projection_matrix(db)
+    window = resolve_week(matrix, get_week_periods(db), week, period, now)
+    if "error" in window:
+        return window
+    first = max(window["current_period"], window["first_period"], matrix.n_periods + 1)
+    last = window["last_period"]
+    cols = np.arange(first - 1, min(last, matrix.points.shape[1]))
+
+    if max_adds is None:
+        limit = get_league_settings(db).get("matchup_acquisition_limit")
+        max_adds = limit if limit is not None and limit >= 0 else DEFAULT_MAX_ADDS
+    budget = max(0, min(int(max_adds), MAX_ADDS))
+
+    weights = matrix.points if by == "points" else matrix.games * (matrix.availability > 0)[:, None]
+    rows = get_game_log_rows(db)
+    players = [p for p in team["players"] if p.get("lineupSlot") != "IR" and p.get("playerId") in rows]
+    player_rows = np.array([rows[p["playerId"]] for p in players], dtype=np.intp)
+
+    if drop_ids is None:
+        droppable = top_k_indices(matrix.projection[player_rows], DEFAULT_DROPPABLE, descending=False)
+    else:
+        wanted = {str(pid) for pid in drop_ids}
+        droppable = np.array([i for i, p in enumerate(players) if str(p.get("playerId")) in wanted], dtype=np.intp)
+    is_flex = np.zeros(len(players), dtype=bool)
+    is_flex[droppable] = True
+    flex = np.flatnonzero(is_flex)
+    n_open = max(0, get_roster_size(db) - len(players))
+    starters = sum(get_lineup_slots(db).values())
+
+    def window_values(r):
+        out = np.zeros((len(r), max(0, last - first + 1)))
+        if len(r) and len(cols):
+            out[:, :len(cols)] = weights[np.ix_(r, cols)]
+        return out
+
+    core_values = window_values(player_rows[~is_flex])
+    flex_values = window_values(player_rows[flex])
+
+    # upper bound per free agent: what it adds over the core's weakest starter on each of its days
+    table = get_player_table(db)
+    pool = np.flatnonzero(~table.rostered)
+    pool_values = window_values(pool)
+    floor = np.array([
+        np.sort(day[day > 0])[-starters] if (day > 0).sum() >= starters else 0.0 for day in core_values.T
+    ]) if starters else np.zeros(core_values.shape[1])
+    bound = np.maximum(pool_values - floor, 0).sum(axis=1)
+    keep = np.flatnonzero(bound > 0)
+    keep = keep[top_k_indices(bound[keep], max(0, int(max_candidates)))]
+    keep = keep[~_dominated(pool_values[keep], _day_masks(pool_values[keep]), budget)] if budget else keep[:0]
+    while len(keep) and _n_holder_sets(len(flex) + len(keep), len(flex), len(flex) + n_open) > MAX_HOLDER_SETS:
+        keep = keep[:-1]
+
+    plan = _Plan(core_values, np.vstack([flex_values, pool_values[keep]]), len(flex), starters, n_open, budget)
+    value, path = plan.solve()
+
+    def describe(h):
+        if h < len(flex):
+            p, row = players[flex[h]], player_rows[flex[h]]
+        else:
+            row = pool[keep[h - len(flex)]]
+            p = table.players[row]
+        return _player(p, matrix.projection[row], (plan.values[h] > 0).sum())
+
+    moves, days = [], []
+    for d, s in enumerate(path):
+        before = set(plan.sets[path[d - 1] if d else plan.start])
+        added = sorted(set(plan.sets[s]) - before)
+        dropped = sorted(before - set(plan.sets[s]))
+        for i, c in enumerate(added):
+            moves.append({
+                "period": first + d,
+                "date": matrix.period_date(first + d),
+                "add": describe(c),
+                "drop": describe(dropped[i]) if i < len(dropped) else None,
+            })
+        days.append({
+            "period": first + d,
+            "date": matrix.period_date(first + d),
+            "holders": [describe(h)["playerId"] for h in plan.sets[s]],
+            "starts": int(plan.starts[s, d]),
+            "starts_without_moves": int(plan.starts[plan.start, d]),
+            "value": float(plan.day_values[s, d]),
+            "value_without_moves": float(plan.day_values[plan.start, d]),
+        })
+
+    baseline = float(plan.day_values[plan.start].sum())
+    return {
+        "team_id": team["team_id"],
+        "team_name": team["team_name"],
+        "week": window["week"],
+        "first_period": first,
+        "last_period": last,
+        "by": by,
+        "max_adds": budget,
+        "open_spots": n_open,
+        "droppable": [describe(h) for h in range(len(flex))],
+        "candidates_considered": len(keep),
+        "moves": moves,
+        "days": days,
+        "value_without_moves": baseline,
+        "value": value,
+        "gain": value - baseline,
+    }
+
+
+__all__ = ["plan_streaming"]
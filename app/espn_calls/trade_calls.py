@@ -1,8 +1,6 @@
-from typing import Dict, List
-
-# Collections
-TEAM_PLAYER_COL = "team_players"
-FREE_AGENTS_COL = "free_agents"
+from typing import Dict, List, Tuple
+import numpy as np
+from .player_store import get_player_store, SUMMARY_FIELDS
 
 
 # When a trade is imbalanced (e.g. 3-for-2), the side receiving MORE players
@@ -38,6 +36,25 @@ def _apply_imbalance(values: List[float], opponent_count: int) -> tuple:
 
 
 
+def _row_sums(values: np.ndarray) -> np.ndarray:
+    """Left-to-right row sums, same rounding as Python's sum() on each row."""
+    total = np.zeros(values.shape[0])
+    for col in range(values.shape[1]):
+        total = total + values[:, col]
+    return total
+
+
+def apply_imbalance_batch(sorted_values: np.ndarray, opponent_count: int) -> np.ndarray:
+    """
+    _apply_imbalance() for many bundles at once: `sorted_values` is
+    (bundles, size) with each row sorted descending; returns adjusted totals.
+    """
+    if sorted_values.shape[1] <= opponent_count:
+        return _row_sums(sorted_values)
+    return (_row_sums(sorted_values[:, :opponent_count])
+            + _row_sums(sorted_values[:, opponent_count:] * IMBALANCE_DISCOUNT))
+
+
 def evaluate_trade(db, give_ids: List, recv_ids: List) -> Dict:
     """Evaluate a trade using Firestore-like `db` collections (team_players + free_agents)."""
     """
@@ -46,35 +63,24 @@ def evaluate_trade(db, give_ids: List, recv_ids: List) -> Dict:
     give_ids  — list of player IDs the user is giving away
     recv_ids  — list of player IDs the user is receiving
     """
-    players = []
+    requested_ids = [pid for pid in list(give_ids or []) + list(recv_ids or []) if pid is not None]
     if db is None:
-        return {"team_a": {"pre_trade_value": 0, "post_trade_value": 0, "delta": 0},
-                "team_b": {"pre_trade_value": 0, "post_trade_value": 0, "delta": 0}}
-
-    try:
-        q = db.collection(TEAM_PLAYER_COL)
-        for doc in q.stream():
-            players.append(doc.to_dict())
-    except Exception:
-        pass
+        # same shape as a scored trade, with nothing on either side
+        return score_trade([], [], requested_ids)
 
+    # keyed lookup of just the requested players instead of scanning the whole pool
     try:
-        q = db.collection(FREE_AGENTS_COL)
-        for doc in q.stream():
-            players.append(doc.to_dict())
+        found, missing_ids = get_player_store(db).get_players_by_ids(requested_ids, SUMMARY_FIELDS)
     except Exception:
-        pass
-
-    def _find(pid):
-        for p in players:
-            if (p.get("playerId") or p.get("id")) == pid:
-                return p
-        return None
+        found, missing_ids = {}, requested_ids
 
-    give_players = [p for p in (_find(pid) for pid in (give_ids or []) if pid is not None) if p]
-    recv_players = [p for p in (_find(pid) for pid in (recv_ids or []) if pid is not None) if p]
+    give_players = [found[pid] for pid in (give_ids or []) if pid in found]
+    recv_players = [found[pid] for pid in (recv_ids or []) if pid in found]
+    return score_trade(give_players, recv_players, missing_ids)
 
 
+def score_trade(give_players: List[Dict], recv_players: List[Dict], missing_ids: List = ()) -> Dict:
+    """evaluate_trade()'s result for already-loaded player dicts."""
     give_count = len(give_players)
     recv_count = len(recv_players)
 
@@ -84,6 +90,20 @@ def evaluate_trade(db, give_ids: List, recv_ids: List) -> Dict:
     give_adj, give_raw, give_penalized = _apply_imbalance(give_values, recv_count)
     recv_adj, recv_raw, recv_penalized = _apply_imbalance(recv_values, give_count)
 
+    return _trade_result(give_players, recv_players, give_adj, give_raw, recv_adj, recv_raw, missing_ids)
+
+
+def _trade_result(give_players, recv_players, give_adj, give_raw, recv_adj, recv_raw, missing_ids,
+                  values: Dict = None) -> Dict:
+    """The evaluate_trade() result dict from the already computed side totals."""
+    give_count = len(give_players)
+    recv_count = len(recv_players)
+
+    def value(p):
+        if values is not None and p.get("playerId") in values:
+            return values[p.get("playerId")]
+        return compute_player_trade_value(p)
+
     your_delta  = recv_adj - give_adj
     their_delta = give_adj - recv_adj
 
@@ -113,7 +133,7 @@ def evaluate_trade(db, give_ids: List, recv_ids: List) -> Dict:
             "position": p.get("position"),
             "avg_points": p.get("avg_points"),
             "projected_avg_points": p.get("projected_avg_points"),
-            "trade_value": compute_player_trade_value(p),
+            "trade_value": value(p),
             "side": "give",
         })
     for p in recv_players:
@@ -122,7 +142,7 @@ def evaluate_trade(db, give_ids: List, recv_ids: List) -> Dict:
             "position": p.get("position"),
             "avg_points": p.get("avg_points"),
             "projected_avg_points": p.get("projected_avg_points"),
-            "trade_value": compute_player_trade_value(p),
+            "trade_value": value(p),
             "side": "recv",
         })
 
@@ -145,8 +165,59 @@ def evaluate_trade(db, give_ids: List, recv_ids: List) -> Dict:
         "recv_names":     [p.get("name", "?") for p in recv_players],
         "imbalance_note": imbalance_note,
         "player_details": player_details,
+        "missing_ids":    list(missing_ids),
         "score":          float(your_delta),
     }
 
 
-__all__ = ["compute_player_trade_value", "evaluate_trade"]
+def evaluate_trades(db, proposals: List[Tuple[List, List]]) -> List[Dict]:
+    """
+    evaluate_trade() for many (give_ids, recv_ids) proposals at once.
+
+    The union of every requested id is looked up once, each player's value is
+    computed once, and the side totals are computed with NumPy for all
+    proposals with the same (give, receive) sizes together. Results are in
+    proposal order and identical to calling evaluate_trade() on each.
+    """
+    proposals = [([pid for pid in (give or []) if pid is not None], [pid for pid in (recv or []) if pid is not None])
+                 for give, recv in proposals]
+    requested_ids = [pid for give, recv in proposals for pid in give + recv]
+    if db is None:
+        return [evaluate_trade(None, give, recv) for give, recv in proposals]
+
+    try:
+        found, missing = get_player_store(db).get_players_by_ids(requested_ids, SUMMARY_FIELDS)
+    except Exception:
+        found, missing = {}, list(dict.fromkeys(requested_ids))
+    missing = set(missing)
+    values = {found[pid].get("playerId"): compute_player_trade_value(found[pid]) for pid in found}
+
+    sides = []
+    groups = {}
+    for k, (give, recv) in enumerate(proposals):
+        give_players = [found[pid] for pid in give if pid in found]
+        recv_players = [found[pid] for pid in recv if pid in found]
+        sides.append((give_players, recv_players))
+        groups.setdefault((len(give_players), len(recv_players)), []).append(k)
+
+    totals = {}
+    for (g, r), ks in groups.items():
+        give_vals = np.array([[values[p.get("playerId")] for p in sides[k][0]] for k in ks], dtype=float).reshape(len(ks), g)
+        recv_vals = np.array([[values[p.get("playerId")] for p in sides[k][1]] for k in ks], dtype=float).reshape(len(ks), r)
+        give_raw, recv_raw = _row_sums(give_vals), _row_sums(recv_vals)
+        # like _apply_imbalance(), only the side with extra players is re-summed high to low
+        give_adj = apply_imbalance_batch(-np.sort(-give_vals, axis=1), r) if g > r else give_raw
+        recv_adj = apply_imbalance_batch(-np.sort(-recv_vals, axis=1), g) if r > g else recv_raw
+        for row, k in enumerate(ks):
+            totals[k] = (float(give_adj[row]), float(give_raw[row]), float(recv_adj[row]), float(recv_raw[row]))
+
+    results = []
+    for k, (give, recv) in enumerate(proposals):
+        give_adj, give_raw, recv_adj, recv_raw = totals[k]
+        # what get_players_by_ids would report for this proposal alone
+        proposal_missing = [pid for pid in give + recv if pid in missing]
+        results.append(_trade_result(*sides[k], give_adj, give_raw, recv_adj, recv_raw, proposal_missing, values))
+    return results
+
+
+__all__ = ["compute_player_trade_value", "evaluate_trade", "evaluate_trades", "score_trade"]
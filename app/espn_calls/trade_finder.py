@@ -0,0 +1,194 @@
+from concurrent.futures import ThreadPoolExecutor
+from itertools import combinations
+from typing import Dict, List, Optional
+import numpy as np
+from .player_store import get_player_store, SUMMARY_FIELDS
+from .player_table import top_k_indices
+from .trade_calls import compute_player_trade_value, apply_imbalance_batch, score_trade
+
+MAX_BUNDLE_SIZE = 4
+
+# Roster strength = sum of the STARTERS best trade values (10 starting slots)
+STARTERS = 10
+
+# Value-bound pruning: only pair bundles whose imbalance-adjusted values are
+# within this fraction of each other (evaluate_trade's score stays small)
+VALUE_WINDOW = 0.25
+
+DEFAULT_TOP_N = 20
+
+# Pairs scored per NumPy pass, keeps the temporary matrices small
+PAIR_CHUNK = 200_000
+
+
+def get_fantasy_rosters(db) -> Dict:
+    """teamId -> {"team_id", "team_name", "players"} from team_players (needs the cron's teamId field)."""
+    store = get_player_store(db)
+
+    def build():
+        rosters = {}
+        for p in store.team_players(SUMMARY_FIELDS):
+            team_id = p.get("teamId")
+            if team_id is None:
+                continue
+            team = rosters.setdefault(team_id, {"team_id": team_id, "team_name": p.get("teamName"), "players": []})
+            team["players"].append(p)
+        return rosters
+
+    return store.derived("fantasy_rosters", build)
+
+
+def replacement_value(db) -> float:
+    """Trade value of the best free agent: what an open roster spot is worth."""
+    store = get_player_store(db)
+
+    def build():
+        values = [compute_player_trade_value(p) for p in store.free_agents(SUMMARY_FIELDS)]
+        return float(max(values, default=0.0))
+
+    return store.derived("replacement_value", build)
+
+
+def _strength(values: np.ndarray) -> np.ndarray:
+    """Row-wise sum of the STARTERS largest values of a (rows, roster) matrix."""
+    k = min(STARTERS, values.shape[1])
+    return np.partition(values, values.shape[1] - k, axis=1)[:, -k:].sum(axis=1)
+
+
+class _RosterSide:
+    """
+    One roster's tradeable bundles, precomputed once per search:
+    for each bundle size, the bundle's member rows, its values sorted high to
+    low and the values of the players the team keeps.
+    """
+
+    def __init__(self, players: List[Dict], replacement: float, max_size: int):
+        self.players = players
+        values = np.array([float(compute_player_trade_value(p) or 0) for p in players])
+        # rosters shorter than the starting lineup play replacement-level guys
+        self.values = np.concatenate([values, np.full(max(0, STARTERS - len(values)), replacement)])
+        self.strength = float(_strength(self.values[None, :])[0])
+
+        # players at or below replacement level can't help the other side
+        tradeable = [i for i, v in enumerate(values) if v > replacement]
+        self.bundles = {}
+        for size in range(1, max_size + 1):
+            combos = np.array(list(combinations(tradeable, size)), dtype=np.intp).reshape(-1, size)
+            if len(combos) == 0:
+                continue
+            bundle_vals = -np.sort(-self.values[combos], axis=1)
+            keep = np.ones((len(combos), len(self.values)), dtype=bool)
+            np.put_along_axis(keep, combos, False, axis=1)
+            rest = self.values[np.nonzero(keep)[1]].reshape(len(combos), -1)
+            self.bundles[size] = (combos, bundle_vals, rest)
+
+
+def _pairs_in_window(a: np.ndarray, b: np.ndarray, window: float):
+    """(i, j) index arrays for every a[i], b[j] within `window` of each other (relative)."""
+    order = np.argsort(b, kind="stable")
+    b_sorted = b[order]
+    lo = np.searchsorted(b_sorted, a * (1 - window), side="left")
+    hi = np.searchsorted(b_sorted, a * (1 + window), side="right")
+    counts = np.maximum(hi - lo, 0)
+    i = np.repeat(np.arange(len(a)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    j = order[np.repeat(lo, counts) + offsets]
+    return i, j
+
+
+def _after_strength(rest, incoming, shrink, replacement):
+    """Strength of (kept players + incoming bundle + `shrink` open spots at replacement level)."""
+    parts = [rest, incoming]
+    if shrink > 0:
+        parts.append(np.full((len(rest), shrink), replacement))
+    return _strength(np.concatenate(parts, axis=1))
+
+
+def _search_team(mine: _RosterSide, theirs: _RosterSide, replacement: float,
+                 top_n: int, window: float) -> List[tuple]:
+    """Best mutually beneficial (give rows, recv rows, your gain, their gain) against one team."""
+    found = []
+    for g, (give_idx, give_vals, give_rest) in mine.bundles.items():
+        for r, (recv_idx, recv_vals, recv_rest) in theirs.bundles.items():
+            give_adj = apply_imbalance_batch(give_vals, r)
+            recv_adj = apply_imbalance_batch(recv_vals, g)
+            i_all, j_all = _pairs_in_window(give_adj, recv_adj, window)
+
+            for start in range(0, len(i_all), PAIR_CHUNK):
+                i, j = i_all[start:start + PAIR_CHUNK], j_all[start:start + PAIR_CHUNK]
+                your_gain = _after_strength(give_rest[i], recv_vals[j], g - r, replacement) - mine.strength
+                their_gain = _after_strength(recv_rest[j], give_vals[i], r - g, replacement) - theirs.strength
+                ok = np.flatnonzero((your_gain > 0) & (their_gain > 0))
+                if len(ok) == 0:
+                    continue
+                # rank by the smaller of the two gains: good for both, not just one side
+                mutual = np.minimum(your_gain[ok], their_gain[ok])
+                for k in ok[top_k_indices(mutual, top_n)]:
+                    found.append((_mutual_key(your_gain[k], their_gain[k]),
+                                  give_idx[i[k]], recv_idx[j[k]], float(your_gain[k]), float(their_gain[k])))
+    found.sort(key=lambda f: f[0], reverse=True)
+    return found[:top_n]
+
+
+def _mutual_key(your_gain: float, their_gain: float) -> tuple:
+    return (min(your_gain, their_gain), your_gain + their_gain)
+
+
+def find_trades(db, team_id, max_size: int = MAX_BUNDLE_SIZE, top_n: int = DEFAULT_TOP_N,
+                window: float = VALUE_WINDOW, max_workers: Optional[int] = None) -> Dict:
+    """
+    Search every other roster for 1-to-`max_size` trades (up to 4-for-4) that make
+    both teams' starting-lineup strength go up.
+
+    Bundles are only paired when their imbalance-adjusted values are within
+    `window` of each other, surviving pairs are scored in NumPy batches, and
+    each opposing team is searched on its own thread. Each proposal carries
+    evaluate_trade()'s result for the same trade.
+    """
+    rosters = get_fantasy_rosters(db)
+    if team_id not in rosters:
+        # query-string ids come in as strings
+        team_id = next((t for t in rosters if str(t) == str(team_id)), team_id)
+    if team_id not in rosters:
+        return {"error": f"Unknown team: {team_id}", "teams": _team_list(rosters), "proposals": []}
+
+    max_size = max(1, min(int(max_size), MAX_BUNDLE_SIZE))
+    replacement = replacement_value(db)
+    mine = _RosterSide(rosters[team_id]["players"], replacement, max_size)
+    others = [t for t in rosters if t != team_id]
+    sides = {t: _RosterSide(rosters[t]["players"], replacement, max_size) for t in others}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = dict(zip(others, pool.map(
+            lambda t: _search_team(mine, sides[t], replacement, top_n, window), others)))
+
+    candidates = [(t, f) for t, found in results.items() for f in found]
+    candidates.sort(key=lambda c: c[1][0], reverse=True)
+
+    proposals = []
+    for t, (_, give_rows, recv_rows, your_gain, their_gain) in candidates[:top_n]:
+        give_players = [mine.players[i] for i in give_rows]
+        recv_players = [sides[t].players[i] for i in recv_rows]
+        proposals.append({
+            "team_id": t,
+            "team_name": rosters[t]["team_name"],
+            "give_ids": [p.get("playerId") for p in give_players],
+            "recv_ids": [p.get("playerId") for p in recv_players],
+            "your_gain": your_gain,
+            "their_gain": their_gain,
+            "trade": score_trade(give_players, recv_players),
+        })
+
+    return {
+        "team_id": team_id,
+        "team_name": rosters[team_id]["team_name"],
+        "replacement_value": replacement,
+        "proposals": proposals,
+    }
+
+
+def _team_list(rosters: Dict) -> List[Dict]:
+    return [{"team_id": t["team_id"], "team_name": t["team_name"]} for t in rosters.values()]
+
+
+__all__ = ["find_trades", "get_fantasy_rosters"]
@@ -0,0 +1,304 @@
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+import numpy as np
+from .player_store import get_player_store, SUMMARY_FIELDS
+from .player_table import get_player_table
+from .game_logs import get_game_log, get_game_log_rows
+from .schedule_calls import get_matchups, get_week_periods
+from .trade_finder import get_fantasy_rosters
+
+DEFAULT_TRIALS = 20_000
+MAX_TRIALS = 100_000
+# Trials for a simulation run inside a page request (/trade), where the user waits on it
+REQUEST_TRIALS = 5_000
+
+# Threads shared by every simulation in the process (NumPy releases the GIL while sampling)
+SIMULATION_WORKERS = min(4, os.cpu_count() or 1)
+
+# Trials per chunk; chunks get their own random stream so a seeded run gives
+# the same answer however many threads it's spread over
+TRIAL_CHUNK = 5_000
+
+
+class GameDistributions:
+    """
+    Every player's empirical per-game fantasy points, flattened: row i's games
+    are flat[offsets[i]:offsets[i] + counts[i]]. Scheduled games the player
+    sat out count as 0 so availability is part of the distribution; players
+    with no history get a single game at their projected average.
+    """
+
+    def __init__(self, log, fallback: np.ndarray):
+        past = log.n_periods
+        games = log.played | (log.scheduled[:, :past] & ~log.played)
+        values = np.where(log.played, log.fp, 0.0)
+        no_history = ~games.any(axis=1)
+
+        values = np.column_stack([values, np.nan_to_num(fallback)])
+        games = np.column_stack([games, no_history])
+        self.flat = values[games]
+        self.counts = games.sum(axis=1)
+        self.offsets = np.cumsum(self.counts) - self.counts
+        self.mean = np.add.reduceat(self.flat, self.offsets) / self.counts
+        second = np.add.reduceat(self.flat ** 2, self.offsets) / self.counts
+        self.std = np.sqrt(np.clip(second - self.mean ** 2, 0.0, None))
+        # what the simulation draws from (fantasy points fit float32 exactly)
+        self.samples = self.flat.astype(np.float32)
+
+
+def get_game_distributions(db) -> GameDistributions:
+    store = get_player_store(db)
+
+    def build():
+        log = get_game_log(db)
+        table = get_player_table(db)
+        fallback = np.where(np.isnan(table.projected_avg_points), table.avg_points, table.projected_avg_points)
+        return GameDistributions(log, fallback)
+
+    return store.derived("game_distributions", build)
+
+
+def _lookup(rosters: Dict, team_id):
+    if team_id in rosters:
+        return team_id
+    # query-string / JSON ids come in as strings
+    return next((t for t in rosters if str(t) == str(team_id)), None)
+
+
+def _owner(players: List[Dict], exclude=None):
+    teams = Counter(p.get("teamId") for p in players if p.get("teamId") is not None and p.get("teamId") != exclude)
+    return teams.most_common(1)[0][0] if teams else None
+
+
+class _Week:
+    """
+    One remaining matchup week: which players' games get sampled, how their
+    sums add up to each (team, before/after) score column, and the points
+    already banked in the part of the week that's been played.
+    """
+
+    def __init__(self, week, periods, rosters_by_col, banked_rosters, rows, dist, log, comparisons):
+        self.week = week
+        self.comparisons = comparisons  # [(label, my col, opponent col)]
+        first, last = periods
+        played_to = min(last, log.n_periods)
+        future = slice(max(first, log.n_periods + 1) - 1, last)
+
+        members = sorted({pid for roster in rosters_by_col + banked_rosters for pid in roster if pid in rows}, key=str)
+        member_rows = np.array([rows[pid] for pid in members], dtype=np.intp)
+        games = log.scheduled[member_rows, future].sum(axis=1) if len(member_rows) else np.zeros(0, dtype=int)
+
+        def membership(rosters):
+            return np.array([[pid in roster for roster in rosters] for pid in members], dtype=float).reshape(
+                len(members), len(rosters))
+
+        weights = membership(rosters_by_col)
+        # points from the days already played this week belong to the pre-trade rosters
+        banked = log.fp[member_rows, first - 1:played_to].sum(axis=1) if played_to >= first else np.zeros(len(members))
+        self.banked = banked @ membership(banked_rosters)
+        self.games = games @ weights
+
+        # one sampled column per remaining game; the matmul sums them into team scores
+        active = games > 0
+        col_rows = np.repeat(member_rows[active], games[active])
+        self.col_weights = np.repeat(weights[active], games[active], axis=0).astype(np.float32)
+        self.col_offsets = dist.offsets[col_rows].astype(np.uint32)
+        self.col_counts = dist.counts[col_rows].astype(np.uint32)
+
+    def scores(self, rng, samples, trials) -> np.ndarray:
+        '''(trials, score columns) sampled team totals for the week.'''
+        if len(self.col_counts) == 0:
+            return np.broadcast_to(self.banked, (trials, len(self.banked)))
+        # uniform game index per column: 16 random bits scaled by the player's game count
+        # (multiply-shift; the bias is under count / 65536, far below the Monte Carlo noise)
+        idx = rng.integers(0, 1 << 16, (trials, len(self.col_counts)), dtype=np.uint16) * self.col_counts
+        idx >>= 16
+        idx += self.col_offsets
+        return np.take(samples, idx) @ self.col_weights + self.banked
+
+
+def _run_chunk(weeks: List[_Week], samples, season_cols, seed, trials):
+    rng = np.random.default_rng(seed)
+    wins = []
+    season = np.zeros((trials, len(season_cols)))
+    for week in weeks:
+        s = week.scores(rng, samples, trials)
+        season += s[:, season_cols]
+        wins.append([
+            float((s[:, a] > s[:, b]).sum() + 0.5 * (s[:, a] == s[:, b]).sum()) for _, a, b in week.comparisons
+        ])
+    return wins, season
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _simulation_pool() -> ThreadPoolExecutor:
+    """Process-wide executor for trial chunks, created on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=SIMULATION_WORKERS, thread_name_prefix="trade-simulation")
+        return _pool
+
+
+def simulate_trade(db, give_ids: List, recv_ids: List, team_id=None, n_trials: int = DEFAULT_TRIALS,
+                   seed: Optional[int] = None, max_workers: Optional[int] = None) -> Dict:
+    """
+    Monte Carlo version of evaluate_trade(): rest-of-season weekly matchups
+    before and after the trade.
+
+    Each trial draws every involved player's per-game points from their own
+    game log (missed games included) for each game their NBA team has left in
+    a week, sums them into fantasy team scores and plays out the scoreboard's
+    remaining matchups. Returns per-week win probabilities before / after,
+    expected wins and the season points distribution for your team (the team
+    giving `give_ids`, or `team_id`) and for the team you trade with.
+
+    Trials (at most MAX_TRIALS) run in chunks on the shared simulation pool;
+    pass `max_workers` for a private pool of that size instead.
+    """
+    n_trials = max(1, min(int(n_trials), MAX_TRIALS))
+    store = get_player_store(db)
+    found, missing = store.get_players_by_ids(list(give_ids or []) + list(recv_ids or []), SUMMARY_FIELDS)
+    give = [found[pid] for pid in give_ids or [] if pid in found]
+    recv = [found[pid] for pid in recv_ids or [] if pid in found]
+
+    rosters = get_fantasy_rosters(db)
+    me = _lookup(rosters, team_id if team_id is not None else _owner(give))
+    if me is None:
+        return {"error": "Couldn't tell which fantasy team is making this trade; pass team_id",
+                "missing_ids": missing}
+    them = _lookup(rosters, _owner(recv, exclude=me))
+
+    give_set = {p.get("playerId") for p in give}
+    recv_set = {p.get("playerId") for p in recv}
+    roster = {t: {p.get("playerId") for p in team["players"]} for t, team in rosters.items()}
+    after = {me: (roster[me] - give_set) | recv_set}
+    if them is not None:
+        after[them] = (roster[them] - recv_set) | give_set
+
+    log = get_game_log(db)
+    dist = get_game_distributions(db)
+    rows = get_game_log_rows(db)
+
+    matchups = get_matchups(db)
+    periods = get_week_periods(db)
+    weeks = []
+    week_info = []
+    # score columns: (team, "before" | "after"); teams not in the trade only get "before"
+    season_cols = [(me, "before"), (me, "after")]
+    for week in sorted(matchups):
+        first, last = periods[week]
+        if last <= log.n_periods or first > log.n_schedule_periods:
+            continue  # already played / past the end of the schedule data
+        opponent = {}
+        for home, away, final in matchups[week]:
+            if final:
+                continue
+            home, away = _lookup(rosters, home), _lookup(rosters, away)
+            opponent[home], opponent[away] = away, home
+        if opponent.get(me) is None:
+            continue
+
+        cols = list(season_cols)
+        comparisons = []
+        for team, label in ((me, "you"), (them, "them")):
+            opp = opponent.get(team)
+            if team is None or opp is None:
+                continue
+            for when in ("before", "after"):
+                opp_col = (opp, when if opp in after else "before")
+                for col in ((team, when), opp_col):
+                    if col not in cols:
+                        cols.append(col)
+                comparisons.append((f"{label}_{when}", cols.index((team, when)), cols.index(opp_col)))
+
+        rosters_by_col = [after[t] if when == "after" else roster[t] for t, when in cols]
+        weeks.append(_Week(week, (first, last), rosters_by_col, [roster[t] for t, _ in cols], rows, dist, log,
+                           comparisons))
+        week_info.append((week, opponent[me], cols))
+
+    if not weeks:
+        return {"error": "No remaining matchups on the scoreboard for this team", "missing_ids": missing}
+
+    chunks = [TRIAL_CHUNK] * (n_trials // TRIAL_CHUNK) + ([n_trials % TRIAL_CHUNK] if n_trials % TRIAL_CHUNK else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    season_idx = [0, 1]
+    def run(a):
+        return _run_chunk(weeks, dist.samples, season_idx, *a)
+
+    if max_workers is None:
+        parts = list(_simulation_pool().map(run, zip(seeds, chunks)))
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            parts = list(pool.map(run, zip(seeds, chunks)))
+
+    wins = np.sum([np.array(w) for w, _ in parts], axis=0) / n_trials  # (weeks, comparisons)
+    season = np.vstack([s for _, s in parts])
+
+    week_rows = []
+    expected = Counter()
+    for k, (week, opp, cols) in enumerate(week_info):
+        probs = {label: float(wins[k][j]) for j, (label, _, _) in enumerate(weeks[k].comparisons)}
+        expected.update(probs)
+        week_rows.append({
+            "week": week,
+            "opponent_id": opp,
+            "opponent_name": rosters.get(opp, {}).get("team_name"),
+            "games_before": int(weeks[k].games[0]),
+            "games_after": int(weeks[k].games[1]),
+            "win_prob_before": probs["you_before"],
+            "win_prob_after": probs["you_after"],
+            "delta": probs["you_after"] - probs["you_before"],
+        })
+
+    def points(col):
+        values = season[:, col]
+        p10, p50, p90 = np.percentile(values, [10, 50, 90])
+        return {"mean": float(values.mean()), "p10": float(p10), "p50": float(p50), "p90": float(p90)}
+
+    player_rows = np.array([rows.get(p.get("playerId"), -1) for p in give + recv], dtype=np.intp)
+    remaining = log.scheduled[:, log.n_periods:].sum(axis=1)
+    players = []
+    for p, row in zip(give + recv, player_rows):
+        known = row >= 0
+        mean = float(dist.mean[row]) if known else 0.0
+        players.append({
+            "name": p.get("name"),
+            "side": "give" if p in give else "recv",
+            "games_remaining": int(remaining[row]) if known else 0,
+            "mean_per_game": mean,
+            "std_per_game": float(dist.std[row]) if known else 0.0,
+            "projected_total": mean * int(remaining[row]) if known else 0.0,
+        })
+
+    result = {
+        "team_id": me,
+        "team_name": rosters[me]["team_name"],
+        "counterparty_id": them,
+        "counterparty_name": rosters[them]["team_name"] if them is not None else None,
+        "n_trials": n_trials,
+        "weeks": week_rows,
+        "expected_wins_before": expected["you_before"],
+        "expected_wins_after": expected["you_after"],
+        "expected_wins_delta": expected["you_after"] - expected["you_before"],
+        "points_before": points(0),
+        "points_after": points(1),
+        "players": players,
+        "missing_ids": missing,
+    }
+    if them is not None:
+        result["counterparty"] = {
+            "expected_wins_before": expected["them_before"],
+            "expected_wins_after": expected["them_after"],
+            "expected_wins_delta": expected["them_after"] - expected["them_before"],
+        }
+    return result
+
+
+__all__ = ["GameDistributions", "get_game_distributions", "simulate_trade", "REQUEST_TRIALS"]
@@ -1,27 +1,24 @@
-from typing import Optional
+from typing import Iterable, Optional
+from .player_store import get_player_store
 
-# Collections
-TEAM_PLAYER_COL = "team_players"
-FREE_AGENTS_COL = "free_agents"
+def get_team_players(db, fields: Optional[Iterable[str]] = None):
+    '''Returns all rostered players across the League (optionally projected to `fields`)'''
+    return list(get_player_store(db).team_players(fields))
 
-def get_team_players(db):
-    '''Returns all rostered players across the League'''
-    q = db.collection(TEAM_PLAYER_COL)
-    return [doc.to_dict() for doc in q.stream()]
 
-
-def get_free_agents(db, position: Optional[str] = None, injured: Optional[bool] = None, limit: Optional[int] = None):
-    '''Returns free agents, optionally filtered by position / injured flag'''
-    q = db.collection(FREE_AGENTS_COL)
+def get_free_agents(db, position: Optional[str] = None, injured: Optional[bool] = None, limit: Optional[int] = None,
+                    fields: Optional[Iterable[str]] = None):
+    '''Returns free agents, optionally filtered by position / injured flag and projected to `fields`'''
+    players = get_player_store(db).free_agents(fields)
 
     if position is not None:
-        q = q.where("position", "==", position)
+        players = [p for p in players if p.get("position") == position]
     if injured is not None:
-        q = q.where('injured', '==', injured)
+        players = [p for p in players if p.get("injured") == injured]
     if limit is not None:
-        q = q.limit(limit)
+        players = players[:limit]
     
-    return [doc.to_dict() for doc in q.stream()]
+    return list(players)
 
 
 __all__ = [
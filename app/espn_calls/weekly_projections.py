@@ -0,0 +1,248 @@
+from datetime import datetime
+from typing import Dict, Optional
+import numpy as np
+from .player_store import get_player_store
+from .player_table import get_player_table
+from .game_logs import get_game_log, get_game_log_rows
+from .trade_finder import get_fantasy_rosters
+from .schedule_calls import get_matchups, get_week_periods
+from .league_settings import get_lineup_slots
+from .schedule_calendar import _to_epoch
+
+# Share of a player's projection counted per game, by injuryStatus. Unknown
+# statuses count fully unless the player is flagged injured.
+INJURY_AVAILABILITY = {
+    "ACTIVE": 1.0,
+    "DAY_TO_DAY": 0.5,
+    "OUT": 0.0,
+    "INJURY_RESERVE": 0.0,
+    "SUSPENSION": 0.0,
+}
+
+# Players parked in these lineup slots can't be started, so they never score
+# for their fantasy team. Everyone else (bench included) competes for the
+# team's starting slots day by day.
+NON_SCORING_SLOTS = ("IR",)
+
+
+class ProjectionMatrix:
+    """
+    Projected fantasy points for every player on every scoring period (day):
+    points[i, d] = per-game projection x availability if player i's NBA team
+    plays on period d + 1, else 0. Rows follow PlayerTable / GameLog order.
+
+    Team totals only count what a team can start: each day, its `starters`
+    best players with a game (bench players fill in when starters are off;
+    positions aren't checked, see /api/lineups for that).
+
+    Built once per snapshot. Row-wise cumulative sums over the days make any
+    [first, last] window one subtraction per player or team, so every request
+    just slices it.
+    """
+
+    def __init__(self, table, log, rosters: Dict, rows: Dict, first_tipoffs: np.ndarray, starters: int):
+        n = len(table)
+        per_game = np.where(np.isnan(table.projected_avg_points), table.avg_points, table.projected_avg_points)
+        per_game = np.nan_to_num(per_game)
+
+        statuses = [p.get("injuryStatus") for p in table.players]
+        self.availability = np.array([
+            INJURY_AVAILABILITY.get(status, 0.0 if injured else 1.0)
+            for status, injured in zip(statuses, table.is_injured)
+        ])
+
+        # fantasy team code per row, -1 for free agents
+        self.team_ids = list(rosters)
+        self.team_names = [rosters[t]["team_name"] for t in self.team_ids]
+        self.team_code = np.full(n, -1, dtype=np.intp)
+        for code, team_id in enumerate(self.team_ids):
+            for p in rosters[team_id]["players"]:
+                row = rows.get(p.get("playerId"))
+                if row is not None and p.get("lineupSlot") not in NON_SCORING_SLOTS:
+                    self.team_code[row] = code
+
+        self.projection = per_game
+        self.per_game = per_game * self.availability
+        self.games = log.scheduled.astype(np.float32)
+        self.points = self.per_game[:, None] * self.games
+        self.n_periods = log.n_periods
+        self.n_schedule_periods = log.n_schedule_periods
+        self.first_tipoffs = first_tipoffs
+
+        def cum(a):
+            out = np.zeros((a.shape[0], a.shape[1] + 1))
+            np.cumsum(a, axis=1, out=out[:, 1:])
+            return out
+
+        self.starters = starters
+        self._points_cum = cum(self.points)
+        self._games_cum = cum(self.games)
+        self._team_points_cum = cum(self._started(self.points))
+        self._team_games_cum = cum(self._started(self.games * (self.availability > 0)[:, None]))
+        self._team_actual_cum = cum(self._started(log.fp))
+
+    @staticmethod
+    def _window(cs: np.ndarray, first: int, last: int) -> np.ndarray:
+        """Per-row sum over periods first..last (1-based, inclusive), clipped to the data."""
+        top = cs.shape[1] - 1
+        lo = min(max(first - 1, 0), top)
+        hi = min(max(last, 0), top)
+        return cs[:, max(hi, lo)] - cs[:, lo]
+
+    def player_points(self, first: int, last: int) -> np.ndarray:
+        return self._window(self._points_cum, first, last)
+
+    def player_games(self, first: int, last: int) -> np.ndarray:
+        return self._window(self._games_cum, first, last)
+
+    def _started(self, values: np.ndarray) -> np.ndarray:
+        """(teams, periods): per day, the sum of each team's `starters` largest values."""
+        out = np.zeros((len(self.team_ids), values.shape[1]))
+        k = self.starters
+        for code in range(len(self.team_ids)):
+            v = values[self.team_code == code]
+            if len(v) > k:
+                v = np.partition(v, len(v) - k, axis=0)[len(v) - k:] if k > 0 else v[:0]
+            out[code] = v.sum(axis=0)
+        return out
+
+    def team_points(self, first: int, last: int) -> np.ndarray:
+        """Projected points per fantasy team (team_ids order) over periods first..last, starters only."""
+        return self._window(self._team_points_cum, first, last)
+
+    def team_games(self, first: int, last: int) -> np.ndarray:
+        """Starts per fantasy team: games by available players, at most `starters` a day."""
+        return self._window(self._team_games_cum, first, last)
+
+    def team_actual(self, first: int, last: int) -> np.ndarray:
+        """
+        Points the current rosters scored over periods first..last (box scores
+        only), counting each day's `starters` best games -- the snapshot doesn't
+        say who was actually in the lineup.
+        """
+        return self._window(self._team_actual_cum, first, last)
+
+    def current_period(self, now: Optional[datetime] = None) -> int:
+        """First scoring period whose first game tips off today or later (naive, like the schedule pages)."""
+        today = (now or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+        known = self.first_tipoffs >= 0
+        if not known.any():
+            return self.n_periods + 1
+        upcoming = np.flatnonzero(known & (self.first_tipoffs >= np.datetime64(today, "s").astype(np.int64)))
+        return int(upcoming[0]) + 1 if len(upcoming) else self.n_schedule_periods + 1
+
+    def period_date(self, period: int) -> Optional[str]:
+        """ISO date of a scoring period's first game, None when nobody plays."""
+        if not 0 < period <= len(self.first_tipoffs) or self.first_tipoffs[period - 1] < 0:
+            return None
+        return str(np.datetime64(int(self.first_tipoffs[period - 1]), "s").astype("datetime64[D]"))
+
+
+def _first_tipoffs(store, table, n_periods: int) -> np.ndarray:
+    """Epoch seconds of each period's first game (-1 when nobody plays), one schedule per NBA team."""
+    out = np.full(n_periods, np.iinfo(np.int64).max, dtype=np.int64)
+    schedules = store.schedules()
+    _, first_rows = np.unique(table.pro_team_codes, return_index=True)
+    for row in first_rows:
+        schedule = schedules.get(table.player_id[row]) or {}
+        periods = [int(k) for k in schedule if isinstance(k, str) and k.isdigit() and 0 < int(k) <= n_periods]
+        if not periods:
+            continue
+        times = _to_epoch([str(schedule[str(k)].get("date") or "") for k in periods])
+        known = times >= 0  # games without a (parseable) date don't move a period's first tipoff
+        np.minimum.at(out, np.array(periods)[known] - 1, times[known])
+    out[out == np.iinfo(np.int64).max] = -1
+    return out
+
+
+def get_projection_matrix(db) -> ProjectionMatrix:
+    """ProjectionMatrix for the current snapshot, built once."""
+    store = get_player_store(db)
+
+    def build():
+        table = get_player_table(db)
+        log = get_game_log(db)
+        return ProjectionMatrix(
+            table, log, get_fantasy_rosters(db), get_game_log_rows(db),
+            _first_tipoffs(store, table, log.n_schedule_periods),
+            sum(get_lineup_slots(db).values()),
+        )
+
+    return store.derived("projection_matrix", build)
+
+
+def resolve_week(matrix: ProjectionMatrix, periods: Dict, week: Optional[int] = None,
+                 period: Optional[int] = None, now: Optional[datetime] = None) -> Dict:
+    """
+    {"week", "first_period", "last_period", "current_period"} for `week`
+    (default: the week containing the current scoring period, or `period`),
+    or {"error", ...} when the scoreboard has no such week.
+    """
+    if not periods:
+        return {"error": "No matchups on the scoreboard"}
+    today = int(period) if period is not None else matrix.current_period(now)
+    if week is None:
+        week = next((w for w in sorted(periods) if periods[w][1] >= today), max(periods))
+    week = int(week)
+    if week not in periods:
+        return {"error": f"Unknown week: {week}", "weeks": sorted(periods)}
+    first, last = periods[week]
+    return {"week": week, "first_period": first, "last_period": last, "current_period": today}
+
+
+def project_week(db, week: Optional[int] = None, period: Optional[int] = None) -> Dict:
+    """
+    Matchup projections for every fantasy team for one matchup week (default:
+    the week containing today's scoring period, or `period`). Each team gets
+    the points its current roster already scored in the week, the projection
+    for the rest of it and the total; each matchup gets both sides plus the
+    projected margin.
+    """
+    matrix = get_projection_matrix(db)
+    window = resolve_week(matrix, get_week_periods(db), week, period)
+    if "error" in window:
+        return dict(window, teams=[], matchups=[])
+    week, first, last, today = window["week"], window["first_period"], window["last_period"], window["current_period"]
+
+    # box scores cover what's been played up to the last scrape; everything after is projected
+    observed_to = min(max(today, first) - 1, matrix.n_periods, last)
+    banked = matrix.team_actual(first, observed_to)
+    remaining = matrix.team_points(observed_to + 1, last)
+    games = matrix.team_games(observed_to + 1, last)
+
+    teams = {}
+    for code, team_id in enumerate(matrix.team_ids):
+        teams[team_id] = {
+            "team_id": team_id,
+            "team_name": matrix.team_names[code],
+            "banked_points": float(banked[code]),
+            "projected_remaining": float(remaining[code]),
+            "games_remaining": int(games[code]),
+            "projected_total": float(banked[code] + remaining[code]),
+        }
+
+    lookup = {str(t): t for t in teams}
+    rows = []
+    for home, away, final in get_matchups(db).get(week, []):
+        h, a = teams.get(lookup.get(str(home))), teams.get(lookup.get(str(away)))
+        if h is None or a is None:
+            continue
+        rows.append({
+            "home": h,
+            "away": a,
+            "final": final,
+            "projected_margin": h["projected_total"] - a["projected_total"],
+            "favorite": h["team_id"] if h["projected_total"] >= a["projected_total"] else a["team_id"],
+        })
+
+    return {
+        "week": week,
+        "first_period": first,
+        "last_period": last,
+        "current_period": today,
+        "teams": sorted(teams.values(), key=lambda t: t["projected_total"], reverse=True),
+        "matchups": rows,
+    }
+
+
+__all__ = ["ProjectionMatrix", "get_projection_matrix", "project_week", "resolve_week"]
@@ -0,0 +1,293 @@
+import threading
+import numpy as np
+from app.espn_calls.player_store import get_player_store
+from app.espn_calls.player_table import get_player_table, NUMERIC_FIELDS
+from app.espn_calls.game_logs import get_game_log
+
+# Game-log features, all computed "as of" a scoring period from earlier periods
+# only (plus the team's schedule ahead), so historical cutoffs can be used as
+# training rows.
+GAME_LOG_FEATURES = (
+  "season_avg",            # fantasy points per game so far
+  "fp_last_7",             # points per game over the last 7 / 15 / 30 periods
+  "fp_last_15",
+  "fp_last_30",
+  "fp_std_30",             # game-to-game volatility over the last 30 periods
+  "min_last_15",           # minutes per game (role proxy)
+  "usage_last_15",         # (FGA + 0.44 FTA + TO) per minute (usage proxy)
+  "availability_last_15",  # share of the team's games actually played
+  "games_next_7",          # team games in the next 7 periods
+)
+
+ROLLING_WINDOWS = (7, 15, 30)
+
+# Training target: points per game over the TARGET_PERIODS after each cutoff
+TARGET_PERIODS = 7
+# Cutoffs need this much history before they make useful training rows
+MIN_HISTORY_PERIODS = 14
+# Below this many training rows the registry keeps the 3-feature model
+MIN_TRAINING_ROWS = 200
+# Most recent share of cutoffs held out for r2_test
+TEST_SHARE = 0.2
+RIDGE_ALPHA = 1e-3
+
+
+class _Cumulative:
+  '''Running sums over the period axis: window sums for any cutoff are one subtraction.'''
+
+  def __init__(self, log):
+    def cum(a):
+      out = np.zeros((a.shape[0], a.shape[1] + 1))
+      np.cumsum(a, axis=1, out=out[:, 1:])
+      return out
+
+    fp = log.fp
+    self.fp = cum(fp)
+    self.fp2 = cum(fp * fp)
+    self.gp = cum(log.played.astype(float))
+    self.minutes = cum(log.stat("MIN"))
+    self.usage = cum(log.stat("FGA") + 0.44 * log.stat("FTA") + log.stat("TO"))
+    self.scheduled = cum(log.scheduled.astype(float))
+
+  @staticmethod
+  def window(cs, start, end):
+    '''Per-player sum over periods [start, end) (0-based columns), clipped to the data.'''
+    last = cs.shape[1] - 1
+    start = min(max(start, 0), last)
+    end = min(max(end, 0), last)
+    return cs[:, end] - cs[:, start]
+
+
+def _ratio(num, den, fill):
+  out = np.array(fill, dtype=float, copy=True) if np.ndim(fill) else np.full(len(num), float(fill))
+  np.divide(num, den, out=out, where=den > 0)
+  return out
+
+
+def game_log_features(cum: _Cumulative, t: int) -> np.ndarray:
+  '''
+  (n, len(GAME_LOG_FEATURES)) features as of cutoff t: periods before column t
+  are history, column t onwards is the future. No NaNs -- players without
+  history get zeros.
+  '''
+  w = _Cumulative.window
+  season_gp = w(cum.gp, 0, t)
+  season_avg = _ratio(w(cum.fp, 0, t), season_gp, 0.0)
+
+  cols = [season_avg]
+  for days in ROLLING_WINDOWS:
+    cols.append(_ratio(w(cum.fp, t - days, t), w(cum.gp, t - days, t), season_avg))
+
+  gp30 = w(cum.gp, t - 30, t)
+  mean30 = _ratio(w(cum.fp, t - 30, t), gp30, 0.0)
+  var30 = _ratio(w(cum.fp2, t - 30, t), gp30, 0.0) - mean30 ** 2
+  cols.append(np.sqrt(np.clip(var30, 0.0, None)))
+
+  gp15 = w(cum.gp, t - 15, t)
+  minutes15 = w(cum.minutes, t - 15, t)
+  cols.append(_ratio(minutes15, gp15, 0.0))
+  cols.append(_ratio(w(cum.usage, t - 15, t), minutes15, 0.0))
+  cols.append(_ratio(gp15, w(cum.scheduled, t - 15, t), 0.0))
+  cols.append(w(cum.scheduled, t, t + 7))
+  return np.column_stack(cols)
+
+
+def _target(cum: _Cumulative, t: int):
+  '''(points per game over [t, t + TARGET_PERIODS), rows with at least one game).'''
+  gp = _Cumulative.window(cum.gp, t, t + TARGET_PERIODS)
+  fp = _Cumulative.window(cum.fp, t, t + TARGET_PERIODS)
+  has = gp > 0
+  return _ratio(fp, gp, 0.0), has
+
+
+class GameLogRegression:
+  '''
+  Linear model over GAME_LOG_FEATURES, fitted from sufficient statistics.
+  Same predict() / coef_ / intercept_ surface as the sklearn LinearRegression
+  the registry falls back to.
+  '''
+
+  def __init__(self, coef, intercept, feature_order):
+    self.coef_ = np.asarray(coef, dtype=float)
+    self.intercept_ = float(intercept)
+    self.feature_order = tuple(feature_order)
+
+  def predict(self, X):
+    return np.asarray(X, dtype=float) @ self.coef_ + self.intercept_
+
+
+def _solve(xtx, xty):
+  # small ridge on the coefficients (not the intercept, the last column) for stability
+  reg = np.eye(len(xty)) * RIDGE_ALPHA * max(np.trace(xtx) / len(xty), 1.0)
+  reg[-1, -1] = 0.0
+  return np.linalg.solve(xtx + reg, xty)
+
+
+def _r2(beta, xtx, xty, yty, n):
+  if n == 0:
+    return None
+  sse = yty - 2 * beta @ xty + beta @ xtx @ beta
+  sst = yty - xty[-1] ** 2 / n  # xty[-1] = sum(y) thanks to the intercept column
+  return float(1 - sse / sst) if sst > 0 else None
+
+
+class IncrementalTrainer:
+  '''
+  Keeps per-cutoff training rows and their sufficient statistics (XᵀX, Xᵀy,
+  yᵀy, n) for the game-log model. When the new GameLog only appended periods
+  to the one seen last time, the existing cutoffs are unchanged and only
+  cutoffs whose target window just completed are added; anything else starts
+  over.
+  '''
+
+  def __init__(self):
+    self._generation = None
+    self._stats = {}  # cutoff -> (xtx, xty, yty, n)
+    self._rows = {}   # cutoff -> (X, y) without the intercept column
+
+  def update(self, log):
+    if log.generation == self._generation:
+      return 0  # already up to date with this log
+    if log.extends is None or log.extends != self._generation:
+      self._stats = {}
+      self._rows = {}
+    self._generation = log.generation
+
+    cutoffs = range(MIN_HISTORY_PERIODS, log.n_periods - TARGET_PERIODS + 1)
+    new = [t for t in cutoffs if t not in self._stats]
+    if new:
+      cum = _Cumulative(log)
+      for t in new:
+        y, has = _target(cum, t)
+        features, y = game_log_features(cum, t)[has], y[has]
+        self._rows[t] = (features, y)
+        X = np.column_stack([features, np.ones(len(y))])
+        self._stats[t] = (X.T @ X, X.T @ y, float(y @ y), len(y))
+    return len(new)
+
+  def training_set(self):
+    '''(X, y, cutoffs) over every cutoff seen so far, oldest first; None when there are too few rows.'''
+    cutoffs = sorted(self._rows)
+    if not cutoffs or sum(len(self._rows[t][1]) for t in cutoffs) < MIN_TRAINING_ROWS:
+      return None
+    return (
+      np.vstack([self._rows[t][0] for t in cutoffs]),
+      np.concatenate([self._rows[t][1] for t in cutoffs]),
+      np.concatenate([np.full(len(self._rows[t][1]), t) for t in cutoffs]),
+    )
+
+  def fit(self):
+    '''(GameLogRegression, metrics), or None when there isn't enough history yet.'''
+    cutoffs = sorted(self._stats)
+    n_rows = sum(self._stats[t][3] for t in cutoffs)
+    if not cutoffs or n_rows < MIN_TRAINING_ROWS:
+      return None
+
+    def total(ts):
+      k = len(GAME_LOG_FEATURES) + 1
+      xtx, xty, yty, n = np.zeros((k, k)), np.zeros(k), 0.0, 0
+      for t in ts:
+        a, b, c, d = self._stats[t]
+        xtx, xty, yty, n = xtx + a, xty + b, yty + c, n + d
+      return xtx, xty, yty, n
+
+    # time-ordered holdout: fit on the older cutoffs, score on the newest ones
+    split = max(1, int(len(cutoffs) * (1 - TEST_SHARE))) if len(cutoffs) > 1 else len(cutoffs)
+    train, test = total(cutoffs[:split]), total(cutoffs[split:])
+    r2_test = _r2(_solve(train[0], train[1]), *test) if test[3] else None
+
+    everything = total(cutoffs)
+    beta = _solve(everything[0], everything[1])
+    model = GameLogRegression(beta[:-1], beta[-1], GAME_LOG_FEATURES)
+    metrics = {
+      "n_samples": everything[3],
+      "n_features": len(GAME_LOG_FEATURES),
+      "n_cutoffs": len(cutoffs),
+      "r2_train": _r2(beta, *everything),
+      "r2_test": r2_test,
+      "coef": model.coef_.tolist(),
+      "intercept": model.intercept_,
+      "feature_order": list(GAME_LOG_FEATURES),
+    }
+    return model, metrics
+
+
+_trainers = {}
+_trainers_lock = threading.Lock()
+
+
+def _trainer(db):
+  with _trainers_lock:
+    trainer = _trainers.get(id(db))
+    if trainer is None or trainer[0] is not db:
+      trainer = (db, IncrementalTrainer())
+      _trainers[id(db)] = trainer
+  return trainer[1]
+
+
+def game_log_training_set(db):
+  '''
+  Explicit training rows for the game-log features: (X, y, cutoffs), one row
+  per (player, cutoff) with games in the target window, oldest cutoff first.
+  None when the logs are too short to train on. Goes through the db's
+  IncrementalTrainer, so only cutoffs new since the last snapshot are built.
+  '''
+  log = get_game_log(db)
+  trainer = _trainer(db)
+  with _trainers_lock:
+    trainer.update(log)
+    return trainer.training_set()
+
+
+def train_game_log_model(db):
+  '''
+  Fit the game-log model for the current snapshot, reusing the sufficient
+  statistics from the previous snapshot when the scrape only appended periods.
+  Returns (model, metrics) or None when the logs are too short to train on.
+  '''
+  log = get_game_log(db)
+  trainer = _trainer(db)
+  with _trainers_lock:
+    added = trainer.update(log)
+    fitted = trainer.fit()
+  if fitted is not None:
+    fitted[1]["new_cutoffs"] = added
+  return fitted
+
+
+def waiver_features(db, feature_order):
+  '''
+  Feature matrix for every PlayerTable row in `feature_order` (PlayerTable
+  numeric fields and/or GAME_LOG_FEATURES as of now). Missing values are NaN.
+  Built once per snapshot and feature order.
+  '''
+  feature_order = tuple(feature_order)
+
+  def build():
+    table = get_player_table(db)
+    live = None
+    cols = []
+    for name in feature_order:
+      if name in NUMERIC_FIELDS:
+        cols.append(getattr(table, name))
+      elif name in GAME_LOG_FEATURES:
+        if live is None:
+          log = get_game_log(db)
+          live = game_log_features(_Cumulative(log), log.n_periods)
+        cols.append(live[:, GAME_LOG_FEATURES.index(name)])
+      else:
+        raise KeyError(f"Unknown waiver feature: {name}")
+    return np.column_stack(cols) if cols else np.empty((len(table), 0))
+
+  return get_player_store(db).derived(("waiver_features", feature_order), build)
+
+
+__all__ = [
+  "GAME_LOG_FEATURES",
+  "GameLogRegression",
+  "IncrementalTrainer",
+  "game_log_features",
+  "game_log_training_set",
+  "train_game_log_model",
+  "waiver_features",
+]
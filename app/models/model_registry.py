@@ -0,0 +1,225 @@
+import os
+import re
+import tempfile
+import threading
+import joblib
+from app.espn_calls.player_store import get_player_store
+from app.espn_calls.player_table import FEATURE_FIELDS
+from app.models.waiver_regression import load_training_data, train_model
+from app.models.features import train_game_log_model, game_log_training_set, GAME_LOG_FEATURES
+from app.models.training_service import CV_FOLDS
+
+MODEL_NAME = "waiver_regression"
+
+# Persisted models kept on disk (the current snapshot's plus a few older ones)
+KEEP_VERSIONS = 3
+
+# Versions PlayerStore makes up when no scrape published one. They only mean
+# something inside one process, so those models are never written to disk.
+LOCAL_VERSION_PREFIX = "local-"
+
+_UNSAFE_CHARS_RE = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+class ModelRegistry:
+  '''
+  Waiver regression model trained once per data snapshot.
+
+  The model for the current snapshot version is kept in memory; with a
+  `model_dir` it's also persisted with joblib (model + metrics + feature
+  order), so every worker after the first one just loads the file. A new
+  scrape publishes a new version, which is the only thing that triggers
+  a reload / retrain.
+  '''
+
+  def __init__(self, db, model_dir=None, service=None):
+    self.db = db
+    self.model_dir = model_dir
+    self.service = service
+    self._lock = threading.Lock()
+    self._entry = None  # {"version", "model", "metrics", "feature_order"}
+    self._latest_version = None
+
+  def _path(self, version):
+    safe = _UNSAFE_CHARS_RE.sub("_", str(version))
+    return os.path.join(self.model_dir, f"{MODEL_NAME}-{safe}.joblib")
+
+  def _persistent(self, version):
+    return bool(self.model_dir) and not str(version).startswith(LOCAL_VERSION_PREFIX)
+
+  def _load(self, version):
+    path = self._path(version)
+    if not os.path.exists(path):
+      return None
+    try:
+      entry = joblib.load(path)
+    except Exception:
+      return None  # truncated / written by an incompatible sklearn -> retrain
+    if entry.get("version") != version:
+      return None
+    return entry
+
+  def _load_latest(self):
+    '''Newest model persisted for any version (a previous scrape's), or None.'''
+    if not self.model_dir or not os.path.isdir(self.model_dir):
+      return None
+    for path in self._files():
+      try:
+        entry = joblib.load(path)
+      except Exception:
+        continue
+      if entry.get("model") is not None:
+        return entry
+    return None
+
+  def _save(self, entry):
+    os.makedirs(self.model_dir, exist_ok=True)
+    # write to a temp file and rename so other workers never load a partial file
+    fd, tmp = tempfile.mkstemp(dir=self.model_dir, suffix=".tmp")
+    try:
+      with os.fdopen(fd, "wb") as f:
+        joblib.dump(entry, f)
+      os.replace(tmp, self._path(entry["version"]))
+    except Exception:
+      if os.path.exists(tmp):
+        os.remove(tmp)
+      raise
+    self._prune()
+
+  def _files(self):
+    '''Persisted model files, newest first.'''
+    prefix = f"{MODEL_NAME}-"
+    files = [
+      os.path.join(self.model_dir, name) for name in os.listdir(self.model_dir)
+      if name.startswith(prefix) and name.endswith(".joblib")
+    ]
+    files.sort(key=os.path.getmtime, reverse=True)
+    return files
+
+  def _prune(self):
+    for path in self._files()[KEEP_VERSIONS:]:
+      try:
+        os.remove(path)
+      except OSError:
+        pass  # another worker got there first
+
+  def _train(self, version):
+    # game-log model once there's enough history, else the 3-feature regression
+    trained = train_game_log_model(self.db)
+    if trained is not None:
+      model, metrics = trained
+    else:
+      X, y = load_training_data(self.db)
+      model, metrics = train_model(X, y)
+    metrics["snapshot_version"] = version
+    return {
+      "version": version,
+      "model": model,
+      "metrics": metrics,
+      "feature_order": metrics["feature_order"],
+    }
+
+  def _training_set(self, version):
+    '''(X, y, groups, feature_order) for the background service, None if the snapshot moved on.'''
+    if get_player_store(self.db).snapshot_version != version:
+      return None  # a newer scrape landed while this job was queued; its own job will train
+    data = game_log_training_set(self.db)
+    if data is not None:
+      X, y, cutoffs = data
+      return X, y, cutoffs, GAME_LOG_FEATURES
+    X, y = load_training_data(self.db)
+    if len(y) < CV_FOLDS:
+      return None
+    return X, y, None, FEATURE_FIELDS
+
+  def _on_trained(self, version, result):
+    if result is None:
+      return
+    model, metrics = result
+    metrics["snapshot_version"] = version
+    entry = {
+      "version": version,
+      "model": model,
+      "metrics": metrics,
+      "feature_order": metrics["feature_order"],
+    }
+    if self._persistent(version):
+      self._save(entry)
+    with self._lock:
+      # never swap an older version's model over a newer snapshot
+      if version == self._latest_version:
+        self._entry = entry
+
+  def _submit(self, version):
+    self.service.submit(
+      (id(self), version),
+      lambda: self._training_set(version),
+      lambda key, result: self._on_trained(version, result),
+    )
+
+  def get(self):
+    '''
+    Returns (model, metrics) for the current snapshot.
+
+    Without a training service the model is trained in-process the first time
+    a version is seen (unless the model dir already has it). With one, a new
+    version queues a background job and requests keep getting the last good
+    model -- this worker's, else the newest one in the model dir -- until the
+    finished one is swapped in. A worker with no model at all gets
+    (None, {"status": "training", ...}) meanwhile; nothing is fit on the
+    request path.
+    '''
+    version = get_player_store(self.db).snapshot_version
+    entry = self._entry
+    if entry is not None and entry["version"] == version:
+      return entry["model"], entry["metrics"]
+
+    with self._lock:
+      self._latest_version = version
+      entry = self._entry
+      if entry is None or entry["version"] != version:
+        loaded = self._load(version) if self._persistent(version) else None
+        if loaded is not None:
+          self._entry = entry = loaded
+        elif self.service is None:
+          entry = self._train(version)
+          if self._persistent(version):
+            self._save(entry)
+          self._entry = entry
+        else:
+          self._submit(version)  # no-op while the job is queued / running
+          if entry is None:
+            self._entry = entry = self._load_latest()
+          if entry is None:
+            return None, {"status": "training", "snapshot_version": version}
+    return entry["model"], entry["metrics"]
+
+  def refresh(self):
+    '''Make sure the current snapshot's model is loaded (e.g. right after a scrape or on worker start).'''
+    return self.get()
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def get_model_registry(db, model_dir=None, service=None):
+  '''Return the process-wide ModelRegistry for `db`, creating it on first use.'''
+  with _registries_lock:
+    registry = _registries.get(id(db))
+    if registry is None or registry.db is not db:
+      registry = ModelRegistry(db, model_dir=model_dir, service=service)
+      _registries[id(db)] = registry
+    return registry
+
+
+def get_waiver_model(db, model_dir=None, service=None):
+  '''(model, metrics) for the current data snapshot — no training on the request path once it's warm.'''
+  return get_model_registry(db, model_dir=model_dir, service=service).get()
+
+
+__all__ = [
+  "ModelRegistry",
+  "get_model_registry",
+  "get_waiver_model",
+]
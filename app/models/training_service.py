@@ -0,0 +1,175 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
+from sklearn.ensemble import HistGradientBoostingRegressor
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.metrics import r2_score
+from sklearn.model_selection import KFold
+
+# Candidate model types, by name (names are what get sent to the worker processes)
+CANDIDATES = {
+  "linear": lambda: LinearRegression(),
+  "ridge": lambda: Ridge(alpha=1.0),
+  "gbm": lambda: HistGradientBoostingRegressor(max_iter=150, learning_rate=0.1, random_state=42),
+}
+
+CV_FOLDS = 5
+
+
+def _fit(name, X, y):
+  '''Fit one candidate on all rows, run in a worker process. Returns (model, r2 on those rows).'''
+  model = CANDIDATES[name]()
+  model.fit(X, y)
+  return model, float(r2_score(y, model.predict(X)))
+
+
+def _cv_fold(name, X, y, train_idx, test_idx):
+  '''One candidate on one fold, run in a worker process. Returns the fold's r2.'''
+  model = CANDIDATES[name]()
+  model.fit(X[train_idx], y[train_idx])
+  return float(r2_score(y[test_idx], model.predict(X[test_idx])))
+
+
+def _folds(n, groups=None, n_folds=CV_FOLDS):
+  '''
+  (train_idx, test_idx) pairs. With `groups` (e.g. the cutoff period of each
+  game-log row) folds are contiguous blocks of groups, so rows from the same
+  cutoff never sit on both sides; otherwise a shuffled KFold.
+  '''
+  if groups is None:
+    return list(KFold(n_splits=min(n_folds, n), shuffle=True, random_state=42).split(np.arange(n)))
+  uniq = np.unique(groups)
+  folds = []
+  for block in np.array_split(uniq, min(n_folds, len(uniq))):
+    test = np.isin(groups, block)
+    folds.append((np.flatnonzero(~test), np.flatnonzero(test)))
+  return [f for f in folds if len(f[0]) and len(f[1])]
+
+
+class TrainingService:
+  '''
+  Fits waiver models off the request path.
+
+  A job prepares its training set in a background thread of the web process
+  (it needs the process' PlayerStore), then fans every candidate model x CV
+  fold out to a process pool as plain arrays, refits and scores the best
+  candidate on all rows in the pool and hands (model, metrics) to the job's
+  callback. Jobs are keyed by
+  data version: submitting a version that's already queued or finished
+  returns the existing job.
+  '''
+
+  def __init__(self, max_workers=None, candidates=None, n_folds=CV_FOLDS):
+    self.max_workers = max_workers
+    self.candidates = list(candidates or CANDIDATES)
+    self.n_folds = n_folds
+    self._lock = threading.Lock()
+    self._jobs = {}
+    self._pool = None
+    # one coordinating thread: jobs run one after another, their fits in parallel
+    self._coordinator = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-training")
+
+  def _processes(self):
+    with self._lock:
+      if self._pool is None:
+        # never fork the web process: its other threads may hold locks the children
+        # would inherit. Workers start clean and import this module by name; the
+        # fork server preloads it once instead of every worker importing it.
+        if "forkserver" in multiprocessing.get_all_start_methods():
+          context = multiprocessing.get_context("forkserver")
+          context.set_forkserver_preload([__name__])
+        else:
+          context = multiprocessing.get_context("spawn")
+        self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+      return self._pool
+
+  def submit(self, key, prepare, on_done=None):
+    '''
+    Queue a job: prepare() -> (X, y, groups, feature_order) or None; the result
+    is (model, metrics) or None and is passed to on_done(key, result) too.
+    '''
+    with self._lock:
+      job = self._jobs.get(key)
+      if job is not None and not (job.done() and job.exception() is not None):
+        return job  # queued, running or finished fine -> don't train twice
+      job = self._coordinator.submit(self._run, prepare)
+      self._jobs[key] = job
+    if on_done is not None:
+      job.add_done_callback(lambda f: on_done(key, f.result()) if f.exception() is None else None)
+    return job
+
+  def forget(self, key):
+    with self._lock:
+      self._jobs.pop(key, None)
+
+  def _run(self, prepare):
+    data = prepare()
+    if data is None:
+      return None
+    X, y, groups, feature_order = data
+    return self.select_model(X, y, groups, feature_order)
+
+  def select_model(self, X, y, groups=None, feature_order=None):
+    '''Cross-validate every candidate in parallel, refit the best on all rows.'''
+    pool = self._processes()
+    X = np.ascontiguousarray(X, dtype=float)
+    y = np.ascontiguousarray(y, dtype=float)
+    folds = _folds(len(y), groups, self.n_folds)
+    futures = {
+      (name, k): pool.submit(_cv_fold, name, X, y, train_idx, test_idx)
+      for name in self.candidates
+      for k, (train_idx, test_idx) in enumerate(folds)
+    }
+    cv = {name: [] for name in self.candidates}
+    for (name, _), future in futures.items():
+      cv[name].append(future.result())
+    cv_r2 = {name: float(np.mean(scores)) for name, scores in cv.items()}
+    best = max(cv_r2, key=cv_r2.get)
+
+    model, r2_train = pool.submit(_fit, best, X, y).result()
+    if feature_order is not None:
+      model.feature_order = tuple(feature_order)
+    metrics = {
+      "model_type": best,
+      "n_samples": len(y),
+      "n_features": X.shape[1],
+      "n_folds": len(folds),
+      "cv_r2": cv_r2,
+      "r2_train": r2_train,
+      "r2_test": cv_r2[best],
+      "feature_order": list(feature_order) if feature_order is not None else None,
+    }
+    if hasattr(model, "coef_"):
+      metrics["coef"] = np.ravel(model.coef_).tolist()
+      metrics["intercept"] = float(model.intercept_)
+    return model, metrics
+
+  def shutdown(self, wait=True):
+    self._coordinator.shutdown(wait=wait)
+    with self._lock:
+      if self._pool is not None:
+        self._pool.shutdown(wait=wait)
+        self._pool = None
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_training_service(max_workers=None):
+  '''Process-wide TrainingService; max_workers=0 means "train in-process" and returns None.'''
+  global _service
+  if max_workers == 0:
+    return None
+  with _service_lock:
+    if _service is None:
+      _service = TrainingService(max_workers=max_workers)
+    return _service
+
+
+__all__ = [
+  "CANDIDATES",
+  "TrainingService",
+  "get_training_service",
+]
@@ -1,6 +1,11 @@
 import numpy as np
 from sklearn.linear_model import LinearRegression
 from sklearn.model_selection import train_test_split
+from app.espn_calls.player_store import get_player_store
+from app.espn_calls.player_table import get_player_table, top_k_indices, FEATURE_FIELDS
+from app.espn_calls.name_index import get_name_index
+from app.models.features import waiver_features
+from app.espn_calls.materialized_views import get_materialized_view, INJURED_VIEW
 
 TEAM_PLAYERS_COL = "team_players"
 FREE_AGENTS_COL = "free_agents"
@@ -17,13 +22,14 @@ POSITION_FLEX_MAP = {
   "UTIL": {"PG", "SG", "SF", "PF", "C", "G", "F"},
 }
 
-# Score boost for same-position match (keeps same-pos candidates ranked higher)
+# Score boost for same-position match (keeps same-pos candidates ranked higher):
+# added to predicted PPG when the target position is in the candidate's eligibleSlots
 POSITION_MATCH_BONUS = 5.0
 
 
-def _doc_to_row(p: dict):
+def load_training_data(db):
   '''
-  Converts Firestore player dict to (features, target) for regression
+  Loads training data from the player pool (team_players + free_agents)
 
   Features (X):
   - projected_avg_points (float)
@@ -32,58 +38,15 @@ def _doc_to_row(p: dict):
 
   Target (y):
   - avg_points (float)
-  '''
-  x1 = p.get("projected_avg_points")
-  x2 = p.get("posRank")
-  x3 = p.get("injured")
-  y = p.get("avg_points")
-
-  # Drop rows with missing values
-  if y is None or x1 is None or x2 is None or x3 is None:
-    return None
-  
-  # Convert injured bool -> 0/1
-  injured_num = 1 if x3 else 0
-
-  try:
-    X = [float(x1), float(x2), float(injured_num)]
-    Y = float(y)
-  except (TypeError, ValueError):
-    return None
-  
-  return X, Y
 
-
-def load_training_data(db):
-  '''
-  Loads training data from Firestore (team_players + free_agents)
+  Players missing any of these are dropped.
 
   Returns:
   X: shape (n_samples, 3)
   y: shape (n_samples,)
   '''
-  X_rows = []
-  y_vals = []
-
-  # team_players
-  for doc in db.collection(TEAM_PLAYERS_COL).stream():
-    row = _doc_to_row(doc.to_dict())
-    if row is None:
-      continue
-    X, y = row
-    X_rows.append(X)
-    y_vals.append(y)
-  
-  # free agents
-  for doc in db.collection(FREE_AGENTS_COL).stream():
-    row = _doc_to_row(doc.to_dict())
-    if row is None:
-      continue
-    X, y = row
-    X_rows.append(X)
-    y_vals.append(y)
-
-  return np.array(X_rows, dtype = float), np.array(y_vals, dtype = float)
+  X, y, _ = get_player_table(db).features()
+  return X, y
 
 
 def train_model(X, y, test_size=0.2, random_state=42):
@@ -128,6 +91,132 @@ def _positions_compatible(target_pos: str, candidate_pos: str) -> bool:
 
 
 
+def _compatible_position_codes(positions, target_pos: str) -> np.ndarray:
+  '''
+  Boolean lookup over PlayerTable position codes: entry i says whether
+  positions[i] can fill target_pos. The extra last entry is for code -1
+  (no position), which _positions_compatible() always allows.
+  '''
+  allowed = [_positions_compatible(target_pos, (pos or "").upper()) for pos in positions]
+  return np.array(allowed + [True], dtype=bool)
+
+
+class ReplacementIndex:
+  '''
+  Replacement candidates pre-scored by one model for one PlayerTable snapshot.
+
+  For every slot key in POSITION_FLEX_MAP (plus "" = any position) the
+  compatible players are kept as two row arrays, healthy and injured, each
+  sorted by ranking score -- predicted PPG plus POSITION_MATCH_BONUS for
+  players who can play the key's position (ties: free agents first, then
+  snapshot order). A search only has to look at the head of one or two of
+  those lists.
+  '''
+
+  def __init__(self, table, model, X_all=None):
+    self.table = table
+    self.model = model
+    n = len(table)
+
+    if X_all is None:
+      X_all = table.numeric[:, :len(FEATURE_FIELDS)]
+    valid = np.flatnonzero(~np.isnan(X_all).any(axis=1))
+
+    # free agents first, then rostered players -- the old collection order, used for ties
+    order = np.concatenate([valid[~table.rostered[valid]], valid[table.rostered[valid]]])
+    self.base_rank = np.full(n, n, dtype=np.int64)
+    self.base_rank[order] = np.arange(len(order))
+
+    self.pred_ppg = np.full(n, np.nan)
+    if len(valid):
+      self.pred_ppg[valid] = model.predict(X_all[valid])
+    self._valid = np.zeros(n, dtype=bool)
+    self._valid[valid] = True
+
+    self._lists = {}
+    self._matches = {}
+    for slot in [""] + list(POSITION_FLEX_MAP):
+      self.candidates(slot)
+
+  def position_match(self, target_pos: str) -> np.ndarray:
+    '''Per row, True when the player can play target_pos itself: it's in eligibleSlots (or is the position).'''
+    key = (target_pos or "").upper()
+    if key not in self._matches:
+      if key:
+        self._matches[key] = self.table.slot_mask(key) | self.table.position_mask(key)
+      else:
+        self._matches[key] = np.zeros(len(self.table), dtype=bool)
+    return self._matches[key]
+
+  def scores(self, target_pos: str, rows: np.ndarray) -> np.ndarray:
+    '''Ranking score for rows: predicted PPG, plus POSITION_MATCH_BONUS on position matches.'''
+    return self.pred_ppg[rows] + POSITION_MATCH_BONUS * self.position_match(target_pos)[rows]
+
+  def candidates(self, target_pos: str):
+    '''(healthy rows, injured rows) that can fill target_pos, best ranking score first.'''
+    key = (target_pos or "").upper()
+    if key not in self._lists:
+      table = self.table
+      mask = self._valid.copy()
+      if key:
+        mask &= _compatible_position_codes(table.positions, key)[table.position_codes]
+      rows = np.flatnonzero(mask)
+      rows = rows[np.lexsort((self.base_rank[rows], -self.scores(key, rows)))]
+      injured = table.is_injured[rows]
+      self._lists[key] = (rows[~injured], rows[injured])
+    return self._lists[key]
+
+  def top(self, target_pos: str, top_n: int = 25, include_injured: bool = False, exclude_ids=()):
+    '''Top rows by ranking score (see scores()), excluding any playerId in exclude_ids.'''
+    healthy, injured = self.candidates(target_pos)
+    exclude = {pid for pid in exclude_ids if pid is not None}
+    if top_n is not None:
+      # lists are already in ranking-score order: only their heads can make the cut
+      head = top_n + len(exclude)
+      healthy, injured = healthy[:head], injured[:head]
+    rows = np.concatenate([healthy, injured]) if include_injured else healthy
+    if exclude:
+      rows = rows[~np.isin(self.table.player_id[rows], list(exclude))]
+
+    rows = rows[np.argsort(self.base_rank[rows], kind="stable")]
+    return rows[top_k_indices(self.scores(target_pos, rows), top_n)]
+
+
+def get_replacement_index(db, model) -> ReplacementIndex:
+  '''ReplacementIndex for the current snapshot and `model`, built once per (snapshot, model).'''
+  table = get_player_table(db)
+  indexes = get_player_store(db).derived("replacement_indexes", dict)
+  index = indexes.get(id(model))
+  if index is None or index.model is not model or index.table is not table:
+    # models trained on other features (e.g. the game-log model) say which ones
+    feature_order = getattr(model, "feature_order", FEATURE_FIELDS)
+    index = ReplacementIndex(table, model, waiver_features(db, feature_order))
+    indexes[id(model)] = index
+  return index
+
+
+def _recommendations(db, model, target_position, games_remaining, top_n, include_injured, exclude_ids=()):
+  index = get_replacement_index(db, model)
+  target_pos_norm = (target_position or "").upper()
+  match = index.position_match(target_pos_norm)
+  results = []
+  for row in index.top(target_pos_norm, top_n, include_injured, exclude_ids):
+    p = index.table.players[row]
+    pred_ppg = float(index.pred_ppg[row])
+    results.append({
+      "playerId": p.get("playerId"),
+      "name": p.get("name"),
+      "position": p.get("position"),
+      "proTeam": p.get("proTeam") or p.get("team"),
+      "injured": bool(p.get("injured")),
+      "predicted_ppg": pred_ppg,
+      "games_remaining": games_remaining,
+      "expected_week_points": pred_ppg * games_remaining,
+      "position_match": bool(match[row]),
+    })
+  return results
+
+
 def recommend_best_players(
     db,
     model,
@@ -136,119 +225,48 @@ def recommend_best_players(
     top_n: int = 25,
     include_injured: bool = False,
 ):
-  '''Returns top players across team_players + free_agents, ranked by expected points for the rest of the week'''
-
-  seen = set()
-  results = []
+  '''
+  Returns top players across team_players + free_agents, ranked by predicted PPG with
+  POSITION_MATCH_BONUS for players eligible at target_position
 
-  def process_collection(col_name):
-    for doc in db.collection(col_name).stream():
-      p = doc.to_dict()
-      pid = p.get("playerId")
-      if pid is None or pid in seen:
-        continue
-      seen.add(pid)
-
-      if not include_injured and p.get("injured"):
-        continue
-
-      x1  = p.get("projected_avg_points")
-      x2 = p.get("posRank")
-      x3 = p.get("injured")
-      if x1 is None or x2 is None or x3 is None:
-        continue
-
-      injured_num = 1 if x3 else 0
-      try:
-        X_row = [[float(x1), float(x2), float(injured_num)]]
-      except (TypeError, ValueError):
-        continue
-      
-
-      pred_ppg = float(model.predict(X_row)[0])
-      candidate_pos = (p.get("position") or "").upper()
-      target_pos_norm = (target_position or "").upper()
-
-      exact_match = bool(target_pos_norm and candidate_pos == target_pos_norm)
-      flex_match  = (
-        not target_pos_norm or
-        _positions_compatible(target_pos_norm, candidate_pos)
-      ) 
-
-      if not flex_match:
-        continue
-
-      ranking_score = pred_ppg + (POSITION_MATCH_BONUS if exact_match else 0.0)
-
-
-      results.append({
-        "playerId": pid,
-        "name": p.get("name"),
-        "position": p.get("position"),
-        "proTeam": p.get("proTeam") or p.get("team"),
-        "injured": bool(p.get("injured")),
-        "predicted_ppg": pred_ppg,
-        "games_remaining": games_remaining,
-        "expected_week_points": pred_ppg * games_remaining,
-        "position_match": exact_match,
-        "_ranking_score": ranking_score,
-      })
-
-  process_collection(FREE_AGENTS_COL)
-  process_collection(TEAM_PLAYERS_COL)
-
-  results.sort(key=lambda r: r["expected_week_points"], reverse=True)
-  # Drop internal sort key before returning
-  for r in results:
-    r.pop("_ranking_score", None)
-  return results[:top_n]
+  Served from the ReplacementIndex: the pool is scored once per snapshot/model,
+  so this is a lookup into a pre-sorted list plus a partial top-N selection.
+  '''
+  return _recommendations(db, model, target_position, games_remaining, top_n, include_injured)
 
 
 def find_player_by_name(db, name):
-  '''Search player by name across both collections; returns a player dict or None'''
-  query = (name or "").strip().lower()
-  if not query:
-    return None
-
-  for col in (TEAM_PLAYERS_COL, FREE_AGENTS_COL):
-    for doc in db.collection(col).stream():
-      p = doc.to_dict()
-      pname = (p.get("name") or "").lower()
-      if query in pname:
-        return p
-
-  return None
+  '''Search player by name across both collections; returns the best matching player dict or None'''
+  return get_name_index(db).resolve(name)
 
 
 
 
 def get_injured_players(db):
   '''Returns all injured players from team_players + free_agents, sorted by avg_points desc.'''
-  seen = set()
+  view = get_materialized_view(db, INJURED_VIEW)
+  if view is not None:
+    return [dict(p) for p in view.get("players") or []]
+
+  try:
+    table = get_player_table(db)
+  except Exception:
+    return []
+
   injured = []
+  avg = np.nan_to_num(table.avg_points)
+  for i in table.sorted_rows(avg, np.flatnonzero(table.is_injured)):
+    p = table.players[i]
+    injured.append({
+      "playerId": p.get("playerId"),
+      "name": p.get("name"),
+      "position": p.get("position"),
+      "proTeam": p.get("proTeam") or p.get("team"),
+      "avg_points": p.get("avg_points"),
+      "projected_avg_points": p.get("projected_avg_points"),
+      "injured": True,
+    })
 
-  for col in (TEAM_PLAYERS_COL, FREE_AGENTS_COL):
-    try:
-      for doc in db.collection(col).stream():
-        p = doc.to_dict()
-        pid = p.get("playerId")
-        if pid is None or pid in seen:
-          continue
-        seen.add(pid)
-        if p.get("injured"):
-          injured.append({
-            "playerId": pid,
-            "name": p.get("name"),
-            "position": p.get("position"),
-            "proTeam": p.get("proTeam") or p.get("team"),
-            "avg_points": p.get("avg_points"),
-            "projected_avg_points": p.get("projected_avg_points"),
-            "injured": True,
-          })
-    except Exception:
-      pass
-
-  injured.sort(key=lambda p: p.get("avg_points") or 0, reverse=True)
   return injured
 
 
@@ -267,20 +285,17 @@ def recommend_replacements_by_name(db, model, player_name, games_remaining=3, to
   
   target_position = target.get("position")
 
-  recs = recommend_best_players(
+  # the target is left out before the top-N cut, so a full top_n list comes back
+  recs = _recommendations(
     db,
     model,
     target_position=target_position,
     games_remaining=games_remaining,
     top_n=top_n,
     include_injured=include_injured,
+    exclude_ids=(target.get("playerId"),),
   )
 
-
-  target_id = target.get("playerId")
-  if target_id is not None:
-    recs = [r for r in recs if r.get("playerId") != target_id]
-
   return recs, None
 
 
@@ -288,6 +303,8 @@ __all__ = [
   "load_training_data",
   "train_model",
   "recommend_best_players",
+  "ReplacementIndex",
+  "get_replacement_index",
   "find_player_by_name",
   "get_injured_players",
   "recommend_replacements_by_name",
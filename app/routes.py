@@ -3,19 +3,30 @@ from app.forms import SearchForm
 from app import db
 from flask import redirect, url_for # Important for user navigation
 from flask import render_template # import the render_template() function to use the template from the index.html file in the templates folder
+from flask import jsonify
 from flask import request # Flask provides a request variable that contains all the information that the client sent with the request
 from urllib.parse import urlsplit # A function that parses a URL — .netloc reveals if the url is relative (safe) or includes an outside domain (dangerous, should be ignored)
-from app.espn_calls.boom_bust_calls import get_boom_bust_players
+from app.espn_calls.boom_bust_calls import (
+    get_boom_bust_players, WINDOWS as BOOM_BUST_WINDOWS, DEFAULT_MIN_GAMES, DEFAULT_MIN_PROJECTED,
+)
 from app.models.waiver_regression import (
-    load_training_data,
-    train_model,
     recommend_replacements_by_name,
     get_injured_players,
     find_player_by_name,
 )
-from app.espn_calls.rankings_calls import generate_player_rankings
-from app.espn_calls.trade_calls import evaluate_trade
+from app.models.model_registry import get_waiver_model
+from app.models.training_service import get_training_service
+from app.espn_calls.rankings_calls import generate_player_rankings, RANKING_MODES
+from app.espn_calls.trade_calls import evaluate_trade, evaluate_trades
+from app.espn_calls.trade_finder import find_trades, get_fantasy_rosters
+from app.espn_calls.trade_simulation import simulate_trade, REQUEST_TRIALS
+from app.espn_calls.weekly_projections import project_week
+from app.espn_calls.lineup_optimizer import optimize_lineups
+from app.espn_calls.streaming_planner import plan_streaming
 from app.espn_calls.schedule_calls import get_team_schedule, get_games_left_in_week
+from app.espn_calls.player_store import get_player_store, SEASON_YEAR
+from app.espn_calls.name_index import get_name_index
+from app.espn_calls.schedule_calendar import get_team_calendar
 from datetime import datetime, timedelta
 
 
@@ -26,26 +37,10 @@ def _parse_iso(dt_str):
     return datetime.fromisoformat(dt_str)
 
 
-def _normalize_name(s):
-    # Lowercase + strip whitespace so name lookups are case-insensitive
-    if not isinstance(s, str):
-        return ""
-    return s.strip().lower()
-
-
 def _find_player_by_name_in_db(db, name):
-    # Search both team_players and free_agents for a player whose name contains the query
-    # Returns the first matching player dict, or None if not found
-    q = _normalize_name(name)
-    if not q:
-        return None
-    for col in ("team_players", "free_agents"):
-        for doc in db.collection(col).stream():
-            p = doc.to_dict()
-            pname = _normalize_name(p.get("name"))
-            if pname and q in pname:
-                return p
-    return None
+    # Look the name up in the prebuilt name index (team_players + free_agents)
+    # Returns the best matching player dict, or None if not found
+    return get_name_index(db).resolve(name)
 
 
 def _find_player_id(db, name):
@@ -58,97 +53,37 @@ def _find_player_id(db, name):
 
 
 def _build_team_schedule_grid(db):
-    # Build a per-NBA-team schedule summary by reading player schedule data from Firestore.
-    #
-    # Each player doc has a "schedule" field structured like:
-    #   { "game_123": { "date": "2026-02-25T19:30:00", "team": "LAL" }, ... }
-    #
-    # KEY FIX: We deduplicate by game_id across ALL players on a team so each game
-    # is counted exactly once — without this, a team with 10 rostered players would
-    # count the same Tuesday game 10 times (once per player doc).
+    # Build a per-NBA-team schedule summary (week / month / season game counts).
     #
-    # We also scan BOTH team_players and free_agents since NBA pro teams appear in both.
+    # The per-team game calendar is built once per data snapshot (from the cron's
+    # team_schedules view, or from the player schedules deduplicated by game_id),
+    # so each page load is just a few binary searches per team.
     #
     # Returns a list sorted by week_games descending:
     #   [{ name, abbr, week_games, month_games, season_games, week_opponents }, ...]
+    return get_team_calendar(db).grid(now=datetime.now())
 
-    now   = datetime.now()
-    week  = now + timedelta(days=7)
-    month = now + timedelta(days=30)
-
-    # team_name -> { game_id -> { date: datetime, opp: str } }
-    # Outer dict keyed by team name; inner dict keyed by game_id for deduplication
-    team_games = {}
-
-    for col in ("team_players", "free_agents"):
-        # Scan both collections — NBA teams appear in both (rostered players + available free agents)
-        try:
-            for doc in db.collection(col).stream():
-                p = doc.to_dict()
-                team_name = p.get("proTeam") or p.get("team") or ""
-                if not team_name:
-                    continue
-
-                sched = p.get("schedule") or {}
 
-                if team_name not in team_games:
-                    team_games[team_name] = {}
+def _parse_bool_arg(args, name, default=False):
+    # ?flag=1 / true / yes / on -> True, ?flag=0 / false / no / off -> False, missing -> default
+    value = args.get(name)
+    if value is None or value == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
 
-                for game_id, info in sched.items():
-                    if game_id in team_games[team_name]:
-                        continue  # already recorded this game for this team — skip duplicate
-
-                    dt_str = info.get("date")
-                    if not dt_str:
-                        continue
-                    try:
-                        dt = _parse_iso(dt_str)
-                    except Exception:
-                        continue  # skip any malformed date strings
 
-                    opp = info.get("team") or info.get("opponent") or ""
-                    team_games[team_name][game_id] = {"date": dt, "opp": opp}
-
-        except Exception:
-            continue  # if one collection fails don't block the other
-
-    # Roll up per-game records into week / month / season counts for each team
-    result = []
-    for team_name, games_by_id in team_games.items():
-        week_cnt   = 0
-        month_cnt  = 0
-        season_cnt = 0
-        week_opps  = []
-
-        for game_id, g in games_by_id.items():
-            dt  = g["date"]
-            opp = g["opp"]
-
-            if dt < now:
-                continue  # past game — don't count it
-
-            season_cnt += 1
-
-            if dt <= month:
-                month_cnt += 1
-
-            if dt <= week:
-                week_cnt += 1
-                if opp:
-                    week_opps.append(opp)
-
-        result.append({
-            "name":           team_name,
-            "abbr":           team_name[:3].upper(),  # rough abbreviation — swap with a lookup dict if needed
-            "week_games":     week_cnt,
-            "month_games":    month_cnt,
-            "season_games":   season_cnt,
-            "week_opponents": list(set(week_opps)),  # deduplicate in case any opp appeared twice
-        })
-
-    # Sort by games this week descending so best schedule targets appear first in the grid
-    result.sort(key=lambda t: t["week_games"], reverse=True)
-    return result
+def _parse_window_args(args):
+    # Window for the schedule API: ?start=2026-03-16&end=2026-03-29 or ?days=3 (default 7, from now)
+    start_str = args.get("start")
+    end_str   = args.get("end")
+    start     = _parse_iso(start_str) if start_str else datetime.now()
+    if end_str:
+        end = _parse_iso(end_str)
+        if len(end_str) <= 10:
+            end += timedelta(days=1) - timedelta(seconds=1)  # date-only end -> include that whole day
+    else:
+        end = start + timedelta(days=args.get("days", default=7, type=int))
+    return start, end
 
 
 # PLAYER RANKINGS
@@ -159,22 +94,31 @@ def index(): # view function mapped to one or more route URLs so Flask knows wha
     if form.validate_on_submit():
         return redirect(url_for('index')) # refresh application to show changes (we ain't using websockets)
 
-    rankings = []
-    err      = None
-    position = request.args.get("position") # optional ?position=PG filter from URL
-    top_n    = request.args.get("top_n")    # optional ?top_n=25 filter from URL
+    rankings        = []
+    err             = None
+    position        = request.args.get("position") # optional ?position=PG filter from URL
+    top_n           = request.args.get("top_n")    # optional ?top_n=25 filter from URL
+    by              = request.args.get("by") or "avg_points"  # optional ?by=category (see RANKING_MODES)
+    remaining_games = request.args.get("remaining_games", type=int)  # optional cap for ?by=ros_value
+    if by not in RANKING_MODES:
+        by = "avg_points"  # unknown modes fall back to the default rather than an error banner
 
     try:
         rankings = generate_player_rankings(
             db,
-            by="avg_points",
+            by=by,
             position=position if position else None,
             top_n=int(top_n) if top_n else 50,
+            remaining_games=remaining_games,
         )
     except Exception as e:
         err = str(e)
 
-    return render_template('index.html', title='Player Rankings', form=form, rankings=rankings, err=err)
+    # ranking mode links keep the other query parameters
+    filters = {k: v for k, v in request.args.items() if k != "by"}
+
+    return render_template('index.html', title='Player Rankings', form=form, rankings=rankings, err=err,
+                           by=by, modes=RANKING_MODES, filters=filters)
 
 
 # PLAYER WAIVER / INJURY REPLACEMENT
@@ -208,22 +152,30 @@ def replacements():
                     "projected_avg_points": target_raw.get("projected_avg_points"),
                 }
 
-            # Train the regression model on the fly using all player data in Firestore
-            # (features: projected_avg_points, posRank, injured → target: avg_points)
-            X, y = load_training_data(db)
-            model, metrics = train_model(X, y)
-
-            # Get top-N position-compatible replacements sorted by predicted PPG
-            # Exact position matches are ranked above flex-compatible alternatives
-            recs, err = recommend_replacements_by_name(
+            # Waiver model for the current data snapshot. Trained once per scrape by the
+            # background training service (process pool) and persisted in MODEL_DIR;
+            # searches only ever predict, with the last good model until the new one is ready
+            model, metrics = get_waiver_model(
                 db,
-                model,
-                player_name=player_name,
-                games_remaining=3,
-                top_n=50,
-                include_injured=False, # don't recommend other injured players as replacements
+                app.config["MODEL_DIR"],
+                get_training_service(app.config["TRAINING_WORKERS"]),
             )
-            repl_list = recs
+
+            if model is None:
+                # first model for this data is still being fit in the background
+                err = "The waiver model is still training on the latest data, try again in a minute."
+            else:
+                # Get top-N position-compatible replacements sorted by predicted PPG
+                # Exact position matches are ranked above flex-compatible alternatives
+                recs, err = recommend_replacements_by_name(
+                    db,
+                    model,
+                    player_name=player_name,
+                    games_remaining=3,
+                    top_n=50,
+                    include_injured=False, # don't recommend other injured players as replacements
+                )
+                repl_list = recs
 
         except Exception as e:
             err = str(e)
@@ -246,9 +198,20 @@ def boombust():
     if form.validate_on_submit():
         return redirect(url_for('boombust'))
 
-    include_injured = True  # include injured players in boom/bust analysis
-    year            = 2026
-    min_games       = 10    # minimum games played to qualify (filters out tiny sample sizes)
+    # Query parameters, e.g. /boombust?window=15&position=PG&min_games=5&include_injured=0
+    include_injured = _parse_bool_arg(request.args, "include_injured", default=True)  # include injured players
+    year            = request.args.get("year", default=SEASON_YEAR, type=int)
+    min_games       = request.args.get("min_games", default=DEFAULT_MIN_GAMES, type=int)  # filters out tiny sample sizes
+    min_projected   = request.args.get("min_projected", default=DEFAULT_MIN_PROJECTED, type=float)  # 0 = any projection (or none)
+    window          = request.args.get("window", type=int)  # last N days of game logs, None = season vs projection
+    position        = request.args.get("position") or None
+    team            = (request.args.get("team") or "").upper() or None  # NBA team abbreviation
+
+    if window is not None and window <= 0:
+        window = None
+
+    # everything but the window, so the window links keep the other filters
+    filters = {k: v for k, v in request.args.items() if k != "window"}
 
     booms = []
     busts = []
@@ -260,11 +223,16 @@ def boombust():
             include_injured=include_injured,
             year=year,
             min_games=min_games,
+            window=window,
+            min_projected=min_projected if min_projected > 0 else None,
+            position=position,
+            team=team,
         )
     except Exception as e:
         err = str(e)
 
-    return render_template('boombust.html', title='Boom/Bust', form=form, booms=booms, busts=busts, err=err)
+    return render_template('boombust.html', title='Boom/Bust', form=form, booms=booms, busts=busts, err=err,
+                           window=window, windows=BOOM_BUST_WINDOWS, filters=filters)
 
 
 # SCHEDULE TRACKER
@@ -293,8 +261,9 @@ def schedule():
             if not player:
                 err = f"Player not found: {player_name}"
             else:
-                # Pull the player's schedule dict and filter to games in the next 7 days
-                sched = player.get("schedule") or {}
+                # Pull the player's schedule dict (loaded on demand for just this player)
+                # and filter to games in the next 7 days
+                sched = get_player_store(db).player_schedule(player.get("playerId"))
                 rows  = []
                 for game_id, info in sched.items():
                     dt_str = info.get("date")
@@ -335,6 +304,7 @@ def trade():
     result = None
     score  = None
     winner = None
+    sim    = None
 
     if request.method == "POST":
         # Collect up to 4 player names per side from the form inputs
@@ -353,23 +323,21 @@ def trade():
             err = "Please enter at least one player on each side."
         else:
             # Resolve player names -> player IDs for the trade evaluator
+            # (all names go through the name index in one pass)
             give_ids  = []
             recv_ids  = []
             not_found = []
 
-            for name in give_names:
-                p, pid = _find_player_id(db, name)
-                if pid is None:
-                    not_found.append(name)
-                else:
-                    give_ids.append(pid)
+            resolved = get_name_index(db).resolve_many(give_names + recv_names)
 
-            for name in recv_names:
-                p, pid = _find_player_id(db, name)
-                if pid is None:
-                    not_found.append(name)
-                else:
-                    recv_ids.append(pid)
+            for names, ids in ((give_names, give_ids), (recv_names, recv_ids)):
+                for name in names:
+                    p   = resolved.get(name)
+                    pid = (p.get("playerId") or p.get("id")) if p else None
+                    if pid is None:
+                        not_found.append(name)
+                    else:
+                        ids.append(pid)
 
             if not_found:
                 err = f"Player(s) not found: {', '.join(not_found)}"
@@ -381,6 +349,11 @@ def trade():
                     result = evaluate_trade(db, give_ids=give_ids, recv_ids=recv_ids)
                     score  = float(result["score"])
                     winner = "You" if score > 0 else ("Them" if score < 0 else "Even")
+
+                    # Optional Monte Carlo run of the remaining weekly matchups; the page
+                    # waits on it, so it gets a smaller trial count on the shared pool
+                    if request.form.get("simulate"):
+                        sim = simulate_trade(db, give_ids=give_ids, recv_ids=recv_ids, n_trials=REQUEST_TRIALS)
                 except Exception as e:
                     err = str(e)
 
@@ -391,4 +364,205 @@ def trade():
         result=result,
         score=score,
         winner=winner,
-    )
\ No newline at end of file
+        sim=sim,
+    )
+
+
+# PLAYER NAME AUTOCOMPLETE
+@app.route('/api/players/search', methods=['GET'])
+def player_search():
+    # JSON type-ahead for player name inputs: /api/players/search?q=lebr&limit=10
+    q     = request.args.get("q", "")
+    limit = request.args.get("limit", type=int) or 10
+
+    try:
+        players = get_name_index(db).search(q, limit=min(limit, 50))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    return jsonify([
+        {
+            "playerId":   p.get("playerId"),
+            "name":       p.get("name"),
+            "position":   p.get("position"),
+            "proTeam":    p.get("proTeam") or p.get("team"),
+            "injured":    bool(p.get("injured")),
+            "avg_points": p.get("avg_points"),
+        }
+        for p in players
+    ])
+
+
+# TEAM SCHEDULE WINDOW
+@app.route('/api/schedule/window', methods=['GET'])
+def schedule_window():
+    # JSON game counts + opponents per NBA team for any date window, e.g.
+    #   /api/schedule/window?days=3
+    #   /api/schedule/window?start=2026-03-16&end=2026-03-29   (playoff weeks)
+    try:
+        start, end = _parse_window_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": f"Invalid date: {e}"}), 400
+
+    try:
+        teams = get_team_calendar(db).window(start, end)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    return jsonify({
+        "start": start.isoformat(),
+        "end":   end.isoformat(),
+        "teams": teams,
+    })
+
+
+# TRADE FINDER
+@app.route('/api/trade/finder', methods=['GET'])
+def trade_finder():
+    # JSON search for trades that help both teams, e.g.
+    #   /api/trade/finder?team_id=3               (up to 4-for-4, top 20)
+    #   /api/trade/finder?team_id=3&max_size=2&top=10
+    team_id  = request.args.get("team_id")
+    max_size = request.args.get("max_size", default=4, type=int)
+    top_n    = request.args.get("top", default=20, type=int)
+
+    if team_id is None:
+        return jsonify({"error": "team_id is required", "teams": [
+            {"team_id": t["team_id"], "team_name": t["team_name"]} for t in get_fantasy_rosters(db).values()
+        ]}), 400
+
+    try:
+        result = find_trades(db, team_id, max_size=max_size, top_n=min(max(top_n, 1), 100))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    return jsonify(result), (404 if result.get("error") else 200)
+
+
+# BATCH TRADE EVALUATION
+MAX_BATCH_PROPOSALS = 200
+MAX_TRADE_PLAYERS   = 4    # per side, same as the /trade form
+
+@app.route('/api/trade/batch', methods=['POST'])
+def trade_batch():
+    # Evaluate many trade variants in one call. Body:
+    #   {"proposals": [{"give": ["LeBron James", 1966], "receive": ["Jayson Tatum"]}, ...]}
+    # Players can be given by name or playerId. Returns one evaluate_trade() result per
+    # proposal (plus "not_found" names), in the same order
+    body      = request.get_json(silent=True) or {}
+    proposals = body.get("proposals")
+    if not isinstance(proposals, list) or not proposals:
+        return jsonify({"error": "proposals must be a non-empty list"}), 400
+    if len(proposals) > MAX_BATCH_PROPOSALS:
+        return jsonify({"error": f"At most {MAX_BATCH_PROPOSALS} proposals per call"}), 400
+
+    sides = []
+    for i, prop in enumerate(proposals):
+        prop = prop if isinstance(prop, dict) else {}
+        give = [x for x in (prop.get("give") or []) if x not in (None, "")]
+        recv = [x for x in (prop.get("receive") or prop.get("recv") or []) if x not in (None, "")]
+        if len(give) > MAX_TRADE_PLAYERS or len(recv) > MAX_TRADE_PLAYERS:
+            # reject rather than trim: a trimmed proposal would be scored as a different trade
+            return jsonify({"error": f"Proposal {i}: at most {MAX_TRADE_PLAYERS} players per side"}), 400
+        sides.append((give, recv))
+
+    try:
+        # every name across every proposal goes through the name index once
+        names    = [x for give, recv in sides for x in give + recv if isinstance(x, str) and not x.strip().isdigit()]
+        resolved = get_name_index(db).resolve_many(names)
+
+        ids_per_proposal = []
+        not_found        = []
+        for give, recv in sides:
+            missing = []
+            ids     = []
+            for players in (give, recv):
+                side_ids = []
+                for x in players:
+                    if isinstance(x, str) and not x.strip().isdigit():
+                        p = resolved.get(x)
+                        if p is None:
+                            missing.append(x)
+                            continue
+                        side_ids.append(p.get("playerId") or p.get("id"))
+                    else:
+                        side_ids.append(x)
+                ids.append(side_ids)
+            ids_per_proposal.append(tuple(ids))
+            not_found.append(missing)
+
+        results = evaluate_trades(db, ids_per_proposal)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    for result, missing in zip(results, not_found):
+        result["not_found"] = missing
+    return jsonify({"results": results})
+
+
+# WEEKLY MATCHUP PROJECTIONS
+@app.route('/api/projections/week', methods=['GET'])
+def week_projections():
+    # Projected totals for every fantasy team and matchup, e.g.
+    #   /api/projections/week            (the current matchup week)
+    #   /api/projections/week?week=12
+    #   /api/projections/week?period=80  (as of scoring period 80)
+    week   = request.args.get("week", type=int)
+    period = request.args.get("period", type=int)
+
+    try:
+        result = project_week(db, week=week, period=period)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    return jsonify(result), (404 if result.get("error") else 200)
+
+
+# DAILY LINEUP OPTIMIZER
+@app.route('/api/lineups', methods=['GET'])
+def optimal_lineups():
+    # Best start/sit lineup for each remaining day of a matchup week, e.g.
+    #   /api/lineups                  (every team, current week)
+    #   /api/lineups?team_id=3
+    #   /api/lineups?team_id=3&week=12
+    team_id = request.args.get("team_id")
+    week    = request.args.get("week", type=int)
+    period  = request.args.get("period", type=int)
+
+    try:
+        result = optimize_lineups(db, team_id=team_id, week=week, period=period)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    return jsonify(result), (404 if result.get("error") else 200)
+
+
+# FREE-AGENT STREAMING PLANNER
+@app.route('/api/streaming', methods=['GET'])
+def streaming_plan():
+    # Best free-agent pickups for the rest of a matchup week, e.g.
+    #   /api/streaming?team_id=3
+    #   /api/streaming?team_id=3&max_adds=2&drop_ids=4277905,3934672
+    #   /api/streaming?team_id=3&week=12&by=games
+    team_id  = request.args.get("team_id")
+    week     = request.args.get("week", type=int)
+    period   = request.args.get("period", type=int)
+    max_adds = request.args.get("max_adds", type=int)
+    by       = request.args.get("by", "points")
+    drop_ids = request.args.get("drop_ids")
+
+    if team_id is None:
+        return jsonify({"error": "team_id is required", "teams": [
+            {"team_id": t["team_id"], "team_name": t["team_name"]} for t in get_fantasy_rosters(db).values()
+        ]}), 400
+    if drop_ids is not None:
+        # ids arrive as strings; the planner compares them as strings too
+        drop_ids = [pid.strip() for pid in drop_ids.split(",") if pid.strip()]
+
+    try:
+        result = plan_streaming(db, team_id, week=week, period=period, max_adds=max_adds,
+                                drop_ids=drop_ids, by=by)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    return jsonify(result), (404 if result.get("error") else 200)
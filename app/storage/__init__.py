@@ -0,0 +1,37 @@
+import json
+import os
+from .local import LocalClient, MemoryBackend, SQLiteBackend
+
+FIRESTORE_BACKEND = "firestore"
+MEMORY_BACKEND = "memory"
+SQLITE_BACKEND = "sqlite"
+
+
+def create_local_db(backend: str = MEMORY_BACKEND, sqlite_path: str = None, seed_path: str = None) -> LocalClient:
+    """
+    Firestore stand-in for running, profiling and benchmarking the app offline.
+
+    backend:     "memory" or "sqlite"
+    sqlite_path: database file for the sqlite backend (":memory:" if not given)
+    seed_path:   optional JSON dump ({collection: {doc id: data}}) loaded on start-up
+    """
+    if backend == MEMORY_BACKEND:
+        client = LocalClient(MemoryBackend())
+    elif backend == SQLITE_BACKEND:
+        client = LocalClient(SQLiteBackend(sqlite_path or ":memory:"))
+    else:
+        raise ValueError(f"Unknown local storage backend: {backend}")
+
+    if seed_path and os.path.exists(seed_path):
+        with open(seed_path) as f:
+            client.load(json.load(f))
+    return client
+
+
+__all__ = [
+    "FIRESTORE_BACKEND",
+    "MEMORY_BACKEND",
+    "SQLITE_BACKEND",
+    "LocalClient",
+    "create_local_db",
+]
@@ -0,0 +1,333 @@
+"""
+Local stand-in for the Firestore client, backed by memory or a SQLite file.
+
+Implements the subset of the google-cloud-firestore API the app, the models
+and espn_cron use: collection() / document(), where(), limit(), select(),
+order_by(), stream(), get(), set(), delete() and batch(). Documents are kept
+JSON-encoded, so every read pays a deserialization cost similar to Firestore's
+and callers get fresh dicts they can't use to mutate the stored data.
+"""
+import json
+import re
+import sqlite3
+import threading
+import uuid
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+_FIELD_SEGMENT_RE = re.compile(r"`([^`]*)`|([^.]+)")
+
+_MISSING = object()
+
+
+def split_field_path(path: str) -> List[str]:
+    """"stats.`2026_total`.GP" -> ["stats", "2026_total", "GP"]."""
+    return [quoted or plain for quoted, plain in _FIELD_SEGMENT_RE.findall(path)]
+
+
+def _lookup(data: Dict, path: str):
+    value = data
+    for part in split_field_path(path):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _project(data: Dict, fields: Iterable[str]) -> Dict:
+    out = {}
+    for path in fields:
+        parts = split_field_path(path)
+        value = _lookup(data, path)
+        if value is _MISSING:
+            continue
+        target = out
+        for part in parts[:-1]:
+            target = target.setdefault(part, {})
+        target[parts[-1]] = value
+    return out
+
+
+def _matches(value, op: str, expected) -> bool:
+    if op == "array_contains":
+        return isinstance(value, list) and expected in value
+    if op == "array_contains_any":
+        return isinstance(value, list) and any(v in value for v in expected)
+    if value is _MISSING:
+        return False
+    if op == "==":
+        return value == expected
+    if op == "!=":
+        return value != expected
+    if op == "in":
+        return value in expected
+    if op == "not-in":
+        return value not in expected
+    try:
+        if op == "<":
+            return value < expected
+        if op == "<=":
+            return value <= expected
+        if op == ">":
+            return value > expected
+        if op == ">=":
+            return value >= expected
+    except TypeError:
+        return False
+    raise ValueError(f"Unsupported operator: {op}")
+
+
+class MemoryBackend:
+    """collection -> {doc id -> JSON string}, held in process memory."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._collections: Dict[str, Dict[str, str]] = {}
+
+    def rows(self, collection: str) -> List[Tuple[str, str]]:
+        with self._lock:
+            return list(self._collections.get(collection, {}).items())
+
+    def get(self, collection: str, doc_id: str) -> Optional[str]:
+        with self._lock:
+            return self._collections.get(collection, {}).get(doc_id)
+
+    def put_many(self, writes: List[Tuple[str, str, Optional[str]]]):
+        """Apply (collection, id, json or None to delete) writes atomically."""
+        with self._lock:
+            for collection, doc_id, raw in writes:
+                docs = self._collections.setdefault(collection, {})
+                if raw is None:
+                    docs.pop(doc_id, None)
+                else:
+                    docs[doc_id] = raw
+
+    def collection_names(self) -> List[str]:
+        with self._lock:
+            return sorted(self._collections)
+
+
+class SQLiteBackend:
+    """Same interface as MemoryBackend, persisted to one table in a SQLite file."""
+
+    def __init__(self, path: str):
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            " collection TEXT NOT NULL,"
+            " id TEXT NOT NULL,"
+            " data TEXT NOT NULL,"
+            " PRIMARY KEY (collection, id))"
+        )
+        self._conn.commit()
+
+    def rows(self, collection: str) -> List[Tuple[str, str]]:
+        with self._lock:
+            cur = self._conn.execute("SELECT id, data FROM documents WHERE collection = ? ORDER BY rowid", (collection,))
+            return cur.fetchall()
+
+    def get(self, collection: str, doc_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM documents WHERE collection = ? AND id = ?", (collection, doc_id)
+            ).fetchone()
+            return row[0] if row else None
+
+    def put_many(self, writes: List[Tuple[str, str, Optional[str]]]):
+        with self._lock, self._conn:
+            for collection, doc_id, raw in writes:
+                if raw is None:
+                    self._conn.execute("DELETE FROM documents WHERE collection = ? AND id = ?", (collection, doc_id))
+                else:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO documents (collection, id, data) VALUES (?, ?, ?)",
+                        (collection, doc_id, raw),
+                    )
+
+    def collection_names(self) -> List[str]:
+        with self._lock:
+            return [r[0] for r in self._conn.execute("SELECT DISTINCT collection FROM documents ORDER BY collection")]
+
+
+class DocumentSnapshot:
+    def __init__(self, reference: "DocumentReference", data: Optional[Dict]):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self) -> Optional[Dict]:
+        return self._data
+
+    def get(self, field_path: str):
+        value = _lookup(self._data or {}, field_path)
+        return None if value is _MISSING else value
+
+
+class DocumentReference:
+    def __init__(self, client: "LocalClient", collection: str, doc_id: str):
+        self._client = client
+        self._collection = collection
+        self.id = doc_id
+
+    @property
+    def path(self) -> str:
+        return f"{self._collection}/{self.id}"
+
+    def get(self, field_paths: Optional[Iterable[str]] = None) -> DocumentSnapshot:
+        raw = self._client.backend.get(self._collection, self.id)
+        data = None if raw is None else json.loads(raw)
+        if data is not None and field_paths is not None:
+            data = _project(data, field_paths)
+        return DocumentSnapshot(self, data)
+
+    def set(self, document_data: Dict, merge: bool = False):
+        if merge:
+            existing = self.get().to_dict() or {}
+            existing.update(document_data)
+            document_data = existing
+        self._client.backend.put_many([(self._collection, self.id, _encode(document_data))])
+
+    def update(self, field_updates: Dict):
+        existing = self.get().to_dict()
+        if existing is None:
+            raise KeyError(f"No document to update: {self.path}")
+        existing.update(field_updates)
+        self.set(existing)
+
+    def delete(self):
+        self._client.backend.put_many([(self._collection, self.id, None)])
+
+
+class Query:
+    def __init__(self, client: "LocalClient", collection: str, filters=(), limit=None,
+                 fields=None, order=()):
+        self._client = client
+        self._collection = collection
+        self._filters = tuple(filters)
+        self._limit = limit
+        self._fields = fields
+        self._order = tuple(order)
+
+    def _copy(self, **changes) -> "Query":
+        state = dict(filters=self._filters, limit=self._limit, fields=self._fields, order=self._order)
+        state.update(changes)
+        return Query(self._client, self._collection, **state)
+
+    def where(self, field_path: str = None, op_string: str = None, value=None, filter=None) -> "Query":
+        if filter is not None:  # firestore.FieldFilter-style keyword
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        return self._copy(filters=self._filters + ((field_path, op_string, value),))
+
+    def limit(self, count: int) -> "Query":
+        return self._copy(limit=count)
+
+    def select(self, field_paths: Iterable[str]) -> "Query":
+        return self._copy(fields=tuple(field_paths))
+
+    def order_by(self, field_path: str, direction: str = "ASCENDING") -> "Query":
+        return self._copy(order=self._order + ((field_path, direction),))
+
+    def stream(self) -> Iterator[DocumentSnapshot]:
+        docs = []
+        for doc_id, raw in self._client.backend.rows(self._collection):
+            data = json.loads(raw)
+            if all(_matches(_lookup(data, f), op, v) for f, op, v in self._filters):
+                docs.append((doc_id, data))
+
+        for field_path, direction in reversed(self._order):
+            # Firestore drops docs missing an order_by field
+            docs = [d for d in docs if _lookup(d[1], field_path) is not _MISSING]
+            docs.sort(key=lambda d: _lookup(d[1], field_path), reverse=str(direction).upper().startswith("DESC"))
+
+        if self._limit is not None:
+            docs = docs[:self._limit]
+
+        for doc_id, data in docs:
+            if self._fields is not None:
+                data = _project(data, self._fields)
+            yield DocumentSnapshot(DocumentReference(self._client, self._collection, doc_id), data)
+
+    def get(self) -> List[DocumentSnapshot]:
+        return list(self.stream())
+
+
+class CollectionReference(Query):
+    def __init__(self, client: "LocalClient", collection: str):
+        super().__init__(client, collection)
+        self.id = collection
+
+    def document(self, document_id: Optional[str] = None) -> DocumentReference:
+        return DocumentReference(self._client, self._collection, document_id or uuid.uuid4().hex[:20])
+
+    def add(self, document_data: Dict):
+        ref = self.document()
+        ref.set(document_data)
+        return None, ref
+
+
+class WriteBatch:
+    def __init__(self, client: "LocalClient"):
+        self._client = client
+        self._writes = []
+
+    def set(self, reference: DocumentReference, document_data: Dict, merge: bool = False):
+        if merge:
+            existing = reference.get().to_dict() or {}
+            existing.update(document_data)
+            document_data = existing
+        self._writes.append((reference._collection, reference.id, _encode(document_data)))
+
+    def delete(self, reference: DocumentReference):
+        self._writes.append((reference._collection, reference.id, None))
+
+    def commit(self):
+        self._client.backend.put_many(self._writes)
+        self._writes = []
+
+
+def _encode(data: Dict) -> str:
+    # datetimes etc. are stored the way espn_cron.serialize() writes them (ISO strings)
+    return json.dumps(data, default=lambda o: o.isoformat() if hasattr(o, "isoformat") else str(o))
+
+
+class LocalClient:
+    """Drop-in for firestore.client() over a MemoryBackend or SQLiteBackend."""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def collection(self, collection_path: str) -> CollectionReference:
+        return CollectionReference(self, collection_path)
+
+    def document(self, document_path: str) -> DocumentReference:
+        collection, doc_id = document_path.rsplit("/", 1)
+        return DocumentReference(self, collection, doc_id)
+
+    def batch(self) -> WriteBatch:
+        return WriteBatch(self)
+
+    def get_all(self, references: Iterable[DocumentReference], field_paths=None) -> Iterator[DocumentSnapshot]:
+        for ref in references:
+            yield ref.get(field_paths)
+
+    def collections(self) -> List[CollectionReference]:
+        return [self.collection(name) for name in self.backend.collection_names()]
+
+    def load(self, collections: Dict[str, Dict[str, Dict]]):
+        """Bulk-load {collection: {doc id: data}}, e.g. a JSON dump or a synthetic league."""
+        writes = []
+        for collection, docs in collections.items():
+            for doc_id, data in docs.items():
+                writes.append((collection, str(doc_id), _encode(data)))
+        self.backend.put_many(writes)
+
+    def dump(self) -> Dict[str, Dict[str, Dict]]:
+        """Inverse of load()."""
+        return {
+            name: {doc_id: json.loads(raw) for doc_id, raw in self.backend.rows(name)}
+            for name in self.backend.collection_names()
+        }
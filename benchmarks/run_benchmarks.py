@@ -0,0 +1,170 @@
+"""
+Micro-benchmarks for the app's hot paths against a synthetic league.
+
+    python -m benchmarks.run_benchmarks --players 1000 --out before.json
+    python -m benchmarks.run_benchmarks --players 1000 --out after.json --compare before.json
+
+Each benchmark runs once "cold" (PlayerStore invalidated, so the snapshot,
+tables and indexes are rebuilt) and --repeat times "warm". Times come from
+time.perf_counter(); peak memory of a second cold run from tracemalloc.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+# Local backend: app imports firebase_admin only for STORAGE_BACKEND=firestore, so the
+# suite runs without it installed
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+
+import numpy as np
+
+from app.storage import create_local_db
+from app.espn_calls.player_store import invalidate_player_store
+from app.espn_calls.rankings_calls import generate_player_rankings
+from app.espn_calls.boom_bust_calls import get_boom_bust_players
+from app.espn_calls.trade_calls import evaluate_trade
+from app.models.waiver_regression import load_training_data, train_model, recommend_best_players
+from app.routes import _build_team_schedule_grid
+
+from .synthetic_league import generate_league, TEAM_PLAYERS_COL, FREE_AGENTS_COL
+
+
+def _trade_ids(league, n=2):
+    team_ids = sorted(league[TEAM_PLAYERS_COL], key=int)
+    fa_ids = sorted(league[FREE_AGENTS_COL], key=int)
+    return [int(i) for i in team_ids[:n]], [int(i) for i in (fa_ids or team_ids)[-n:]]
+
+
+def build_benchmarks(db, league):
+    """name -> zero-arg callable."""
+    give, recv = _trade_ids(league)
+    state = {}
+
+    def model():
+        if "model" not in state:
+            state["model"], _ = train_model(*load_training_data(db))
+        return state["model"]
+
+    return {
+        "rankings": lambda: generate_player_rankings(db),
+        # no query cache: it outlives invalidate_player_store, so every run would be a lookup
+        "boom_bust": lambda: get_boom_bust_players(db, cache=None),
+        "schedule_grid": lambda: _build_team_schedule_grid(db),
+        "trade_eval": lambda: evaluate_trade(db, give, recv),
+        "train_model": lambda: train_model(*load_training_data(db)),
+        "recommend": lambda: recommend_best_players(db, model(), target_position="PG"),
+    }
+
+
+def _time_once(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def run_benchmark(db, fn, repeat):
+    invalidate_player_store(db)
+    cold = _time_once(fn)
+
+    # separate cold run for memory, tracemalloc slows everything down
+    invalidate_player_store(db)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    warm = [_time_once(fn) for _ in range(repeat)]
+    return {
+        "cold_s": cold,
+        "warm_min_s": min(warm),
+        "warm_median_s": statistics.median(warm),
+        "warm_mean_s": statistics.fmean(warm),
+        "peak_kib": peak / 1024,
+        "repeat": repeat,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_results(results, baseline=None):
+    header = f"{'benchmark':<16}{'cold ms':>10}{'warm med ms':>13}{'peak KiB':>11}"
+    if baseline:
+        header += f"{'cold x':>9}{'warm x':>9}"
+    print(header)
+    for name, r in results.items():
+        line = f"{name:<16}{r['cold_s'] * 1e3:>10.2f}{r['warm_median_s'] * 1e3:>13.3f}{r['peak_kib']:>11.0f}"
+        old = (baseline or {}).get(name)
+        if old:
+            # > 1 means faster than the baseline
+            line += f"{old['cold_s'] / r['cold_s']:>9.2f}{old['warm_median_s'] / r['warm_median_s']:>9.2f}"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--players", type=int, default=1000, help="player pool size")
+    parser.add_argument("--teams", type=int, default=12, help="fantasy teams")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--layout", choices=["inline", "split"], default="inline")
+    parser.add_argument("--views", action="store_true", help="also write the cron's materialized views")
+    parser.add_argument("--backend", choices=["memory", "sqlite"], default="memory")
+    parser.add_argument("--repeat", type=int, default=20, help="warm runs per benchmark")
+    parser.add_argument("--only", nargs="*", help="benchmark names to run")
+    parser.add_argument("--out", help="write results as JSON")
+    parser.add_argument("--compare", help="baseline JSON from an earlier --out")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    league = generate_league(args.players, args.teams, seed=args.seed, layout=args.layout, with_views=args.views)
+    db = create_local_db(args.backend)
+    db.load(league)
+    print(f"generated {args.players} players ({args.layout}{', views' if args.views else ''}) "
+          f"in {time.perf_counter() - started:.2f}s")
+
+    benchmarks = build_benchmarks(db, league)
+    results = {}
+    for name, fn in benchmarks.items():
+        if args.only and name not in args.only:
+            continue
+        results[name] = run_benchmark(db, fn, args.repeat)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+    _print_results(results, baseline)
+
+    if args.out:
+        meta = {
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "players": args.players,
+            "teams": args.teams,
+            "seed": args.seed,
+            "layout": args.layout,
+            "views": args.views,
+            "backend": args.backend,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
+        with open(args.out, "w") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
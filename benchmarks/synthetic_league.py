@@ -0,0 +1,280 @@
+"""
+Synthetic fantasy basketball leagues for offline benchmarking.
+
+Builds player docs in exactly the shape espn_cron writes them (including the
+per-scoring-period `stats` box scores and the `schedule` dict), optionally in
+the split layout, plus scoreboard matchups, ready for LocalClient.load().
+"""
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from espn_cron.materialize import build_views, META_COL, SNAPSHOT_DOC, VIEWS_COL
+from espn_cron.records import (
+    SEASON_YEAR,
+    TEAM_PLAYERS_COL,
+    FREE_AGENTS_COL,
+    PLAYER_STATS_COL,
+    PLAYER_SCHEDULES_COL,
+    SCOREBOARD_COL,
+    LEAGUE_SETTINGS_DOC,
+    matchup_record,
+    split_player_record,
+)
+
+NBA_TEAMS = [
+    "ATL", "BOS", "BKN", "CHA", "CHI", "CLE", "DAL", "DEN", "DET", "GSW",
+    "HOU", "IND", "LAC", "LAL", "MEM", "MIA", "MIL", "MIN", "NOP", "NYK",
+    "OKC", "ORL", "PHI", "PHX", "POR", "SAC", "SAS", "TOR", "UTA", "WAS",
+]
+
+POSITIONS = ["PG", "SG", "SF", "PF", "C"]
+
+ELIGIBLE_SLOTS = {
+    "PG": ["PG", "G", "UT", "BE", "IR"],
+    "SG": ["SG", "G", "SG/SF", "G/F", "UT", "BE", "IR"],
+    "SF": ["SF", "F", "SG/SF", "G/F", "UT", "BE", "IR"],
+    "PF": ["PF", "F", "PF/C", "UT", "BE", "IR"],
+    "C":  ["C", "PF/C", "UT", "BE", "IR"],
+}
+
+# ESPN default points league scoring
+SCORING = {"PTS": 1, "3PM": 1, "FGA": -1, "FGM": 2, "FTA": -1, "FTM": 1,
+           "REB": 1, "AST": 2, "STL": 4, "BLK": 4, "TO": -2}
+
+SEASON_DAYS = 170
+ROSTER_SIZE = 13
+# ESPN's default points league lineup (slot names as espn_api's POSITION_MAP has them)
+LINEUP_SLOT_COUNTS = {"PG": 1, "SG": 1, "SF": 1, "PF": 1, "C": 1, "G": 1, "F": 1, "UT": 3, "BE": 3, "IR": 1}
+MATCHUP_DAYS = 7
+MATCHUP_ACQUISITION_LIMIT = 4
+
+
+def _nba_schedule(rng: random.Random, season_start: datetime) -> Dict[str, Dict[str, Dict]]:
+    """team -> {scoring period: {"team": opponent, "date": iso}}; ~3-4 games a week per team."""
+    schedule = {team: {} for team in NBA_TEAMS}
+    for day in range(SEASON_DAYS):
+        period = str(day + 1)
+        playing = [t for t in NBA_TEAMS if rng.random() < 0.5]
+        rng.shuffle(playing)
+        tip = season_start + timedelta(days=day, hours=rng.choice([19, 19, 20, 22]))
+        for home, away in zip(playing[0::2], playing[1::2]):
+            schedule[home][period] = {"team": away, "date": tip.isoformat()}
+            schedule[away][period] = {"team": home, "date": tip.isoformat()}
+    return schedule
+
+
+def _box_score(rng: random.Random, talent: Dict[str, float]) -> Dict[str, float]:
+    minutes = max(0.0, rng.gauss(talent["MIN"], 5))
+    scale = minutes / talent["MIN"] if talent["MIN"] else 0
+    line = {"MIN": round(minutes, 1)}
+    for stat in ("REB", "AST", "STL", "BLK", "TO", "3PM"):
+        line[stat] = float(max(0, round(rng.gauss(talent[stat] * scale, talent[stat] * 0.45 + 0.3))))
+    fga = float(max(0, round(rng.gauss(talent["FGA"] * scale, 3))))
+    fgm = float(min(fga, max(0, round(fga * rng.gauss(talent["FG%"], 0.1)))))
+    fta = float(max(0, round(rng.gauss(talent["FTA"] * scale, 1.5))))
+    ftm = float(min(fta, max(0, round(fta * rng.gauss(talent["FT%"], 0.1)))))
+    line["3PM"] = min(line["3PM"], fgm)
+    line.update({"FGA": fga, "FGM": fgm, "FTA": fta, "FTM": ftm})
+    line["PTS"] = 2 * fgm + line["3PM"] + ftm
+    line["GP"] = 1.0
+    return line
+
+
+def _fantasy_points(line: Dict[str, float]) -> float:
+    return float(sum(line.get(stat, 0) * weight for stat, weight in SCORING.items()))
+
+
+def _season_split(lines: List[Dict[str, float]], points: List[float]) -> Dict:
+    total = {}
+    for line in lines:
+        for stat, value in line.items():
+            total[stat] = total.get(stat, 0.0) + value
+    gp = len(lines)
+    return {
+        "total": total,
+        "avg": {k: v / gp for k, v in total.items()} if gp else {},
+        "applied_total": sum(points),
+        "applied_avg": round(sum(points) / gp, 2) if gp else 0,
+    }
+
+
+def _player(rng, pid, pro_team, team_schedule, season_start, today_period) -> Dict:
+    position = rng.choice(POSITIONS)
+    usage = rng.betavariate(2, 5)  # most players are role players
+    talent = {
+        "MIN": 12 + usage * 28,
+        "FGA": 3 + usage * 18,
+        "FG%": rng.uniform(0.40, 0.58),
+        "FTA": 0.5 + usage * 7,
+        "FT%": rng.uniform(0.60, 0.90),
+        "3PM": rng.uniform(0, 1) * (3.5 if position in ("PG", "SG", "SF") else 1.5) * (0.5 + usage),
+        "REB": (2 + usage * 6) * (1.8 if position in ("PF", "C") else 1.0),
+        "AST": (1 + usage * 5) * (1.8 if position in ("PG", "SG") else 0.8),
+        "STL": 0.4 + usage * 1.2,
+        "BLK": (0.2 + usage * 0.8) * (2.0 if position in ("PF", "C") else 0.7),
+        "TO": 0.6 + usage * 2.8,
+    }
+    injured = rng.random() < 0.08
+    dnp_rate = rng.uniform(0.02, 0.2)
+
+    stats = {}
+    lines, points = [], []
+    for period, game in sorted(team_schedule.items(), key=lambda kv: int(kv[0])):
+        if int(period) >= today_period or rng.random() < dnp_rate:
+            continue
+        line = _box_score(rng, talent)
+        fp = _fantasy_points(line)
+        lines.append(line)
+        points.append(fp)
+        stats[period] = {
+            "team": game["team"],
+            "date": game["date"],
+            "total": line,
+            "avg": line,
+            "applied_total": fp,
+            "applied_avg": fp,
+        }
+
+    season = _season_split(lines, points)
+    stats[f"{SEASON_YEAR}_total"] = season
+    for window in (7, 15, 30):
+        recent = points[-max(1, window // 2):]
+        stats[f"{SEASON_YEAR}_last_{window}"] = {
+            "applied_total": sum(recent),
+            "applied_avg": round(sum(recent) / len(recent), 2) if recent else 0,
+        }
+
+    projected_avg = max(0.0, rng.gauss(season["applied_avg"] or _fantasy_points(talent), 4))
+    stats[f"{SEASON_YEAR}_projected"] = {"applied_total": projected_avg * 70, "applied_avg": round(projected_avg, 2)}
+
+    return {
+        "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {pid % 1000}",
+        "playerId": pid,
+        "eligibleSlots": ELIGIBLE_SLOTS[position],
+        "posRank": 0,  # filled in once every player exists
+        "acquisitionType": rng.choice(["DRAFT", "ADD", "TRADE"]),
+        "proTeam": pro_team,
+        "position": position,
+        "injuryStatus": "OUT" if injured else "ACTIVE",
+        "injured": injured,
+        "stats": stats,
+        "schedule": team_schedule,
+        "lineupSlot": "BE",
+        "total_points": season["applied_total"],
+        "avg_points": season["applied_avg"],
+        "projected_total_points": round(projected_avg * 70, 1),
+        "projected_avg_points": round(projected_avg, 2),
+    }
+
+
+FIRST_NAMES = ["Jalen", "Luka", "Tyrese", "Anthony", "Jayson", "Devin", "Nikola", "Trae", "Paolo",
+               "Scottie", "Jaren", "Desmond", "Cade", "Victor", "Franz", "Mikal", "Domantas", "Evan"]
+LAST_NAMES = ["Brown", "Johnson", "Williams", "Green", "Jackson", "Harris", "Holiday", "Murray",
+              "Allen", "Barnes", "Mitchell", "Edwards", "Young", "Banchero", "Bridges", "Wagner"]
+
+
+def _scoreboard(rng, n_teams, team_names, today_period, weeks) -> Dict[str, Dict]:
+    """
+    Round-robin matchups as ESPN's mMatchup `schedule` entries, run through the
+    cron's matchup_record(). Week w covers scoring periods (w-1)*MATCHUP_DAYS+1
+    .. w*MATCHUP_DAYS; weeks that ended before today are decided.
+    """
+    docs = {}
+    ids = list(range(1, n_teams + 1))
+    for week in range(1, weeks + 1):
+        rotation = ids[:1] + ids[1:][week % (n_teams - 1):] + ids[1:][:week % (n_teams - 1)]
+        first = (week - 1) * MATCHUP_DAYS + 1
+        played = range(first, min(first + MATCHUP_DAYS, today_period))
+        final = first + MATCHUP_DAYS <= today_period
+        for i in range(n_teams // 2):
+            home, away = rotation[i], rotation[-(i + 1)]
+            sides = {}
+            for side, team_id in (("home", home), ("away", away)):
+                points = {str(p): round(rng.uniform(120, 190), 1) for p in played}
+                sides[side] = {
+                    "teamId": team_id,
+                    "totalPoints": round(sum(points.values()), 1),
+                    "pointsByScoringPeriod": points,
+                }
+            if final:
+                winner = "HOME" if sides["home"]["totalPoints"] >= sides["away"]["totalPoints"] else "AWAY"
+            else:
+                winner = "UNDECIDED"
+            record = matchup_record({"matchupPeriodId": week, "winner": winner, **sides}, team_names)
+            docs[record["matchupId"]] = record
+    return docs
+
+
+def generate_league(n_players: int = 1000, n_teams: int = 12, seed: int = 0,
+                    now: Optional[datetime] = None, season_day: int = 60,
+                    layout: str = "inline", with_views: bool = False) -> Dict[str, Dict[str, Dict]]:
+    """
+    A synthetic league as {collection: {doc id: data}}.
+
+    n_players:  size of the whole player pool (rostered + free agents)
+    n_teams:    fantasy teams, ROSTER_SIZE players each
+    now:        "today" (default datetime.now()); the season started `season_day` days earlier
+    layout:     "inline" (stats/schedule on the player doc) or "split" (espn_cron's split layout)
+    with_views: also write the cron's materialized views + meta/snapshot
+    """
+    rng = random.Random(seed)
+    now = now or datetime.now()
+    season_start = (now - timedelta(days=season_day)).replace(hour=0, minute=0, second=0, microsecond=0)
+    today_period = season_day + 1
+
+    nba_schedule = _nba_schedule(rng, season_start)
+    players = []
+    for i in range(n_players):
+        pro_team = NBA_TEAMS[i % len(NBA_TEAMS)]
+        players.append(_player(rng, 3000000 + i, pro_team, nba_schedule[pro_team], season_start, today_period))
+
+    # positional rank by projected average
+    for position in POSITIONS:
+        ranked = sorted((p for p in players if p["position"] == position),
+                        key=lambda p: p["projected_avg_points"], reverse=True)
+        for rank, p in enumerate(ranked, start=1):
+            p["posRank"] = rank
+
+    # best players are rostered, the rest are free agents
+    by_value = sorted(players, key=lambda p: p["projected_avg_points"], reverse=True)
+    n_rostered = min(len(players), n_teams * ROSTER_SIZE)
+    rostered, free_agents = by_value[:n_rostered], by_value[n_rostered:]
+    team_names = {tid: f"Team {tid}" for tid in range(1, n_teams + 1)}
+    for i, p in enumerate(rostered):
+        p["lineupSlot"] = rng.choice(p["eligibleSlots"][:-2])
+        p["teamId"] = i % n_teams + 1  # snake-ish: every team gets a mix of values
+        p["teamName"] = team_names[p["teamId"]]
+
+    collections = {TEAM_PLAYERS_COL: {}, FREE_AGENTS_COL: {}}
+    if layout == "split":
+        collections[PLAYER_STATS_COL] = {}
+        collections[PLAYER_SCHEDULES_COL] = {}
+    for col, group in ((TEAM_PLAYERS_COL, rostered), (FREE_AGENTS_COL, free_agents)):
+        for p in group:
+            doc_id = str(p["playerId"])
+            if layout == "split":
+                summary, stats_doc, schedule_doc = split_player_record(p)
+                collections[col][doc_id] = summary
+                collections[PLAYER_STATS_COL][doc_id] = stats_doc
+                collections[PLAYER_SCHEDULES_COL][doc_id] = schedule_doc
+            else:
+                collections[col][doc_id] = p
+
+    collections[SCOREBOARD_COL] = _scoreboard(rng, n_teams, team_names, today_period,
+                                              weeks=SEASON_DAYS // MATCHUP_DAYS)
+
+    collections[META_COL] = {LEAGUE_SETTINGS_DOC: {
+        "lineup_slot_counts": dict(LINEUP_SLOT_COUNTS),
+        "matchup_acquisition_limit": MATCHUP_ACQUISITION_LIMIT,
+    }}
+
+    if with_views:
+        version = f"synthetic-{seed}-{n_players}"
+        collections[VIEWS_COL] = {}
+        for name, view in build_views(rostered + free_agents, SEASON_YEAR).items():
+            view["version"] = version
+            collections[VIEWS_COL][name] = view
+        collections[META_COL][SNAPSHOT_DOC] = {"version": version, "created_at": now.isoformat()}
+
+    return collections
@@ -10,6 +10,12 @@ class Config:
     SWID = os.environ.get("SWID") or 'TBA'
     ESPN_S2 = os.environ.get("ESPN_S2") or 'TBA'
     LEAGUE_ID = os.environ.get("LEAGUE_ID") or 'TBA'
+    # "firestore" (default), or "memory" / "sqlite" to run against a local stand-in (see app/storage)
+    STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND") or 'firestore'
+    SQLITE_PATH = os.environ.get("SQLITE_PATH") or os.path.join(basedir, 'fantasy.db')
+    LOCAL_SEED_PATH = os.environ.get("LOCAL_SEED_PATH") # optional JSON dump to load into the local backend
+    MODEL_DIR = os.environ.get("MODEL_DIR") or os.path.join(basedir, 'model_cache') # trained waiver models, one per data snapshot
+    TRAINING_WORKERS = int(os.environ.get("TRAINING_WORKERS") or 2) # processes for background model training (0 = train in the web process)
 
 # Map secret names to Secret Manager versions
 # gcloud secrets create SECRET_KEY --data-file=- <<< (int value here)
@@ -1,9 +1,24 @@
 from espn_api.basketball import League
+from espn_api.basketball.constant import POSITION_MAP
 import firebase_admin
 from firebase_admin import firestore
 import os
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
+from materialize import write_views, META_COL
+from records import (
+    SEASON_YEAR,
+    TEAM_PLAYERS_COL,
+    FREE_AGENTS_COL,
+    PLAYER_STATS_COL,
+    PLAYER_SCHEDULES_COL,
+    SCOREBOARD_COL,
+    LEAGUE_SETTINGS_DOC,
+    lineup_slot_counts,
+    matchup_record,
+    player_record,
+    split_player_record,
+)
 
 # Initialize Firebase once
 if not firebase_admin._apps:
@@ -13,16 +28,8 @@ db = firestore.client()
 
 BATCH_SIZE = 25  # keep batches small to avoid "Transaction too big"
 
-
-def serialize(obj):
-    """Convert datetimes and nested objects into Firestore-safe data."""
-    if isinstance(obj, dict):
-        return {k: serialize(v) for k, v in obj.items()}
-    if isinstance(obj, list):
-        return [serialize(v) for v in obj]
-    if isinstance(obj, datetime):
-        return obj.isoformat()
-    return obj
+# Set SPLIT_PLAYER_DETAILS=0 to write the old inline layout (see records.py)
+SPLIT_PLAYER_DETAILS = os.environ.get("SPLIT_PLAYER_DETAILS", "1") != "0"
 
 
 def delete_collection(collection_ref, batch_size=500):
@@ -35,14 +42,17 @@ def delete_collection(collection_ref, batch_size=500):
             doc.reference.delete()
 
 
-def write_in_batches(collection_name, documents):
-    """Write documents using safe Firestore batch sizes."""
+def write_in_batches(collection_name, documents, id_field=None):
+    """Write documents using safe Firestore batch sizes (doc id = doc[id_field] when given)."""
     batch = db.batch()
     count = 0
     total_written = 0
 
     for doc in documents:
-        ref = db.collection(collection_name).document()
+        if id_field is not None:
+            ref = db.collection(collection_name).document(str(doc[id_field]))
+        else:
+            ref = db.collection(collection_name).document()
         batch.set(ref, doc)
         count += 1
 
@@ -59,6 +69,40 @@ def write_in_batches(collection_name, documents):
     return total_written
 
 
+def write_players(collection_name, records):
+    """Write player docs in the configured layout; returns the number of player docs written."""
+    if not SPLIT_PLAYER_DETAILS:
+        return write_in_batches(collection_name, records)
+
+    summaries, stats_docs, schedule_docs = [], [], []
+    for record in records:
+        summary, stats_doc, schedule_doc = split_player_record(record)
+        summaries.append(summary)
+        stats_docs.append(stats_doc)
+        schedule_docs.append(schedule_doc)
+
+    write_in_batches(PLAYER_STATS_COL, stats_docs, id_field="playerId")
+    write_in_batches(PLAYER_SCHEDULES_COL, schedule_docs, id_field="playerId")
+    return write_in_batches(collection_name, summaries, id_field="playerId")
+
+
+def league_view(league, view, key):
+    """
+    `key` of one raw mView of the league. espn_api has no public call for the
+    whole-season mMatchup / mSettings views, so this goes through its private
+    espn_request.league_get; when an espn_api upgrade moves that, fail with a
+    message that says so instead of a bare AttributeError.
+    """
+    try:
+        league_get = league.espn_request.league_get
+    except AttributeError as e:
+        raise RuntimeError(
+            f"espn_api no longer provides league.espn_request.league_get (needed for the {view} view); "
+            "pin espn-api in espn_cron/requirements.txt or update league_view()"
+        ) from e
+    return league_get(params={"view": view}).get(key) or {}
+
+
 def run_espn_job(request):
     """HTTP Cloud Function entry point (triggered by Cloud Scheduler)."""
     logging.info("Starting ESPN scrape job")
@@ -66,7 +110,7 @@ def run_espn_job(request):
     try:
         league = League(
             league_id=os.environ["LEAGUE_ID"],
-            year=2026,
+            year=SEASON_YEAR,
             swid=os.environ["SWID"],
             espn_s2=os.environ["ESPN_S2"],
         )
@@ -80,59 +124,70 @@ def run_espn_job(request):
     # TEAM PLAYERS
     for team in league.teams:
         for player in team.roster:
-            players_for_db.append({
-                "name": player.name,
-                "playerId": player.playerId,
-                "eligibleSlots": player.eligibleSlots,
-                "posRank": player.posRank,
-                "acquisitionType": player.acquisitionType,
-                "proTeam": player.proTeam,
-                "position": player.position,
-                "injuryStatus": player.injuryStatus,
-                "injured": player.injured,
-                "stats": serialize(player.stats),
-                "schedule": serialize(player.schedule),
-                "lineupSlot": player.lineupSlot,
-                "total_points": player.total_points,
-                "avg_points": player.avg_points,
-                "projected_total_points": player.projected_total_points,
-                "projected_avg_points": player.projected_avg_points,
-            })
+            record = player_record(player)
+            # which fantasy team rosters the player (trade finder groups rosters by this)
+            record["teamId"] = team.team_id
+            record["teamName"] = team.team_name
+            players_for_db.append(record)
 
     # FREE AGENTS (IMPORTANT: only once)
     for player in league.free_agents():
-        free_agents_for_db.append({
-            "name": player.name,
-            "playerId": player.playerId,
-            "eligibleSlots": player.eligibleSlots,
-            "posRank": player.posRank,
-            "acquisitionType": player.acquisitionType,
-            "proTeam": player.proTeam,
-            "position": player.position,
-            "injuryStatus": player.injuryStatus,
-            "injured": player.injured,
-            "stats": serialize(player.stats),
-            "schedule": serialize(player.schedule),
-            "lineupSlot": player.lineupSlot,
-            "total_points": player.total_points,
-            "avg_points": player.avg_points,
-            "projected_total_points": player.projected_total_points,
-            "projected_avg_points": player.projected_avg_points,
-        })
+        free_agents_for_db.append(player_record(player))
+
+    # SCOREBOARD: the mMatchup view holds every matchup of the season, so one
+    # request covers all weeks (league.scoreboard() refetches it per week).
+    # LEAGUE SETTINGS: lineup slots and weekly add limit (start/sit + streaming planners).
+    # Both are read before anything is deleted, so a failure leaves the last scrape in place.
+    try:
+        schedule = league_view(league, "mMatchup", "schedule") or []
+        settings = league_view(league, "mSettings", "settings")
+    except Exception as e:
+        logging.exception("Failed to read the league's matchups / settings")
+        return f"Failed to read league matchups / settings: {e}", 500
+
+    team_names = {team.team_id: team.team_name for team in league.teams}
+    matchups_for_db = [r for r in (matchup_record(m, team_names) for m in schedule) if r is not None]
+
+    slot_counts = lineup_slot_counts(
+        settings.get("rosterSettings", {}).get("lineupSlotCounts"), POSITION_MAP
+    )
 
     logging.info("Deleting old collections")
 
-    delete_collection(db.collection("team_players"))
-    delete_collection(db.collection("free_agents"))
+    delete_collection(db.collection(TEAM_PLAYERS_COL))
+    delete_collection(db.collection(FREE_AGENTS_COL))
+    delete_collection(db.collection(PLAYER_STATS_COL))
+    delete_collection(db.collection(PLAYER_SCHEDULES_COL))
+    delete_collection(db.collection(SCOREBOARD_COL))
 
     logging.info("Writing team players")
-    team_players_written = write_in_batches(
-        "team_players", players_for_db
+    team_players_written = write_players(
+        TEAM_PLAYERS_COL, players_for_db
     )
 
     logging.info("Writing free agents")
-    free_agents_written = write_in_batches(
-        "free_agents", free_agents_for_db
+    free_agents_written = write_players(
+        FREE_AGENTS_COL, free_agents_for_db
+    )
+
+    logging.info("Writing scoreboard")
+    matchups_written = write_in_batches(SCOREBOARD_COL, matchups_for_db, id_field="matchupId")
+
+    db.collection(META_COL).document(LEAGUE_SETTINGS_DOC).set({
+        "lineup_slot_counts": slot_counts,
+        "matchup_acquisition_limit": settings.get("acquisitionSettings", {}).get("matchupAcquisitionLimit"),
+    })
+
+    # Precompute the views the app's list pages render, versioned to this scrape
+    logging.info("Materializing views")
+    scraped_at = datetime.now(timezone.utc)
+    snapshot_version = scraped_at.strftime("%Y%m%dT%H%M%SZ")
+    write_views(
+        db,
+        players_for_db + free_agents_for_db,
+        year=SEASON_YEAR,
+        version=snapshot_version,
+        created_at=scraped_at.isoformat(),
     )
 
     logging.info("ESPN scrape complete")
@@ -140,7 +195,9 @@ def run_espn_job(request):
     return (
         f"ESPN scrape complete. "
         f"Team players written: {team_players_written}, "
-        f"Free agents written: {free_agents_written}",
+        f"Free agents written: {free_agents_written}, "
+        f"Matchups written: {matchups_written}, "
+        f"Snapshot: {snapshot_version}",
         200,
     )
 
@@ -0,0 +1,161 @@
+"""
+Materialized views computed at the end of every scrape.
+
+The app's rankings, boom/bust, injured and schedule grid pages only depend on
+what this job writes, so they're computed here once and stored as one compact
+doc each in the `views` collection. Every view carries the scrape's snapshot
+version; `meta/snapshot` is written last so the app never pairs new views
+with old player docs. Row shapes match what the app's espn_calls functions
+return, so the routes can render a view as-is.
+"""
+
+VIEWS_COL = "views"
+META_COL = "meta"
+SNAPSHOT_DOC = "snapshot"
+
+# Defaults the /boombust page uses
+BOOM_BUST_MIN_GAMES = 10
+BOOM_BUST_MIN_PROJECTED = 10
+
+
+def _unique_players(players):
+    seen = set()
+    unique = []
+    for p in players:
+        pid = p.get("playerId")
+        if pid is None or pid in seen:
+            continue
+        seen.add(pid)
+        unique.append(p)
+    return unique
+
+
+def rankings_view(players):
+    """Every player's ranking row, sorted like generate_player_rankings(by="avg_points")."""
+    rows = []
+    for p in players:
+        rows.append({
+            "playerId": p.get("playerId") or p.get("id"),
+            "name": p.get("name"),
+            "position": p.get("position"),
+            "proTeam": p.get("proTeam") or p.get("team"),
+            "posRank": p.get("posRank"),
+            "avg_points": p.get("avg_points"),
+            "projected_avg_points": p.get("projected_avg_points"),
+            "total_points": p.get("total_points") or p.get("points"),
+            "projected_total_points": p.get("projected_total_points"),
+            "games_played": p.get("games_played") or p.get("gamesPlayed"),
+        })
+
+    def _sort_key(x):
+        return x["avg_points"] if x["avg_points"] is not None else (x["projected_avg_points"] or 0)
+
+    rows.sort(key=_sort_key, reverse=True)
+    return {"players": rows}
+
+
+def boom_bust_view(players, year):
+    """get_boom_bust_players(include_injured=True, year=year, min_games=10)."""
+    booms = []
+    busts = []
+    for p in players:
+        avg = p.get("avg_points")
+        proj = p.get("projected_avg_points")
+        if avg is None or proj is None or proj < BOOM_BUST_MIN_PROJECTED:
+            continue
+        season = (p.get("stats") or {}).get(f"{year}_total") or {}
+        if ((season.get("total") or {}).get("GP") or 0) < BOOM_BUST_MIN_GAMES:
+            continue
+
+        score = avg - proj
+        entry = {
+            "playerId": p.get("playerId"),
+            "name": p.get("name"),
+            "boom_score": score,
+            "avg_points": avg,
+            "projected_avg_points": proj,
+            "position": p.get("position"),
+            "injured": bool(p.get("injured")),
+        }
+        if score > 0:
+            booms.append(entry)
+        elif score < 0:
+            busts.append(entry)
+
+    booms.sort(key=lambda r: r["boom_score"], reverse=True)
+    busts.sort(key=lambda r: r["boom_score"])
+    return {"year": year, "min_games": BOOM_BUST_MIN_GAMES, "booms": booms, "busts": busts}
+
+
+def injured_view(players):
+    """get_injured_players(): injured players sorted by avg_points desc."""
+    injured = []
+    for p in players:
+        if not p.get("injured"):
+            continue
+        injured.append({
+            "playerId": p.get("playerId"),
+            "name": p.get("name"),
+            "position": p.get("position"),
+            "proTeam": p.get("proTeam") or p.get("team"),
+            "avg_points": p.get("avg_points"),
+            "projected_avg_points": p.get("projected_avg_points"),
+            "injured": True,
+        })
+    injured.sort(key=lambda p: p.get("avg_points") or 0, reverse=True)
+    return {"players": injured}
+
+
+def team_schedules_view(players):
+    """
+    Every NBA team's games, deduplicated by game id and sorted by date, as
+    parallel arrays {"ids", "dates", "opponents"} per team (Firestore has no
+    arrays of arrays). Counts for "this week" etc. depend on when the page is
+    viewed, so the app rolls these up per request instead of storing counts.
+    """
+    team_games = {}
+    for p in players:
+        team_name = p.get("proTeam") or p.get("team") or ""
+        if not team_name:
+            continue
+        games = team_games.setdefault(team_name, {})
+        for game_id, info in (p.get("schedule") or {}).items():
+            if game_id in games or not info.get("date"):
+                continue
+            games[game_id] = (str(game_id), str(info.get("date")), info.get("team") or info.get("opponent") or "")
+
+    teams = {}
+    for team_name, games in team_games.items():
+        ordered = sorted(games.values(), key=lambda g: g[1] or "")
+        teams[team_name] = {
+            "ids": [g[0] for g in ordered],
+            "dates": [g[1] for g in ordered],
+            "opponents": [g[2] for g in ordered],
+        }
+    return {"teams": teams}
+
+
+def build_views(players, year):
+    """All views for one scrape, keyed by doc id in VIEWS_COL."""
+    unique = _unique_players(players)
+    return {
+        "rankings": rankings_view(unique),
+        "boom_bust": boom_bust_view(unique, year),
+        "injured": injured_view(unique),
+        "team_schedules": team_schedules_view(players),
+    }
+
+
+def write_views(db, players, year, version, created_at):
+    """Compute and write every view, then publish the new snapshot version."""
+    views = build_views(players, year)
+    for name, view in views.items():
+        view["version"] = version
+        db.collection(VIEWS_COL).document(name).set(view)
+
+    db.collection(META_COL).document(SNAPSHOT_DOC).set({
+        "version": version,
+        "created_at": created_at,
+        "views": sorted(views),
+    })
+    return views
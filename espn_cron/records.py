@@ -0,0 +1,122 @@
+"""
+How a scraped ESPN player becomes Firestore documents.
+
+Kept free of Firebase / ESPN imports so the same record layout can be built
+outside the Cloud Function (e.g. the synthetic leagues in benchmarks/).
+"""
+from datetime import datetime
+
+SEASON_YEAR = 2026
+
+TEAM_PLAYERS_COL = "team_players"
+FREE_AGENTS_COL = "free_agents"
+
+# Split layout: player docs only hold summary scalars (plus this season's totals),
+# while the per-period box scores and the schedule live in one doc per player in
+# these collections (doc id = playerId) and are read lazily by the app.
+PLAYER_STATS_COL = "player_stats"
+PLAYER_SCHEDULES_COL = "player_schedules"
+SPLIT_LAYOUT = "split"
+
+# One doc per fantasy matchup (doc id = matchupId), queried by week and by team
+SCOREBOARD_COL = "scoreboard"
+
+# meta/league_settings: league configuration the app needs (lineup slot counts)
+LEAGUE_SETTINGS_DOC = "league_settings"
+
+
+def serialize(obj):
+    """Convert datetimes and nested objects into Firestore-safe data."""
+    if isinstance(obj, dict):
+        return {k: serialize(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [serialize(v) for v in obj]
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    return obj
+
+
+def player_record(player):
+    """Full player doc (inline layout)."""
+    return {
+        "name": player.name,
+        "playerId": player.playerId,
+        "eligibleSlots": player.eligibleSlots,
+        "posRank": player.posRank,
+        "acquisitionType": player.acquisitionType,
+        "proTeam": player.proTeam,
+        "position": player.position,
+        "injuryStatus": player.injuryStatus,
+        "injured": player.injured,
+        "stats": serialize(player.stats),
+        "schedule": serialize(player.schedule),
+        "lineupSlot": player.lineupSlot,
+        "total_points": player.total_points,
+        "avg_points": player.avg_points,
+        "projected_total_points": player.projected_total_points,
+        "projected_avg_points": player.projected_avg_points,
+    }
+
+
+def split_player_record(record):
+    """Split a full player doc into (summary, stats doc, schedule doc) for the split layout."""
+    stats = record.get("stats") or {}
+    season_key = f"{SEASON_YEAR}_total"
+    season = stats.get(season_key) or {}
+
+    summary = {k: v for k, v in record.items() if k not in ("stats", "schedule")}
+    # season totals stay inline: they're small, fixed size and the list views need GP
+    summary["stats"] = {season_key: season} if season else {}
+    summary["games_played"] = (season.get("total") or {}).get("GP")
+    summary["detail_layout"] = SPLIT_LAYOUT
+
+    stats_doc = {"playerId": record["playerId"], "stats": stats}
+    schedule_doc = {"playerId": record["playerId"], "schedule": record.get("schedule") or {}}
+    return summary, stats_doc, schedule_doc
+
+
+def matchup_record(match, team_names=None):
+    """
+    Scoreboard doc for one entry of the league's `schedule` (ESPN's mMatchup
+    view), or None for a bye. Besides the nested home/away team dicts it
+    carries flat `week`, `home_team_id` / `away_team_id` and a `team_ids`
+    array, so readers can filter by week and by team
+    (where("team_ids", "array_contains", team_id)) instead of scanning the
+    season. Scores stay None until the matchup is decided.
+    """
+    home = match.get("home") or {}
+    away = match.get("away") or {}
+    if "teamId" not in home or "teamId" not in away:
+        return None
+    team_names = team_names or {}
+    week = match.get("matchupPeriodId")
+    home_id, away_id = home["teamId"], away["teamId"]
+    decided = match.get("winner") not in (None, "UNDECIDED")
+    # scoring periods (days) of the matchup that have points so far
+    periods = sorted({
+        int(p) for side in (home, away) for p in (side.get("pointsByScoringPeriod") or {})
+    })
+    return {
+        "matchupId": f"{week}_{home_id}_{away_id}",
+        "week": week,
+        "home_team_id": home_id,
+        "away_team_id": away_id,
+        "team_ids": [home_id, away_id],
+        "home_team": {"team_id": home_id, "team_name": team_names.get(home_id)},
+        "away_team": {"team_id": away_id, "team_name": team_names.get(away_id)},
+        "home_score": home.get("totalPoints") if decided else None,
+        "away_score": away.get("totalPoints") if decided else None,
+        "winner": match.get("winner"),
+        "playoff": match.get("playoffTierType", "NONE") != "NONE",
+        "scoring_periods": periods,
+    }
+
+
+def lineup_slot_counts(raw_counts, position_map):
+    """{slot name: count} from ESPN's rosterSettings.lineupSlotCounts ({slot id: count}), unused slots dropped."""
+    counts = {}
+    for slot_id, count in (raw_counts or {}).items():
+        name = position_map.get(int(slot_id), str(slot_id))
+        if count and name:
+            counts[name] = count
+    return counts